@@ -0,0 +1,300 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+# Copyright Campbell Barton
+
+"""
+Benchmark ``blend2ps`` & ``rst2blend`` on synthetic scenes without Blender,
+using stand-in ``bpy`` & ``mathutils`` modules (see ``benchmarks/fake``).
+
+Example::
+
+   python benchmarks/bench.py --scale 2 --output results.json
+   python benchmarks/bench.py --baseline results.json
+
+Timings are only comparable on the same machine,
+with ``--baseline`` the exit code is non-zero when any case is slower than the baseline (beyond the tolerance).
+"""
+
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path[:0] = [os.path.join(BENCH_DIR, "fake"), BENCH_DIR, os.path.dirname(BENCH_DIR)]
+
+
+# ----------------------------------------------------------------------------
+# Benchmark Cases
+#
+# Each case is a function taking the scale, returning a (run, objects) pair,
+# where 'run()' performs the timed operation (returning the number of bytes written).
+
+def case_blend2ps(scale, image_filepath, pdf=False, **kwargs):
+    import io
+    import blend2ps
+    import scenes
+
+    scene = scenes.scene_blend2ps(
+        curves=int(1000 * scale),
+        texts=int(50 * scale),
+        images=int(10 * scale),
+        duplis=int(20 * scale),
+        background=int(200 * scale),
+        image_filepath=image_filepath,
+    )
+
+    import mathutils
+    objects = sum(
+        1 for obj, matrix in blend2ps.ps_scene_objects(scene, mathutils.Matrix())
+        if obj.type in {'CURVE', 'FONT', 'EMPTY'}
+    )
+
+    def run():
+        if pdf:
+            output = io.BytesIO()
+            blend2ps.pdf_write(output.write, **kwargs)
+        else:
+            output = io.StringIO()
+            blend2ps.ps_write(output.write, **kwargs)
+        return len(output.getvalue())
+
+    return run, objects
+
+
+def case_rst2blend(scale, page_height=None, use_reuse_objects=False):
+    import bpy
+    import rst2blend
+    import scenes
+
+    doc = rst2blend.rst2tree(scenes.document_rst(sections=int(10 * scale)))
+    bdoc = rst2blend.BlendDoc()
+    doc.walkabout(rst2blend.Visitor(doc, bdoc))
+
+    def run():
+        conf = rst2blend.BDocConf()
+        conf.scene = bpy.context.scene if use_reuse_objects else bpy.reset()
+        conf.use_reuse_objects = use_reuse_objects
+        conf.page_width = 6.0
+        conf.page_height = page_height
+        conf.paragraph_space = 1.0
+
+        style = rst2blend.BDocStyle()
+        style.size = 1.0
+        style.font = style.font_bold = style.font_italic = None
+        for attr, size in (("style_body", 0.1),
+                           ("style_head1", 0.5),
+                           ("style_head2", 0.3),
+                           ("style_head3", 0.2),
+                           ("style_head4", 0.16),
+                           ("style_head5", 0.14)):
+            setattr(conf, attr, rst2blend.BDocStyle(style))
+            getattr(conf, attr).size = size
+
+        bdoc.to_blend(conf)
+        return sum(len(cu.body) for cu in bpy.data.curves)
+
+    if use_reuse_objects:
+        # each run lays out the unchanged document again, reusing objects from this build.
+        bpy.reset()
+        run()
+
+    return run, len(bdoc._elems)
+
+
+def case_rst2tree(scale, cache_dir=None):
+    import rst2blend
+    import scenes
+
+    sections = int(10 * scale)
+    source = scenes.document_rst(sections=sections)
+
+    cache = None
+    if cache_dir is not None:
+        cache = rst2blend.DocTreeCache(cache_dir)
+        rst2blend.rst2tree(source, cache=cache, use_sections=True)
+
+    edits = [0]
+
+    def run():
+        # edit the last section, so only it needs to be parsed (with the cache).
+        edits[0] += 1
+        source_edit = "%s\n\nEdit %d.\n" % (source, edits[0])
+        rst2blend.rst2tree(source_edit, cache=cache, use_sections=True)
+        return len(source_edit)
+
+    return run, sections
+
+
+def case_rst2blend_files(scale, dirpath, jobs=None):
+    import rst2blend
+    import scenes
+
+    filepaths = []
+    for i in range(max(1, int(4 * scale))):
+        filepath = os.path.join(dirpath, "chapter_%d.rst" % i)
+        with open(filepath, 'w', encoding="utf-8") as file:
+            file.write(scenes.document_rst(sections=10, seed=i))
+        filepaths.append(filepath)
+    size = sum(os.path.getsize(filepath) for filepath in filepaths)
+
+    def run():
+        rst2blend.bdoc_from_rst_files(filepaths, jobs=jobs)
+        return size
+
+    return run, len(rst2blend.bdoc_from_rst_files(filepaths, jobs=1)._elems)
+
+
+CASES = (
+    ("blend2ps", lambda scale, image_filepath: case_blend2ps(scale, image_filepath)),
+    ("blend2ps_compact", lambda scale, image_filepath: case_blend2ps(scale, image_filepath, precision=2)),
+    ("blend2ps_batch", lambda scale, image_filepath: case_blend2ps(scale, image_filepath, use_batch=True)),
+    ("blend2ps_dedup", lambda scale, image_filepath: case_blend2ps(scale, image_filepath, use_dedup=True)),
+    ("blend2ps_cull", lambda scale, image_filepath: case_blend2ps(scale, image_filepath, cull='SPLINE')),
+    ("blend2ps_pdf", lambda scale, image_filepath: case_blend2ps(scale, image_filepath, pdf=True)),
+    ("rst2blend", lambda scale, image_filepath: case_rst2blend(scale)),
+    ("rst2blend_pages", lambda scale, image_filepath: case_rst2blend(scale, page_height=8.5)),
+    ("rst2blend_reuse", lambda scale, image_filepath: case_rst2blend(scale, use_reuse_objects=True)),
+    ("rst2tree", lambda scale, image_filepath: case_rst2tree(scale)),
+    ("rst2blend_files", lambda scale, image_filepath: case_rst2blend_files(
+        scale, os.path.dirname(image_filepath))),
+    ("rst2tree_sections", lambda scale, image_filepath: case_rst2tree(
+        scale, cache_dir=os.path.join(os.path.dirname(image_filepath), "doctree_cache"))),
+)
+
+
+# ----------------------------------------------------------------------------
+# Running & Reporting
+
+def time_best(run, repeat):
+    """
+    Return the (seconds, size) of the fastest run, output printed by the run is discarded.
+    """
+    import io
+    import time
+    import contextlib
+
+    seconds_best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            time_start = time.perf_counter()
+            size = run()
+            seconds = time.perf_counter() - time_start
+        if seconds_best is None or seconds < seconds_best:
+            seconds_best = seconds
+    return seconds_best, size
+
+
+def bench(case_names=None, scale=1.0, repeat=3):
+    import io
+    import tempfile
+    import contextlib
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="blend2ps_bench_") as tempdir:
+        # only the existence of images is checked (they're referenced, not embedded).
+        image_filepath = os.path.join(tempdir, "image.jpg")
+        with open(image_filepath, 'wb') as file:
+            file.write(b"\xff\xd8\xff\xd9")
+
+        for name, case in CASES:
+            if case_names and name not in case_names:
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):
+                run, objects = case(scale, image_filepath)
+            seconds, size = time_best(run, repeat)
+            results[name] = {
+                "seconds": round(seconds, 6),
+                "objects": objects,
+                "bytes": size,
+                "objects_per_second": round(objects / seconds, 3),
+                "bytes_per_second": round(size / seconds, 3),
+            }
+            print("%-20s %9.4fs %10.0f objects/s %8.2f MB/s %10d bytes" % (
+                name, seconds, objects / seconds, size / seconds / (1024 * 1024), size))
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Return a list of (name, seconds, seconds_baseline) for cases slower than the baseline.
+    """
+    result = []
+    for name, item in sorted(results.items()):
+        item_base = baseline.get(name)
+        if item_base is None:
+            continue
+        if item["bytes"] != item_base["bytes"]:
+            print("%s: output size changed %d -> %d bytes" % (name, item_base["bytes"], item["bytes"]))
+        if item["seconds"] > item_base["seconds"] * (1.0 + tolerance):
+            result.append((name, item["seconds"], item_base["seconds"]))
+    return result
+
+
+# ----------------------------------------------------------------------------
+# Command line access
+
+def main():
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark blend2ps & rst2blend using synthetic scenes (without Blender).")
+
+    parser.add_argument("cases", nargs="*", metavar='CASE',
+                        help="Cases to run (all by default): " + ", ".join(name for name, _ in CASES))
+
+    parser.add_argument('-s', '--scale', dest="scale", type=float, default=1.0,
+                        help="Scale the number of objects in each scene")
+
+    parser.add_argument('-r', '--repeat', dest="repeat", type=int, default=3,
+                        help="Number of times to run each case (the fastest is used)")
+
+    parser.add_argument('-o', '--output', dest="output_path", metavar='FILE',
+                        help="Write the results to a JSON file (to use as a baseline)")
+
+    parser.add_argument('-b', '--baseline', dest="baseline_path", metavar='FILE',
+                        help="Compare against results from a previous run, failing on regressions")
+
+    parser.add_argument('-t', '--tolerance', dest="tolerance", type=float, default=0.2,
+                        help="Fraction a case may be slower than the baseline before it's considered a regression")
+
+    args = parser.parse_args()
+
+    results = bench(case_names=args.cases, scale=args.scale, repeat=args.repeat)
+
+    if args.output_path is not None:
+        with open(args.output_path, 'w', encoding="utf-8") as file:
+            json.dump({"scale": args.scale, "results": results}, file, indent=2)
+            file.write("\n")
+
+    if args.baseline_path is not None:
+        with open(args.baseline_path, 'r', encoding="utf-8") as file:
+            baseline = json.load(file)
+        if baseline["scale"] != args.scale:
+            sys.exit("baseline scale %r doesn't match %r" % (baseline["scale"], args.scale))
+        slower = regressions(results, baseline["results"], args.tolerance)
+        for name, seconds, seconds_base in slower:
+            print("%s: regression %.4fs -> %.4fs (%+.1f%%)" % (
+                name, seconds_base, seconds, ((seconds / seconds_base) - 1.0) * 100.0))
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+# Copyright Campbell Barton
+
+"""
+Check joining & splitting the parts written by ``blend2ps_parallel`` without Blender,
+parts are written by ``blend2ps`` in this process using the stand-in ``bpy`` (see ``benchmarks/fake``).
+
+Example::
+
+   python benchmarks/check_parallel.py --chunks 4
+
+The exit code is non-zero when the joined parts differ from the document written at once,
+or a page split from the parts differs from the page written alone.
+"""
+
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path[:0] = [os.path.join(BENCH_DIR, "fake"), BENCH_DIR, os.path.dirname(BENCH_DIR)]
+
+# Keyword arguments for 'blend2ps.write',
+# definitions (--dedup, --embed-images) are named differently in each part, so they aren't compared.
+VARIANTS = (
+    ("default", {}),
+    ("compact", {"compact": True, "precision": 2}),
+    ("batch", {"use_batch": True}),
+)
+
+# (rows, columns), each tile is a page.
+TILES = (2, 3)
+
+
+def ps_read(filepath):
+    """
+    Return the lines of a document, without those expected to differ between runs.
+    """
+    with open(filepath, 'r', encoding="latin-1") as file:
+        return [line for line in file if not line.startswith("%%CreationDate:")]
+
+
+def ps_write(filepath, **kwargs):
+    import io
+    import contextlib
+    import blend2ps
+    with contextlib.redirect_stdout(io.StringIO()):
+        blend2ps.write(filepath, page_source='CAMERA', tiles=TILES, **kwargs)
+
+
+def check(dirpath, chunks, **kwargs):
+    """
+    Return a list of failure messages.
+    """
+    import blend2ps_parallel
+
+    page_total = TILES[0] * TILES[1]
+    failures = []
+
+    filepath_whole = os.path.join(dirpath, "whole.ps")
+    ps_write(filepath_whole, **kwargs)
+
+    filepaths = []
+    for i, page_range in enumerate(blend2ps_parallel.page_ranges_split(page_total, chunks)):
+        filepath_part = os.path.join(dirpath, "part_%d.ps" % i)
+        ps_write(filepath_part, page_range=page_range, **kwargs)
+        filepaths.append(filepath_part)
+
+    filepath_joined = os.path.join(dirpath, "joined.ps")
+    with open(filepath_joined, 'w', encoding="latin-1") as file:
+        blend2ps_parallel.ps_join(file.write, filepaths)
+    if ps_read(filepath_joined) != ps_read(filepath_whole):
+        failures.append("joined parts differ from the whole document")
+
+    filepath_split = os.path.join(dirpath, "page.ps")
+    blend2ps_parallel.ps_split(filepath_split, filepaths, dirpath, gs_bin=None)
+    for i in range(page_total):
+        filepath_page = os.path.join(dirpath, "page_alone.ps")
+        ps_write(filepath_page, page_range=(i, i + 1), **kwargs)
+        # pages written alone keep their number in the document.
+        lines = [
+            "%%Page: 1 1\n" if line.startswith("%%Page:") else line
+            for line in ps_read(filepath_page)
+        ]
+        if ps_read(blend2ps_parallel.filepath_numbered(filepath_split, i + 1)) != lines:
+            failures.append("split page %d differs from the page written alone" % (i + 1))
+
+    return failures
+
+
+def main():
+    import io
+    import argparse
+    import tempfile
+    import contextlib
+    import scenes
+
+    parser = argparse.ArgumentParser(
+        description="Check joining & splitting blend2ps_parallel parts using a synthetic scene (without Blender).")
+
+    parser.add_argument('-s', '--scale', dest="scale", type=float, default=0.2,
+                        help="Scale the number of objects in the scene")
+
+    parser.add_argument('--chunks', dest="chunks", type=int, default=4,
+                        help="Number of parts to write the pages into")
+
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="blend2ps_check_") as tempdir:
+        # only the existence of images is checked (they're referenced, not embedded).
+        image_filepath = os.path.join(tempdir, "image.jpg")
+        with open(image_filepath, 'wb') as file:
+            file.write(b"\xff\xd8\xff\xd9")
+
+        scale = args.scale
+        with contextlib.redirect_stdout(io.StringIO()):
+            scenes.scene_blend2ps(
+                curves=int(1000 * scale),
+                texts=int(50 * scale),
+                images=int(10 * scale),
+                duplis=int(20 * scale),
+                background=int(200 * scale),
+                image_filepath=image_filepath,
+            )
+
+        for name, kwargs in VARIANTS:
+            failures_variant = check(tempdir, args.chunks, **kwargs)
+            print("%-20s %s" % (name, "FAIL" if failures_variant else "OK"))
+            failures.extend("%s: %s" % (name, message) for message in failures_variant)
+
+    for message in failures:
+        print(message)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
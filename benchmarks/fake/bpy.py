@@ -0,0 +1,528 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+# Copyright Campbell Barton
+
+"""
+Minimal stand-in for Blender's ``bpy`` module (benchmarks only).
+
+Only the parts used by ``blend2ps`` & ``rst2blend`` are implemented.
+Text is laid out on a fixed grid, each character is a single closed spline,
+so documents created by ``rst2blend`` can be exported by ``blend2ps``.
+"""
+
+import os
+import numpy as np
+from mathutils import Vector, Matrix
+
+
+# ----------------------------------------------------------------------------
+# Curve Data
+
+class SplinePoints:
+    """
+    Spline points stored in arrays, so ``foreach_get`` is fast enough to benchmark the exporter.
+    """
+    __slots__ = (
+        "co",
+        "handle_left",
+        "handle_right",
+        )
+
+    def __init__(self, co, handle_left=None, handle_right=None):
+        self.co = np.asarray(co, dtype=np.float32)
+        self.handle_left = None if handle_left is None else np.asarray(handle_left, dtype=np.float32)
+        self.handle_right = None if handle_right is None else np.asarray(handle_right, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.co)
+
+    def foreach_get(self, attr, seq):
+        seq[:] = getattr(self, attr).ravel()
+
+
+class Spline:
+    __slots__ = (
+        "type",
+        "use_cyclic_u",
+        "material_index",
+        "bezier_points",
+        "points",
+        )
+
+    def __init__(self, type, points, use_cyclic_u=False, material_index=0):
+        self.type = type
+        self.use_cyclic_u = use_cyclic_u
+        self.material_index = material_index
+        # POLY points are 4D (the last value is the weight).
+        empty = SplinePoints(np.empty((0, 3)))
+        if type == 'BEZIER':
+            self.bezier_points = points
+            self.points = empty
+        else:
+            self.bezier_points = empty
+            self.points = points
+
+
+class Material:
+    __slots__ = (
+        "name",
+        "diffuse_color",
+        )
+
+    def __init__(self, name, diffuse_color=(0.0, 0.0, 0.0)):
+        self.name = name
+        self.diffuse_color = Vector(diffuse_color)
+
+
+class Curve:
+    __slots__ = (
+        "name",
+        "splines",
+        "materials",
+        "fill_mode",
+        "dimensions",
+        "bevel_depth",
+        "resolution_u",
+        "library",
+        )
+
+    def __init__(self, name, splines=(), materials=(), fill_mode='BOTH', dimensions='2D', bevel_depth=0.0):
+        self.name = name
+        self.splines = list(splines)
+        self.materials = list(materials)
+        self.fill_mode = fill_mode
+        self.dimensions = dimensions
+        self.bevel_depth = bevel_depth
+        self.resolution_u = 12
+        self.library = None
+
+    @property
+    def users(self):
+        return _data_users(self)
+
+    def bounds(self):
+        """
+        Return the (min, max) of all points (used for the object bounding box).
+        """
+        arrays = []
+        for spline in self.splines:
+            if spline.type == 'BEZIER':
+                points = spline.bezier_points
+                arrays.extend((points.co, points.handle_left, points.handle_right))
+            else:
+                arrays.append(spline.points.co[:, :3])
+        if not arrays:
+            return (0.0, 0.0, 0.0), (0.0, 0.0, 0.0)
+        co = np.concatenate(arrays)
+        return tuple(co.min(axis=0).tolist()), tuple(co.max(axis=0).tolist())
+
+
+class TextCharacterFormat:
+    __slots__ = (
+        "use_bold",
+        "use_italic",
+        )
+
+    def __init__(self):
+        self.use_bold = False
+        self.use_italic = False
+
+
+class TextCharacterFormats(list):
+    def foreach_set(self, attr, seq):
+        assert len(seq) == len(self)
+        for item, value in zip(self, seq):
+            setattr(item, attr, value)
+
+
+class TextBox:
+    __slots__ = (
+        "x",
+        "y",
+        "width",
+        "height",
+        )
+
+    def __init__(self):
+        self.x = 0.0
+        self.y = 0.0
+        self.width = 0.0
+        self.height = 0.0
+
+
+class TextCurve(Curve):
+    __slots__ = (
+        "_body",
+        "body_format",
+        "text_boxes",
+        "align",
+        "size",
+        "offset_x",
+        "offset_y",
+        "space_line",
+        "space_word",
+        "space_character",
+        "font",
+        "font_bold",
+        "font_italic",
+        "font_bold_italic",
+        )
+
+    # character advance & line height (relative to the size).
+    CHAR_WIDTH = 0.55
+    LINE_HEIGHT = 1.2
+
+    def __init__(self, name):
+        super().__init__(name, fill_mode='BOTH')
+        self._body = ""
+        self.body_format = TextCharacterFormats()
+        self.text_boxes = [TextBox()]
+        self.align = 'LEFT'
+        self.size = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.space_line = 1.0
+        self.space_word = 1.0
+        self.space_character = 1.0
+        self.font = None
+        self.font_bold = None
+        self.font_italic = None
+        self.font_bold_italic = None
+
+    @property
+    def body(self):
+        return self._body
+
+    @body.setter
+    def body(self, value):
+        self._body = value
+        self.body_format = TextCharacterFormats(TextCharacterFormat() for _ in range(len(value)))
+
+    def layout_update(self):
+        """
+        Create a spline for each character, wrapping lines at the width of the first text box.
+        """
+        box = self.text_boxes[0]
+        advance = self.size * self.CHAR_WIDTH
+        line_height = self.size * self.LINE_HEIGHT
+        chars_per_line = max(1, int(box.width / advance)) if box.width > 0.0 else len(self._body) or 1
+
+        index = np.array([i for i, ch in enumerate(self._body) if not ch.isspace()], dtype=np.int64)
+        column = index % chars_per_line
+        line = index // chars_per_line
+
+        # a closed diamond for each character.
+        origin = np.zeros((len(index), 3), dtype=np.float32)
+        origin[:, 0] = box.x + column * advance
+        origin[:, 1] = -(line + 1) * line_height
+        shape = np.array([(0.5, 0.0, 0.0), (1.0, 0.5, 0.0), (0.5, 1.0, 0.0), (0.0, 0.5, 0.0)], dtype=np.float32)
+        shape *= advance
+        handle = np.array([(-0.2, 0.0, 0.0), (0.0, -0.2, 0.0), (0.2, 0.0, 0.0), (0.0, 0.2, 0.0)], dtype=np.float32)
+        handle *= advance
+
+        self.splines = [
+            Spline('BEZIER', SplinePoints(co + shape, co + shape + handle, co + shape - handle), use_cyclic_u=True)
+            for co in origin
+        ]
+
+
+class Camera:
+    __slots__ = (
+        "type",
+        "ortho_scale",
+        )
+
+    def __init__(self, ortho_scale=10.0):
+        self.type = 'ORTHO'
+        self.ortho_scale = ortho_scale
+
+    @property
+    def users(self):
+        return _data_users(self)
+
+
+class Image:
+    __slots__ = (
+        "name",
+        "filepath",
+        "size",
+        "library",
+        )
+
+    def __init__(self, name, filepath, size=(256, 256)):
+        self.name = name
+        self.filepath = filepath
+        self.size = size
+        self.library = None
+
+
+class Font:
+    __slots__ = (
+        "filepath",
+        "library",
+        )
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.library = None
+
+
+# ----------------------------------------------------------------------------
+# Objects & Scenes
+
+class DupliObject:
+    __slots__ = (
+        "object",
+        "matrix",
+        )
+
+    def __init__(self, object, matrix):
+        self.object = object
+        self.matrix = matrix
+
+
+class Object:
+    __slots__ = (
+        "name",
+        "type",
+        "data",
+        "location",
+        "_matrix",
+        "bound_box",
+        "parent",
+        "library",
+        "dupli_type",
+        "dupli_list",
+        # [(object, matrix), ...] instanced when the dupli list is created.
+        "dupli_objects",
+        "empty_draw_size",
+        "empty_image_offset",
+        "is_updated",
+        # ID-properties.
+        "_props",
+        )
+
+    def __init__(self, name, data, matrix=None):
+        self.name = name
+        self.data = data
+        if isinstance(data, TextCurve):
+            self.type = 'FONT'
+        elif isinstance(data, Curve):
+            self.type = 'CURVE'
+        elif isinstance(data, Camera):
+            self.type = 'CAMERA'
+        else:
+            self.type = 'EMPTY'
+        self._matrix = Matrix() if matrix is None else matrix
+        self.location = self._matrix.translation
+        self.parent = None
+        self.library = None
+        self.dupli_type = 'NONE'
+        self.dupli_list = []
+        self.dupli_objects = []
+        self.empty_draw_size = 1.0
+        self.empty_image_offset = (-0.5, -0.5)
+        self.is_updated = False
+        self._props = {}
+        self.bounds_update()
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        self._props[key] = value
+
+    @property
+    def matrix_world(self):
+        matrix = self._matrix.copy()
+        matrix._data[:3, 3] = tuple(self.location)
+        return matrix
+
+    def bounds_update(self):
+        if isinstance(self.data, Curve):
+            lo, hi = self.data.bounds()
+        else:
+            lo, hi = (-1.0, -1.0, -1.0), (1.0, 1.0, 1.0)
+        self.bound_box = [
+            (x, y, z)
+            for x in (lo[0], hi[0])
+            for y in (lo[1], hi[1])
+            for z in (lo[2], hi[2])
+        ]
+
+    def update_tag(self):
+        self.is_updated = True
+
+    def dupli_list_create(self, scene):
+        matrix_world = self.matrix_world
+        self.dupli_list = [DupliObject(obj, matrix_world * matrix) for obj, matrix in self.dupli_objects]
+
+    def dupli_list_clear(self):
+        self.dupli_list = []
+
+
+class SceneObjects(list):
+    def __contains__(self, key):
+        # objects are looked up by name (as with Blender's collections).
+        if isinstance(key, str):
+            return any(obj.name == key for obj in self)
+        return super().__contains__(key)
+
+    def link(self, obj):
+        self.append(obj)
+
+    def unlink(self, obj):
+        self.remove(obj)
+
+
+class RenderSettings:
+    __slots__ = (
+        "resolution_x",
+        "resolution_y",
+        )
+
+    def __init__(self, resolution_x=1000, resolution_y=1414):
+        self.resolution_x = resolution_x
+        self.resolution_y = resolution_y
+
+
+class Scene:
+    __slots__ = (
+        "name",
+        "objects",
+        "camera",
+        "render",
+        "background_set",
+        "frame_current",
+        "timeline_markers",
+        )
+
+    def __init__(self, name="Scene"):
+        self.name = name
+        self.objects = SceneObjects()
+        self.camera = None
+        self.render = RenderSettings()
+        self.background_set = None
+        self.frame_current = 1
+        self.timeline_markers = []
+
+    def frame_set(self, frame):
+        self.frame_current = frame
+
+    def update(self):
+        for obj in self.objects:
+            if obj.is_updated:
+                if isinstance(obj.data, TextCurve):
+                    obj.data.layout_update()
+                obj.bounds_update()
+                obj.is_updated = False
+
+
+# ----------------------------------------------------------------------------
+# Module Data
+
+class _DataCurves(list):
+    def new(self, name, type):
+        cu = TextCurve(name) if type == 'FONT' else Curve(name)
+        self.append(cu)
+        return cu
+
+
+class _DataObjects(list):
+    def __init__(self):
+        super().__init__()
+        self._names = set()
+
+    def new(self, name, object_data):
+        # names are unique (as in Blender), eg: "Text", "Text.001".
+        if name in self._names:
+            name_base = name
+            number = 1
+            while name in self._names:
+                name = "%s.%03d" % (name_base, number)
+                number += 1
+        self._names.add(name)
+        obj = Object(name, object_data)
+        self.append(obj)
+        return obj
+
+    def remove(self, obj):
+        super().remove(obj)
+        self._names.discard(obj.name)
+
+
+class _DataCameras(list):
+    def new(self, name):
+        cam = Camera()
+        self.append(cam)
+        return cam
+
+
+class _DataFonts(list):
+    def load(self, filepath):
+        font = Font(filepath)
+        self.append(font)
+        return font
+
+
+class _Data:
+    def __init__(self):
+        self.filepath = ""
+        self.scenes = []
+        self.curves = _DataCurves()
+        self.objects = _DataObjects()
+        self.cameras = _DataCameras()
+        self.fonts = _DataFonts()
+
+
+class _Context:
+    def __init__(self):
+        self.scene = None
+
+
+class _Path:
+    @staticmethod
+    def abspath(filepath, library=None):
+        if filepath.startswith("//"):
+            return os.path.join(os.path.dirname(data.filepath), filepath[2:])
+        return filepath
+
+
+def _data_users(id_data):
+    return sum(1 for obj in data.objects if obj.data is id_data)
+
+
+data = _Data()
+context = _Context()
+path = _Path()
+
+
+def reset(filepath="benchmark.blend"):
+    """
+    Clear all data, returning a new empty scene (set as the context scene).
+    """
+    data.__init__()
+    data.filepath = filepath
+    scene = Scene()
+    data.scenes.append(scene)
+    context.scene = scene
+    return scene
@@ -0,0 +1,160 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+# Copyright Campbell Barton
+
+"""
+Minimal stand-in for Blender's ``mathutils`` module (benchmarks only).
+
+Only the parts used by ``blend2ps`` & ``rst2blend`` are implemented,
+values are stored as single precision floats like Blender.
+"""
+
+import numpy as np
+
+
+class Vector:
+    __slots__ = (
+        "_data",
+        )
+
+    def __init__(self, seq=(0.0, 0.0, 0.0)):
+        self._data = np.array(seq, dtype=np.float32)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        value = self._data[index]
+        if isinstance(index, slice):
+            return tuple(value.tolist())
+        return float(value)
+
+    def __setitem__(self, index, value):
+        self._data[index] = value
+
+    def __iter__(self):
+        return iter(self._data.tolist())
+
+    def __add__(self, other):
+        return Vector(self._data + other._data)
+
+    def __sub__(self, other):
+        return Vector(self._data - other._data)
+
+    def __repr__(self):
+        return "Vector(%r)" % (tuple(self),)
+
+    def _axis_get(index):
+        return property(
+            lambda self: float(self._data[index]),
+            lambda self, value: self._data.__setitem__(index, value),
+        )
+
+    x = _axis_get(0)
+    y = _axis_get(1)
+    z = _axis_get(2)
+
+    del _axis_get
+
+    @property
+    def xy(self):
+        return Vector(self._data[:2])
+
+    @xy.setter
+    def xy(self, value):
+        self._data[:2] = tuple(value)
+
+    @property
+    def xyz(self):
+        return Vector(self._data[:3])
+
+    @xyz.setter
+    def xyz(self, value):
+        self._data[:3] = tuple(value)
+
+    @property
+    def length(self):
+        return float(np.sqrt((self._data.astype(np.float64) ** 2).sum()))
+
+    def angle_signed(self, other):
+        a = self._data.astype(np.float64)
+        b = other._data.astype(np.float64)
+        return -float(np.arctan2(a[0] * b[1] - a[1] * b[0], a[0] * b[0] + a[1] * b[1]))
+
+    def copy(self):
+        return Vector(self._data)
+
+
+class Matrix:
+    __slots__ = (
+        "_data",
+        )
+
+    def __init__(self, rows=None):
+        if rows is None:
+            self._data = np.identity(4, dtype=np.float32)
+        else:
+            self._data = np.array([list(row) for row in rows], dtype=np.float32)
+
+    @classmethod
+    def Identity(cls, size):
+        return cls(np.identity(size))
+
+    @classmethod
+    def Scale(cls, factor, size):
+        data = np.identity(size) * factor
+        if size == 4:
+            data[3, 3] = 1.0
+        return cls(data)
+
+    @classmethod
+    def Translation(cls, vector):
+        data = np.identity(4)
+        data[:3, 3] = tuple(vector)[:3]
+        return cls(data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        return Vector(self._data[index])
+
+    def __iter__(self):
+        return (Vector(row) for row in self._data)
+
+    def __mul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix(self._data.astype(np.float64) @ other._data.astype(np.float64))
+        co = np.ones(4)
+        co[:len(other)] = other._data
+        return Vector((self._data.astype(np.float64) @ co)[:len(other)])
+
+    def copy(self):
+        return Matrix(self._data)
+
+    def inverted(self):
+        return Matrix(np.linalg.inv(self._data.astype(np.float64)))
+
+    @property
+    def median_scale(self):
+        return float(np.sqrt((self._data[:3, :3].astype(np.float64) ** 2).sum(axis=0)).mean())
+
+    @property
+    def translation(self):
+        return Vector(self._data[:3, 3])
@@ -0,0 +1,164 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+# Copyright Campbell Barton
+
+"""
+Synthetic scenes & documents for benchmarks,
+these use the stand-in ``bpy`` module (see ``benchmarks/fake``).
+"""
+
+import bpy
+from mathutils import Matrix
+
+
+WORDS = (
+    "lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit",
+    "sed", "do", "eiusmod", "tempor", "incididunt", "ut", "labore", "et", "dolore",
+    "magna", "aliqua", "enim", "ad", "minim", "veniam", "quis", "nostrud",
+    )
+
+
+def text_random(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def curve_random(rng, name, materials, points=8, splines=2):
+    import numpy as np
+    splines_list = []
+    for spline_index in range(splines):
+        n = rng.randint(2, points)
+        co = np.zeros((n, 3), dtype=np.float32)
+        co[:, :2] = np.array([(rng.uniform(-1.0, 1.0), rng.uniform(-1.0, 1.0)) for _ in range(n)])
+        use_cyclic = rng.random() < 0.5
+        material_index = rng.randrange(max(1, len(materials)))
+        if rng.random() < 0.5:
+            handle = np.array([(rng.uniform(-0.2, 0.2), rng.uniform(-0.2, 0.2), 0.0) for _ in range(n)])
+            spline = bpy.Spline('BEZIER', bpy.SplinePoints(co, co - handle, co + handle), use_cyclic, material_index)
+        else:
+            co_4d = np.ones((n, 4), dtype=np.float32)
+            co_4d[:, :3] = co
+            spline = bpy.Spline('POLY', bpy.SplinePoints(co_4d), use_cyclic, material_index)
+        splines_list.append(spline)
+
+    return bpy.Curve(
+        name, splines_list, materials,
+        fill_mode=rng.choice(('BOTH', 'NONE')),
+        bevel_depth=rng.uniform(0.0, 0.02),
+    )
+
+
+def matrix_random(rng, extent=4.0, scale=(0.1, 1.0)):
+    return (Matrix.Translation((rng.uniform(-extent, extent), rng.uniform(-extent, extent), rng.uniform(-1.0, 1.0))) *
+            Matrix.Scale(rng.uniform(*scale), 4))
+
+
+def scene_blend2ps(curves=1000,
+                   texts=50,
+                   text_words=40,
+                   images=10,
+                   duplis=20,
+                   dupli_instances=20,
+                   background=200,
+                   image_filepath="",
+                   seed=0):
+    """
+    Create a scene to export with ``blend2ps``, set as the context scene.
+
+    :arg curves: Number of curve objects.
+    :arg texts: Number of text objects (each character is a spline).
+    :arg images: Number of image empties.
+    :arg duplis: Number of dupli (group instance) empties, each instancing ``dupli_instances`` curves.
+    :arg background: Number of curve objects in a background set.
+    """
+    import random
+    rng = random.Random(seed)
+
+    scene = bpy.reset()
+
+    cam_ob = bpy.Object("Camera", bpy.Camera(ortho_scale=10.0), Matrix.Translation((0.0, 0.0, 10.0)))
+    scene.objects.link(cam_ob)
+    scene.camera = cam_ob
+
+    materials = [
+        bpy.Material("Material.%03d" % i, (rng.random(), rng.random(), rng.random()))
+        for i in range(8)
+    ]
+
+    curve_objects = []
+    for i in range(curves):
+        cu = curve_random(rng, "Curve.%05d" % i, rng.sample(materials, rng.randint(0, 3)))
+        obj = bpy.Object("Curve.%05d" % i, cu, matrix_random(rng))
+        scene.objects.link(obj)
+        curve_objects.append(obj)
+
+    for i in range(texts):
+        cu = bpy.TextCurve("Text.%05d" % i)
+        cu.size = rng.uniform(0.05, 0.3)
+        cu.text_boxes[0].width = rng.uniform(2.0, 6.0)
+        cu.body = text_random(rng, text_words)
+        cu.layout_update()
+        cu.materials = [rng.choice(materials)]
+        obj = bpy.Object("Text.%05d" % i, cu, matrix_random(rng, scale=(1.0, 1.0)))
+        scene.objects.link(obj)
+
+    for i in range(images):
+        image = bpy.Image("Image.%03d" % i, image_filepath, (rng.randint(64, 1024), rng.randint(64, 1024)))
+        obj = bpy.Object("Image.%03d" % i, image, matrix_random(rng, scale=(0.5, 2.0)))
+        scene.objects.link(obj)
+
+    for i in range(duplis):
+        obj = bpy.Object("Dupli.%03d" % i, None, matrix_random(rng, scale=(1.0, 1.0)))
+        obj.dupli_type = 'GROUP'
+        if curve_objects:
+            obj.dupli_objects = [
+                (rng.choice(curve_objects), matrix_random(rng, extent=1.0, scale=(0.2, 0.5)))
+                for _ in range(dupli_instances)
+            ]
+        scene.objects.link(obj)
+
+    if background:
+        scene_set = bpy.Scene("Background")
+        for i in range(background):
+            cu = curve_random(rng, "Background.%05d" % i, rng.sample(materials, 1))
+            scene_set.objects.link(bpy.Object("Background.%05d" % i, cu, matrix_random(rng)))
+        scene.background_set = scene_set
+
+    return scene
+
+
+def document_rst(sections=10, paragraphs=5, words=60, list_items=4, seed=0):
+    """
+    Return a reStructuredText document with headings, formatted paragraphs & lists.
+    """
+    import random
+    rng = random.Random(seed)
+
+    lines = []
+    for i in range(sections):
+        title = text_random(rng, 3).title()
+        lines.extend((title, ("=" if i == 0 else "-") * len(title), ""))
+        for j in range(paragraphs):
+            text = text_random(rng, words).split()
+            text[rng.randrange(len(text))] = "*%s*" % rng.choice(WORDS)
+            text[rng.randrange(len(text))] = "**%s**" % rng.choice(WORDS)
+            lines.extend((" ".join(text).capitalize() + ".", ""))
+            if j % 2 == 0:
+                for k in range(list_items):
+                    lines.extend((("- " if j % 4 == 0 else "#. ") + text_random(rng, 8) + ".", ""))
+    return "\n".join(lines)
@@ -22,7 +22,16 @@
 # Postscript writing functions
 
 
-def ps_from_poly(fw, points, color=(0.0, 0.0, 0.0)):
+def ps_from_poly(fw, points, color=(0.0, 0.0, 0.0), precision=None):
+    if precision is not None:
+        import numpy as np
+        co = np.array([p[:2] for p in points], dtype=np.float32)
+        fw(PS_PAINT_FMT_COMPACT["begin"])
+        ps_from_subpaths_compact(fw, [("M" + ("L" * (len(co) - 1)), co, True)], precision)
+        fw(PS_PAINT_FMT_COMPACT["color_fill"] % color)
+        fw(PS_PAINT_FMT_COMPACT["fill"])
+        return
+
     fw("newpath\n")
     for i, p in enumerate(points):
         fw("%.6f %.6f %s\n" % (p[0], p[1], "moveto" if i == 0 else "lineto"))
@@ -31,84 +40,812 @@ def ps_from_poly(fw, points, color=(0.0, 0.0, 0.0)):
     fw("fill\n")
 
 
-def ps_from_obj_curve(fw, obj, matrix):
+class PSMatrix:
+    """
+    Compact object matrix, used in place of a 4x4 matrix for each object instance.
 
-    def spline_segments_bezier(spline):
-        points = spline.bezier_points[:]
+    Only stores the rows which project onto the page (x, y)
+    and the median scale (for line widths).
+    """
+    __slots__ = (
+        # (2, 4) float32 array.
+        "rows",
+        "median_scale",
+        )
+
+    def __init__(self, rows, median_scale):
+        self.rows = rows
+        self.median_scale = median_scale
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+
+def ps_matrix_as_array(matrix):
+    import numpy as np
+    if isinstance(matrix, PSMatrix):
+        matrix_array = np.identity(4, dtype=np.float32)
+        matrix_array[:2] = matrix.rows
+        return matrix_array
+    return np.array(matrix, dtype=np.float32)
+
+
+def ps_points_transform_xy(matrix, co):
+    """
+    Project an (n, 3) float32 array of points by a 4x4 matrix (as an array),
+    returning the (n, 2) x/y coordinates.
+
+    Matches ``matrix * Vector`` in mathutils exactly,
+    (single precision products, summed in double precision).
+    """
+    import numpy as np
+    prod = (co[:, None, :] * matrix[None, :2, :3]).astype(np.float64)
+    xy = ((prod[..., 0] + prod[..., 1]) + prod[..., 2]) + matrix[:2, 3].astype(np.float64)
+    return xy.astype(np.float32)
+
+
+def ps_spline_arrays(spline):
+    """
+    Return (co, handle_left, handle_right) as (n, 3) float32 arrays,
+    handles are None for non bezier splines.
+    """
+    import numpy as np
+    if spline.type == 'BEZIER':
+        points = spline.bezier_points
+        n = len(points)
+        arrays = []
+        for attr in ("co", "handle_left", "handle_right"):
+            arr = np.empty(n * 3, dtype=np.float32)
+            points.foreach_get(attr, arr)
+            arrays.append(arr.reshape(n, 3))
+        return tuple(arrays)
+    else:
+        points = spline.points
+        n = len(points)
+        arr = np.empty(n * 4, dtype=np.float32)
+        points.foreach_get("co", arr)
+        return arr.reshape(n, 4)[:, :3], None, None
+
+
+def ps_subpath_bezier(co, handle_left, handle_right, use_cyclic):
+    """
+    Return an (ops, coords) pair from transformed bezier arrays,
+    segments match the order points are written in.
+    """
+    import numpy as np
+    n = len(co)
+    if use_cyclic:
+        index_prev = np.roll(np.arange(n), 1)
+        index_curr = np.arange(n)
+    else:
+        if n < 2:
+            return "", co[:0]
+        index_prev = np.arange(n - 1)
+        index_curr = np.arange(1, n)
+
+    coords = np.empty((1 + (len(index_curr) * 3), 2), dtype=co.dtype)
+    coords[0] = co[index_prev[0]]
+    coords[1::3] = handle_right[index_prev]
+    coords[2::3] = handle_left[index_curr]
+    coords[3::3] = co[index_curr]
+    return "M" + ("C" * len(index_curr)), coords
+
+
+def ps_subpath_poly(co):
+    return ("M" + ("L" * (len(co) - 1))) if len(co) else "", co
+
+
+PS_PATH_FMT = {
+    "M": "%.6f %.6f moveto\n",
+    "L": "%.6f %.6f lineto\n",
+    "C": "%.6f %.6f %.6f %.6f %.6f %.6f curveto\n",
+    "Z": "closepath\n",
+    }
+
+
+def ps_from_subpaths(fw, subpaths, path_fmt=PS_PATH_FMT):
+    """
+    Write a list of (ops, coords, use_cyclic) subpaths,
+    all coordinates are formatted in a single operation.
+    """
+    import numpy as np
+    fmt = []
+    coords = []
+    for ops, co, use_cyclic in subpaths:
+        fmt.extend(map(path_fmt.__getitem__, ops))
+        if use_cyclic:
+            fmt.append(path_fmt["Z"])
+        coords.append(co)
+    if fmt:
+        fw("".join(fmt) % tuple(np.concatenate(coords).ravel().tolist()))
+
+
+def ps_subpath_segments(ops):
+    """
+    Return (is_curve, index_start, index_end) arrays for each segment of a subpath,
+    indices are the first & last points of each segment (in the subpath coords).
+    """
+    import numpy as np
+    is_curve = np.frombuffer(ops[1:].encode("ascii"), dtype=np.uint8) == ord("C")
+    segment_len = np.where(is_curve, 3, 1)
+    index_end = np.cumsum(segment_len)
+    return is_curve, index_end - segment_len, index_end
+
+
+# ----------------------------------------------------------------------------
+# Compact Encoding
+#
+# Paths use one letter aliases (defined in the prolog) & relative operators,
+# coordinates are written using a fixed number of decimal places without trailing zeros.
+
+PS_COMPACT_PROLOG = (
+    "/M {moveto} bind def\n"
+    "/l {rlineto} bind def\n"
+    "/c {rcurveto} bind def\n"
+    "/h {closepath} bind def\n"
+    "/n {newpath} bind def\n"
+    "/g {setrgbcolor} bind def\n"
+    "/w {setlinewidth} bind def\n"
+    "/f {fill} bind def\n"
+    "/s {stroke} bind def\n"
+    )
+
+
+# Fractional parts are looked up for precisions up to this (a table of ``10 ** precision`` strings).
+PS_NUMBER_FRACTIONS_PRECISION_MAX = 4
+
+# precision -> array of fractional parts (see 'ps_number_fractions').
+_ps_number_fractions_cache = {}
+
+
+def ps_number_fractions(values, precision):
+    """
+    Return the fractional part of each of the (positive) integer ``values``
+    in units of ``10 ** -precision``, without trailing zeros (``50`` -> ``.5``, ``0`` -> ``""``).
+    """
+    import numpy as np
+    if precision > PS_NUMBER_FRACTIONS_PRECISION_MAX:
+        return [("." + ("%0*d" % (precision, value)).rstrip("0")).rstrip(".") for value in values.tolist()]
+
+    fractions = _ps_number_fractions_cache.get(precision)
+    if fractions is None:
+        fractions = _ps_number_fractions_cache[precision] = np.array([
+            ("." + ("%0*d" % (precision, value)).rstrip("0")).rstrip(".")
+            for value in range(10 ** precision)
+        ], dtype=object)
+    return fractions[values]
+
+
+def ps_number_args(values, precision):
+    """
+    Return format arguments for integer ``values`` in units of ``10 ** -precision``,
+    three for each number, formatted by ``"%s%d%s"`` without trailing zeros
+    (``-150`` -> ``-1.5``, ``200`` -> ``2`` for a precision of 2).
+
+    This avoids formatting floats & removing their trailing zeros from the text afterwards.
+    """
+    import numpy as np
+    scale = 10 ** precision
+    values_abs = np.abs(values)
+    args = np.empty((len(values), 3), dtype=object)
+    args[:, 0] = ""
+    args[values < 0, 0] = "-"
+    args[:, 1] = values_abs // scale
+    args[:, 2] = ps_number_fractions(values_abs % scale, precision)
+    return args.ravel().tolist()
+
+
+def ps_from_subpaths_compact(fw, subpaths, precision):
+    """
+    Write a list of (ops, coords, use_cyclic) subpaths using the compact prolog,
+    each subpath starts with an absolute move followed by relative segments.
+
+    Coordinates are rounded to ``precision`` decimal places before calculating the offsets,
+    so rounding errors don't accumulate along the path.
+    """
+    import numpy as np
+    num = "%s%d%s"
+    path_fmt = {
+        "M": num + " " + num + " M\n",
+        "L": num + " " + num + " l\n",
+        "C": " ".join((num,) * 6) + " c\n",
+        "Z": "h\n",
+    }
+    scale = 10.0 ** precision
+
+    fmt = []
+    ops_all = []
+    coords = []
+    for ops, co, use_cyclic in subpaths:
+        if not ops:
+            continue
+        fmt.extend(map(path_fmt.__getitem__, ops))
+        if use_cyclic:
+            fmt.append(path_fmt["Z"])
+        ops_all.append(ops)
+        coords.append(co)
+    if not fmt:
+        return
 
-        if spline.use_cyclic_u:
-            p_prev = points[-1]
+    # offsets of all subpaths are calculated at once.
+    co_int = np.round(np.concatenate(coords).astype(np.float64) * scale).astype(np.int64)
+    ops_code = np.frombuffer("".join(ops_all).encode("ascii"), dtype=np.uint8)
+    op_len = np.where(ops_code == ord("C"), 3, 1)
+    # all points of a segment are relative to its start (the last point of the previous segment),
+    # moves are absolute.
+    index_start = np.repeat(np.cumsum(op_len) - op_len - 1, op_len)
+    is_rel = np.repeat(ops_code != ord("M"), op_len)
+    co_int[is_rel] -= co_int[index_start[is_rel]]
+
+    fw("".join(fmt) % tuple(ps_number_args(co_int.ravel(), precision)))
+
+
+def ps_curve_arrays(cu):
+    """
+    Extract all splines of a curve in bulk.
+
+    Return a list of (material_index, use_cyclic, totpoint, is_bezier) for each spline
+    and a single (n, 3) array of all points.
+    """
+    import numpy as np
+
+    splines = []
+    arrays = []
+    for spline in cu.splines:
+        # nurbs aren't supported.
+        if spline.type not in {'BEZIER', 'POLY'}:
+            continue
+        co, handle_left, handle_right = ps_spline_arrays(spline)
+        if handle_left is None:
+            arrays.append(co)
         else:
-            points.append(points.pop(0))
-            p_prev = points[-1]
-            points.pop()
-
-        for p in points:
-            yield (
-                matrix * p_prev.co,
-                matrix * p_prev.handle_right,
-                matrix * p.handle_left,
-                matrix * p.co)
-            p_prev = p
-
-    def ps_from_material(material):
-        if material is not None:
-            rgb = material.diffuse_color[:]
+            arrays.extend((co, handle_left, handle_right))
+        splines.append((spline.material_index, spline.use_cyclic_u, len(co), handle_left is not None))
+
+    if not arrays:
+        return splines, np.empty((0, 3), dtype=np.float32)
+
+    return splines, np.concatenate(arrays)
+
+
+def ps_curve_subpaths(splines, xy):
+    """
+    Split 2D points from :func:`ps_curve_arrays` into subpaths.
+
+    Return a list of (material_index, use_cyclic, (ops, coords, use_cyclic)).
+    """
+    result = []
+    i = 0
+    for material_index, use_cyclic, n, is_bezier in splines:
+        if is_bezier:
+            ops, coords = ps_subpath_bezier(xy[i:i + n], xy[i + n:i + 2 * n], xy[i + 2 * n:i + 3 * n], use_cyclic)
+            i += 3 * n
         else:
-            rgb = 0.0, 0.0, 0.0
-        fw("%.4f %.4f %.4f setrgbcolor\n" % rgb)
+            ops, coords = ps_subpath_poly(xy[i:i + n])
+            i += n
+        result.append((material_index, use_cyclic, (ops, coords, use_cyclic)))
+    return result
 
-    fw("newpath\n")
+
+# ----------------------------------------------------------------------------
+# Path Simplification
+#
+# Paths are simplified within a tolerance (in page units),
+# used to skip detail which is below the resolution of the output device.
+
+def ps_points_segment_distance(co, a, b):
+    """
+    Return the distance of each point in ``co`` to the segments (``a``, ``b``),
+    where ``a`` and ``b`` are single points or arrays matching ``co``.
+    """
+    import numpy as np
+    ab = b - a
+    ab_len_sq = (ab * ab).sum(axis=-1)
+    fac = ((co - a) * ab).sum(axis=-1) / np.where(ab_len_sq == 0.0, 1.0, ab_len_sq)
+    fac = np.clip(fac, 0.0, 1.0)
+    delta = co - (a + (ab * fac[..., None]))
+    return np.sqrt((delta * delta).sum(axis=-1))
+
+
+def ps_points_simplify(co, tolerance):
+    """
+    Return the indices of points to keep from a poly-line,
+    removing points within ``tolerance`` of the simplified line (Ramer-Douglas-Peucker).
+
+    The first and last points are always kept.
+    """
+    import numpy as np
+    n = len(co)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j - i < 2:
+            continue
+        dist = ps_points_segment_distance(co[i + 1:j], co[i], co[j])
+        k = int(dist.argmax())
+        if dist[k] > tolerance:
+            k += i + 1
+            keep[k] = True
+            stack.append((i, k))
+            stack.append((k, j))
+    return np.flatnonzero(keep)
+
+
+def ps_subpath_simplify(ops, co, tolerance):
+    """
+    Simplify an (ops, coords) subpath (see :func:`ps_subpath_bezier` & :func:`ps_subpath_poly`),
+    the result may mix line & curve segments.
+
+    - Curve segments which are flat within half the tolerance become lines.
+    - Runs of lines are simplified within half the tolerance (merging collinear & sub-pixel segments).
+    """
+    import numpy as np
+
+    if len(ops) < 2:
+        return "", co[:0]
+
+    co_calc = co.astype(np.float64)
+    tolerance_half = tolerance / 2.0
+
+    is_curve, index_start, index_end = ps_subpath_segments(ops)
+
+    is_line = ~is_curve
+    if is_curve.any():
+        # the curve is within the convex hull of its points,
+        # so the distance of the handles to the chord bounds the error.
+        i_start = index_start[is_curve]
+        i_end = index_end[is_curve]
+        dist = np.maximum(
+            ps_points_segment_distance(co_calc[i_start + 1], co_calc[i_start], co_calc[i_end]),
+            ps_points_segment_distance(co_calc[i_start + 2], co_calc[i_start], co_calc[i_end]),
+        )
+        is_line[is_curve] = dist <= tolerance_half
+
+    ops_simple = ["M"]
+    index_simple = [0]
+    run = [0]
+
+    def run_flush():
+        if len(run) > 1:
+            run_array = np.array(run)
+            index = run_array[ps_points_simplify(co_calc[run_array], tolerance_half)[1:]]
+            ops_simple.append("L" * len(index))
+            index_simple.extend(index.tolist())
+
+    for i_end, is_line_segment in zip(index_end.tolist(), is_line.tolist()):
+        if is_line_segment:
+            run.append(i_end)
+        else:
+            run_flush()
+            run = [i_end]
+            ops_simple.append("C")
+            index_simple.extend((i_end - 2, i_end - 1, i_end))
+    run_flush()
+
+    return "".join(ops_simple), co[index_simple]
+
+
+def ps_curve_subpaths_simplify(subpaths, tolerance, is_fill_ok, line_width):
+    """
+    Simplify subpaths from :func:`ps_curve_subpaths`,
+    subpaths which would paint an area smaller than the tolerance are removed.
+    """
+    result = []
+    for material_index, use_cyclic, (ops, coords, use_cyclic_path) in subpaths:
+        ops, coords = ps_subpath_simplify(ops, coords, tolerance)
+        if not ops:
+            continue
+        if is_fill_ok and use_cyclic:
+            size = 0.0
+        else:
+            # open splines of filled curves use the current line width.
+            size = line_width if not is_fill_ok else None
+        if size is not None:
+            size += (coords.max(axis=0) - coords.min(axis=0)).max()
+            if size <= tolerance:
+                continue
+        result.append((material_index, use_cyclic, (ops, coords, use_cyclic_path)))
+    return result
+
+
+class PSDefs:
+    """
+    Data shared between instances, each written once for every page using it as a named definition
+    (so pages don't depend on each other).
+
+    - Paths (``use_paths``) are procedures,
+      each subpath is stored relative to its first point (in object space),
+      so identical glyphs and shared curve data resolve to the same procedure.
+    - Images (``use_images``) are embedded as reusable ASCII85 encoded streams,
+      keyed by their file path (read again for each page).
+    """
+    __slots__ = (
+        "use_paths",
+        "use_images",
+        # decimal places for compact encoding or None.
+        "precision",
+        # (ops, use_cyclic, coords) -> (name, definition)
+        "procs",
+        # filepath -> name
+        "images",
+        # name -> definition, for procedures used since definitions were last written.
+        "procs_used",
+        # name -> filepath, for images used since definitions were last written.
+        "images_used",
+        )
+
+    def __init__(self, use_paths=True, use_images=False, precision=None):
+        self.use_paths = use_paths
+        self.use_images = use_images
+        self.precision = precision
+        self.procs = {}
+        self.images = {}
+        self.procs_used = {}
+        self.images_used = {}
+
+    def proc_from_subpath(self, ops, coords, use_cyclic):
+        import numpy as np
+        coords_rel = coords - coords[0]
+        # '+ 0.0' so '-0.0' and '0.0' share a key.
+        key = ops, use_cyclic, (np.round(coords_rel, 6 if self.precision is None else self.precision) + 0.0).tobytes()
+        item = self.procs.get(key)
+        if item is None:
+            name = "G%d" % len(self.procs)
+            body = []
+            if self.precision is None:
+                ps_from_subpaths(body.append, [(ops, coords_rel, use_cyclic)])
+            else:
+                ps_from_subpaths_compact(body.append, [(ops, coords_rel, use_cyclic)], self.precision)
+            item = self.procs[key] = name, "/%s {_n currentmatrix pop translate\n%s_n setmatrix} bind def\n" % (
+                name, "".join(body))
+        name, definition = item
+        self.procs_used[name] = definition
+        return name
+
+    def image_from_filepath(self, filepath):
+        name = self.images.get(filepath)
+        if name is None:
+            name = self.images[filepath] = "Im%d" % len(self.images)
+        self.images_used[name] = filepath
+        return name
+
+    @staticmethod
+    def image_write(fw, name, filepath):
+        import base64
+        with open(filepath, 'rb') as file:
+            data = base64.a85encode(file.read(), wrapcol=78).decode("ascii") + "~>"
+        # the stream reads all data up to the '~>' when it's created,
+        # the line count includes the line reading the data.
+        fw("%%%%BeginData: %d ASCII Lines\n" % (data.count("\n") + 2))
+        fw("/%s currentfile /ASCII85Decode filter /ReusableStreamDecode filter\n" % name)
+        fw(data)
+        fw("\n%%EndData\n")
+        fw("def\n")
+
+    def write_pending(self, fw):
+        """
+        Write the definitions used since this was last called (in the setup of each page).
+        """
+        for definition in self.procs_used.values():
+            fw(definition)
+        self.procs_used.clear()
+        for name, filepath in self.images_used.items():
+            self.image_write(fw, name, filepath)
+        self.images_used.clear()
+
+
+PS_DEFS_PROLOG = (
+    "/_m matrix def\n"
+    "/_n matrix def\n"
+    )
+
+
+def ps_from_subpaths_defs(fw, subpaths, defs, matrix):
+    """
+    Write object space subpaths as references to procedures in ``defs``,
+    placed using the 2D part of ``matrix``.
+    """
+    subpaths = [subpath for subpath in subpaths if subpath[0]]
+    if not subpaths:
+        return
+
+    fw("_m currentmatrix pop [%.9g %.9g %.9g %.9g %.9g %.9g] concat\n" %
+       (matrix[0][0], matrix[1][0], matrix[0][1], matrix[1][1], matrix[0][3], matrix[1][3]))
+    fmt = "%.6f %.6f %s\n" if defs.precision is None else ("%%.%df %%.%df %%s\n" % (defs.precision, defs.precision))
+    fw("".join([
+        fmt % (co[0][0], co[0][1], defs.proc_from_subpath(ops, co, use_cyclic))
+        for ops, co, use_cyclic in subpaths
+    ]))
+    fw("_m setmatrix\n")
+
+
+def ps_curve_line_width(obj, matrix):
+    """
+    Return the line width of a curve, None when it's filled.
+
+    Note that open splines of filled curves are stroked using the current line width
+    (as set by the last stroked curve).
+    """
+    cu = obj.data
+    if (cu.fill_mode != 'NONE') and (cu.dimensions != '3D'):
+        return None
+    return (2.0 * cu.bevel_depth) * matrix.median_scale
+
+
+def ps_curve_buckets(obj, matrix, use_local=False, arrays=None, cull_bounds=None, tolerance=None):
+    """
+    Extract the paths of a curve object in the order they're painted.
+
+    Return (line_width, is_local, buckets),
+    ``line_width`` is None when the curve is filled (otherwise it's set before painting),
+    ``buckets`` is a list of (is_fill, rgb, subpaths).
+
+    With ``use_local``, subpaths of curves which are flat in object space
+    are kept in object space (``is_local`` is set).
+
+    ``arrays`` may be passed in when already extracted by :func:`ps_curve_arrays`.
+
+    With ``cull_bounds``, splines outside the page are skipped (see :func:`ps_coords_in_bounds`).
+
+    With ``tolerance`` (in page units), subpaths are simplified (see :func:`ps_subpath_simplify`).
+    """
+    import numpy as np
 
     cu = obj.data
     is_fill_ok = (cu.fill_mode != 'NONE') and (cu.dimensions != '3D')
+    line_width = ps_curve_line_width(obj, matrix)
 
-    if not is_fill_ok:
-        fw("%.6f setlinewidth\n" % ((2.0 * cu.bevel_depth) * matrix.median_scale))
+    splines, co = ps_curve_arrays(cu) if arrays is None else arrays
 
+    is_local = use_local and (not co[:, 2].any())
+    if is_local:
+        subpaths = ps_curve_subpaths(splines, co[:, :2])
+    else:
+        subpaths = ps_curve_subpaths(splines, ps_points_transform_xy(ps_matrix_as_array(matrix), co))
+        if cull_bounds is not None:
+            margin = ps_stroke_margin(line_width)
+            subpaths = [item for item in subpaths if ps_coords_in_bounds(item[2][1], cull_bounds, margin)]
+
+    if tolerance is not None:
+        if is_local:
+            # object space, use the largest stretch (singular value) so the error on the page
+            # is within the tolerance, axis scales are smaller than this for sheared matrices.
+            scale = float(np.linalg.norm(ps_matrix_as_array(matrix)[:2, :2], 2))
+        else:
+            scale = 1.0
+        if scale != 0.0:
+            subpaths = ps_curve_subpaths_simplify(
+                subpaths, tolerance / scale, is_fill_ok,
+                (line_width / scale) if line_width is not None else None)
+
+    buckets = []
+    # (is_fill, material_index) -> subpaths
+    buckets_map = {}
     for is_fill in ((False, True) if is_fill_ok else (False,)):
         for material_index, material in enumerate(cu.materials if cu.materials else (None,)):
-            for spline in cu.splines:
-                if spline.material_index == material_index:
-
-                    if is_fill_ok and (spline.use_cyclic_u != is_fill):
-                        continue
-
-                    if spline.type == 'POLY':
-                        for i, p in enumerate(spline.points):
-                            p = matrix * p.co.xyz
-                            fw("%.6f %.6f %s\n" % (p[0], p[1], "moveto" if i == 0 else "lineto"))
-                        if spline.use_cyclic_u:
-                            fw("closepath\n")
-
-                    elif spline.type == 'BEZIER':
-                        i = 0
-                        for pa, pah, pbh, pb in spline_segments_bezier(spline):
-                            if i == 0:
-                                fw("%.6f %.6f moveto\n" % pa[:2])
-                            fw("%.6f %.6f %.6f %.6f %.6f %.6f curveto\n" % (pah[:2] + pbh[:2] + pb[:2]))
-                            i += 1
-                        if spline.use_cyclic_u:
-                            fw("closepath\n")
-
-            ps_from_material(material)
-
-            if is_fill:
-                fw("fill\n")
+            if material is not None:
+                rgb = material.diffuse_color[:]
             else:
-                fw("stroke\n")
+                rgb = 0.0, 0.0, 0.0
+            bucket = buckets_map[is_fill, material_index] = []
+            buckets.append((is_fill, rgb, bucket))
+
+    # splines with a material index out of range aren't written.
+    for material_index, use_cyclic, subpath in subpaths:
+        bucket = buckets_map.get((is_fill_ok and use_cyclic, material_index))
+        if bucket is not None:
+            bucket.append(subpath)
+
+    return line_width, is_local, buckets
+
+
+def ps_subpaths_bounds(subpaths, matrix=None):
+    """
+    Return the (x_min, y_min, x_max, y_max) bounds of subpaths,
+    ``matrix`` transforms object space subpaths (the bounds are transformed, so may be larger).
+    """
+    import numpy as np
+    co = np.concatenate([coords for ops, coords, use_cyclic in subpaths])
+    co_min = co.min(axis=0)
+    co_max = co.max(axis=0)
+    if matrix is not None:
+        corners = np.array([
+            (co_min[0], co_min[1], 0.0),
+            (co_min[0], co_max[1], 0.0),
+            (co_max[0], co_max[1], 0.0),
+            (co_max[0], co_min[1], 0.0),
+        ], dtype=np.float32)
+        corners = ps_points_transform_xy(ps_matrix_as_array(matrix), corners)
+        co_min = corners.min(axis=0)
+        co_max = corners.max(axis=0)
+    return (float(co_min[0]), float(co_min[1]), float(co_max[0]), float(co_max[1]))
+
+
+class PSBatch:
+    """
+    Merge paths of consecutive objects painted with the same color, fill mode & line width,
+    so they're painted using a single operator.
+
+    Filled paths are only merged when they don't overlap the paths already merged,
+    since overlapping paths with opposite winding would leave holes.
+    """
+    __slots__ = (
+        "fw",
+        # PS_PAINT_FMT or PDF_PAINT_FMT.
+        "paint_fmt",
+        # (is_fill, color, line_width) of the pending paths or None.
+        "key",
+        # text of the pending paths.
+        "paths",
+        # (x_min, y_min, x_max, y_max) of the pending paths.
+        "bounds",
+        # line width for stroking (None until set, uses the default).
+        "line_width",
+        "line_width_written",
+        # number of paths & paint operations written.
+        "tot_paths",
+        "tot_paint",
+        )
+
+    def __init__(self, fw, paint_fmt):
+        self.fw = fw
+        self.paint_fmt = paint_fmt
+        self.key = None
+        self.paths = []
+        self.bounds = None
+        self.line_width = None
+        self.line_width_written = None
+        self.tot_paths = 0
+        self.tot_paint = 0
+
+    def paint(self, is_fill, rgb, path, bounds):
+        """
+        Paint ``path`` (text), merging it with the pending paths when possible.
+        """
+        paint_fmt = self.paint_fmt
+        if is_fill:
+            key = (True, paint_fmt["color_fill"] % rgb, None)
+        else:
+            key = (False, paint_fmt["color_stroke"] % rgb, self.line_width)
+
+        if key == self.key and not (is_fill and (
+                (bounds[0] <= self.bounds[2]) and (bounds[2] >= self.bounds[0]) and
+                (bounds[1] <= self.bounds[3]) and (bounds[3] >= self.bounds[1]))):
+            self.paths.append(path)
+            self.bounds = (
+                min(bounds[0], self.bounds[0]), min(bounds[1], self.bounds[1]),
+                max(bounds[2], self.bounds[2]), max(bounds[3], self.bounds[3]),
+            )
+        else:
+            self.flush()
+            self.key = key
+            self.paths.append(path)
+            self.bounds = bounds
+        self.tot_paths += 1
+
+    def flush(self):
+        """
+        Write the pending paths, must run before writing anything else.
+        """
+        if self.key is None:
+            return
+        fw = self.fw
+        paint_fmt = self.paint_fmt
+        is_fill, color, line_width = self.key
+        if (not is_fill) and (line_width != self.line_width_written):
+            fw(paint_fmt["line_width"] % line_width)
+            self.line_width_written = line_width
+        fw(paint_fmt["begin"])
+        fw(color)
+        fw("".join(self.paths))
+        fw(paint_fmt["fill" if is_fill else "stroke"])
+        self.key = None
+        self.paths.clear()
+        self.bounds = None
+        self.tot_paint += 1
+
+
+PS_PAINT_FMT = {
+    "line_width": "%.6f setlinewidth\n",
+    # postscript colors may be set before or after constructing the path.
+    "begin": "newpath\n",
+    "color_fill": "%.4f %.4f %.4f setrgbcolor\n",
+    "color_stroke": "%.4f %.4f %.4f setrgbcolor\n",
+    "fill": "fill\n",
+    "stroke": "stroke\n",
+    }
+
+# uses the aliases from 'PS_COMPACT_PROLOG'.
+PS_PAINT_FMT_COMPACT = {
+    "line_width": "%.4f w\n",
+    "begin": "n\n",
+    "color_fill": "%.4f %.4f %.4f g\n",
+    "color_stroke": "%.4f %.4f %.4f g\n",
+    "fill": "f\n",
+    "stroke": "s\n",
+    }
+
+
+def ps_from_obj_curve(fw, obj, matrix, defs=None, arrays=None, cull_bounds=None, batch=None, tolerance=None,
+                      precision=None):
+    # Procedures can only be used when the curve is flat in object space.
+    line_width, is_local, buckets = ps_curve_buckets(
+        obj, matrix, use_local=(defs is not None and defs.use_paths), arrays=arrays, cull_bounds=cull_bounds,
+        tolerance=tolerance)
+    ps_from_buckets(fw, line_width, is_local, buckets, matrix, defs=defs, batch=batch, precision=precision)
+
+
+def ps_from_buckets(fw, line_width, is_local, buckets, matrix, defs=None, batch=None, precision=None):
+    """
+    Paint the buckets of a curve (see :func:`ps_curve_buckets`).
+    """
+    if batch is not None:
+        ps_batch_from_buckets(batch, line_width, is_local, buckets, matrix, defs=defs, precision=precision)
+        return
 
+    paint_fmt = PS_PAINT_FMT if precision is None else PS_PAINT_FMT_COMPACT
 
-def ps_from_obj_image(fw, obj, matrix, no_image=False):
-    # Seems this is ghostscript specific
-    # requires '-dNOSAFER' arg.
+    fw(paint_fmt["begin"])
+
+    if line_width is not None:
+        fw(paint_fmt["line_width"] % line_width)
+
+    for is_fill, rgb, subpaths in buckets:
+        if is_local:
+            ps_from_subpaths_defs(fw, subpaths, defs, matrix)
+        elif precision is not None:
+            ps_from_subpaths_compact(fw, subpaths, precision)
+        else:
+            ps_from_subpaths(fw, subpaths)
+
+        if is_fill:
+            fw(paint_fmt["color_fill"] % rgb)
+            fw(paint_fmt["fill"])
+        else:
+            fw(paint_fmt["color_stroke"] % rgb)
+            fw(paint_fmt["stroke"])
+
+
+def ps_batch_from_buckets(batch, line_width, is_local, buckets, matrix, defs=None, path_fmt=PS_PATH_FMT,
+                          precision=None):
+    """
+    Paint the buckets of a curve (see :func:`ps_curve_buckets`) using a :class:`PSBatch`,
+    with ``precision``, paths use compact encoding (see :func:`ps_from_subpaths_compact`).
+    """
+    if line_width is not None:
+        batch.line_width = line_width
+
+    for is_fill, rgb, subpaths in buckets:
+        if not any(ops for ops, co, use_cyclic in subpaths):
+            continue
+
+        path = []
+        if is_local:
+            ps_from_subpaths_defs(path.append, subpaths, defs, matrix)
+            bounds = ps_subpaths_bounds(subpaths, matrix)
+        elif precision is not None:
+            ps_from_subpaths_compact(path.append, subpaths, precision)
+            bounds = ps_subpaths_bounds(subpaths)
+        else:
+            ps_from_subpaths(path.append, subpaths, path_fmt=path_fmt)
+            bounds = ps_subpaths_bounds(subpaths)
+        batch.paint(is_fill, rgb, "".join(path), bounds)
+
+
+def ps_image_placement(obj, matrix):
+    """
+    Return (filepath, size, points, is_missing) for an image empty or None,
+    where ``points`` are the corners of the (transformed) image quad.
+    """
     import bpy
     import os
 
     image = obj.data
 
     if image is None:
-        return
+        return None
 
     is_missing = False
 
@@ -123,12 +860,22 @@ def ps_from_obj_image(fw, obj, matrix, no_image=False):
     x = max(1, x)
     y = max(1, y)
 
+    points = ps_image_quad(obj, (x, y), matrix)
+
+    return filepath, (x, y), points, is_missing
+
+
+def ps_image_quad(obj, size, matrix):
+    """
+    Return the corners of the (transformed) image quad of an empty.
+    """
+    x, y = size
+
     if x < y:
         aspx, aspy = x / y, 1.0
     else:
         aspx, aspy = 1.0, y / x
 
-    from math import degrees
     from mathutils import Vector
 
     points = [Vector() for i in range(4)]
@@ -144,34 +891,121 @@ def ps_from_obj_image(fw, obj, matrix, no_image=False):
         p.x = (p.x + ofs[0]) * aspx
         p.y = (p.y + ofs[1]) * aspy
 
-    points = [matrix * p for p in points]
+    import numpy as np
+    xy = ps_points_transform_xy(ps_matrix_as_array(matrix), np.array([p[:] for p in points], dtype=np.float32))
+    return [Vector((x, y, 0.0)) for x, y in xy.tolist()]
+
+
+def ps_image_transform(points):
+    """
+    Return (location, angle, dim_x, dim_y) to place an image on its quad,
+    the angle is in degrees.
+    """
+    from math import degrees
+    from mathutils import Vector
+
+    location = points[1][0], points[1][1]
+    angle = degrees((points[0] - points[1]).xy.angle_signed(Vector((0.0, -1.0))))
+
+    dim_x = (points[0].xy - points[3].xy).length
+    dim_y = (points[0].xy - points[1].xy).length
+
+    return location, angle, dim_x, dim_y
+
+
+def ps_coords_in_bounds(coords, cull_bounds, margin=0.0):
+    """
+    Check if 2D coords overlap the page, ``cull_bounds`` are the half page (width, height),
+    centered on the origin.
+    """
+    if len(coords) == 0:
+        return True
+    co_min = coords.min(axis=0) - margin
+    co_max = coords.max(axis=0) + margin
+    return ((co_max[0] >= -cull_bounds[0]) and (co_min[0] <= cull_bounds[0]) and
+            (co_max[1] >= -cull_bounds[1]) and (co_min[1] <= cull_bounds[1]))
+
+
+def ps_stroke_margin(line_width):
+    # Line joins (with the default miter limit of 10) may extend up to 5x the line width.
+    return 0.0 if line_width is None else abs(line_width) * 5.0
+
+
+def ps_obj_in_bounds(obj, matrix, cull_bounds):
+    """
+    Check if an object may be visible on the page, using its bounding box.
+    """
+    import numpy as np
+
+    if obj.type in {'CURVE', 'FONT'}:
+        co = np.array(obj.bound_box, dtype=np.float32)
+        margin = ps_stroke_margin(ps_curve_line_width(obj, matrix))
+    elif obj.type == 'EMPTY':
+        image = obj.data
+        if image is None:
+            return True
+        x, y = image.size
+        co = np.array([p[:] for p in ps_image_quad(obj, (max(1, x), max(1, y)), matrix)], dtype=np.float32)
+        # images are placed one unit above their quad (see 'ps_from_obj_image').
+        return ps_coords_in_bounds(co[:, :2], cull_bounds, margin=1.0)
+    else:
+        return True
+
+    return ps_coords_in_bounds(ps_points_transform_xy(ps_matrix_as_array(matrix), co), cull_bounds, margin)
+
+
+def ps_from_obj_image(fw, obj, matrix, no_image=False, defs=None, precision=None):
+    placement = ps_image_placement(obj, matrix)
+    if placement is None:
+        return
+
+    filepath, size, points, is_missing = placement
+    transform = None if (no_image or is_missing) else ps_image_transform(points)
+    ps_from_image(fw, filepath, size, points, transform, no_image=no_image, defs=defs, precision=precision)
+
+
+def ps_from_image(fw, filepath, size, points, transform, no_image=False, defs=None, precision=None):
+    """
+    Write an image placed on the quad ``points``,
+    ``transform`` is from :func:`ps_image_transform`, None when the image is missing.
+    """
+    # Seems this is ghostscript specific
+    # requires '-dNOSAFER' arg (unless images are embedded in 'defs').
+
+    x, y = size
 
     if no_image:
-        ps_from_poly(fw, points, color=(0.0, 0.0, 0.0))
-    elif is_missing:
-        ps_from_poly(fw, points, color=(1.0, 0.0, 1.0))
+        ps_from_poly(fw, points, color=(0.0, 0.0, 0.0), precision=precision)
+    elif transform is None:
+        ps_from_poly(fw, points, color=(1.0, 0.0, 1.0), precision=precision)
     else:
         # place image based on 'points' quad vectors.
-        fw("gsave\n")
+        location, angle, dim_x, dim_y = transform
 
-        fw("%.6f %.6f translate\n" % (points[1][0], points[1][1]))
-        fw("%.6f rotate\n" % degrees((points[0] - points[1]).xy.angle_signed(Vector((0.0, -1.0)))))
+        fw("gsave\n")
 
-        dim_x = (points[0].xy - points[3].xy).length
-        dim_y = (points[0].xy - points[1].xy).length
+        fw("%.6f %.6f translate\n" % location)
+        fw("%.6f rotate\n" % angle)
 
         mtx_x = x / dim_x
         mtx_y = y / dim_y
 
+        if defs is not None and defs.use_images:
+            # rewind the embedded stream and filter the image data
+            source = "%s dup 0 setfileposition /DCTDecode filter " % defs.image_from_filepath(filepath)
+        else:
+            # opens the file and filters the image data
+            source = "(%s) (r) file/DCTDecode filter " % filepath
+
         fw("%d %d "  # size of image
            "8 "  # bits per channel (1, 2, 4, or 8)
            "[%.6f 0 0 %.6f 0 %.6f] "  # transform array... maps unit square to pixel
-           "(%s) (r) file/DCTDecode filter "  # opens the file and filters the image data
+           "%s"  # data source
            "false "  # _don't_ pull channels from separate sources.
            "3 "  # channels
            "colorimage\n" % (x, y,
                              mtx_x, -mtx_y, mtx_y,  # matrix values
-                             filepath))
+                             source))
         fw("grestore\n")
 
 
@@ -182,11 +1016,12 @@ def ps_header_datestring():
     return now.strftime("%d %B %Y")
 
 
-def ps_header_viewbounds(scene):
+def ps_header_viewbounds(scene, cam_ob=None):
     import mathutils
     # return: (w, h), matrix
     global_scale = 100.0
-    cam_ob = scene.camera
+    if cam_ob is None:
+        cam_ob = scene.camera
     matrix = cam_ob.matrix_world.copy()
     ortho_scale = cam_ob.data.ortho_scale
     x = float(scene.render.resolution_x)
@@ -202,7 +1037,7 @@ def ps_header_viewbounds(scene):
                            global_scale * ortho_scale * aspy)
 
 
-def ps_scene_objects(scene, global_matrix):
+def ps_scene_objects(scene, global_matrix, stats=None):
     for obj_main in scene.objects:
 
         # dupli-parent?
@@ -211,7 +1046,11 @@ def ps_scene_objects(scene, global_matrix):
             continue
 
         if obj_main.dupli_type != 'NONE':
+            if stats is not None:
+                time_start = stats.time()
             obj_main.dupli_list_create(scene)
+            if stats is not None:
+                stats.phase_add("dupli", time_start)
 
             for dob in obj_main.dupli_list:
                 yield (dob.object, global_matrix * dob.matrix)
@@ -222,14 +1061,1205 @@ def ps_scene_objects(scene, global_matrix):
 
     scene_set = scene.background_set
     if scene_set is not None:
-        yield from ps_scene_objects(scene_set, global_matrix)
+        yield from ps_scene_objects(scene_set, global_matrix, stats=stats)
+
+def ps_pages(scene, page_source, tiles=None, tile_overlap=0.0):
+    """
+    Return a list of pages: (scene, camera, frame, tile) tuples,
+    frame is None when the scene's current frame is used.
+
+    ``tiles`` (rows, columns) splits each camera view into a grid of pages (see :func:`ps_pages_tile`),
+    otherwise tile is None.
+    """
+    import bpy
+
+    if page_source == 'CAMERA':
+        pages = [(scene, scene.camera, None, None)]
+    elif page_source == 'CAMERAS':
+        cameras = [obj for obj in scene.objects if obj.type == 'CAMERA']
+        cameras.sort(key=lambda obj: obj.name)
+        pages = [(scene, cam_ob, None, None) for cam_ob in cameras]
+    elif page_source == 'MARKERS':
+        markers = [marker for marker in scene.timeline_markers if marker.camera is not None]
+        markers.sort(key=lambda marker: (marker.frame, marker.name))
+        pages = [(scene, marker.camera, marker.frame, None) for marker in markers]
+    elif page_source == 'SCENES':
+        pages = [(scene_iter, scene_iter.camera, None, None)
+                 for scene_iter in bpy.data.scenes if scene_iter.camera is not None]
+    else:
+        raise Exception("unknown page source: %r" % page_source)
+
+    if tiles is not None:
+        pages = ps_pages_tile(pages, tiles, tile_overlap)
+    return pages
+
+
+def ps_pages_tile(pages, tiles, overlap=0.0):
+    """
+    Split each page into a grid of ``tiles`` (rows, columns), ordered by row (from the top),
+    for printing a large page (a poster for example) onto smaller ones.
+
+    Neighboring tiles share ``overlap`` (in points) along their edges,
+    tile is a (row, column, rows, columns, overlap) tuple.
+    """
+    rows, columns = tiles
+    if rows < 1 or columns < 1:
+        raise Exception("invalid tiles: %r" % (tiles,))
+    return [
+        (scene, cam_ob, frame, (row, column, rows, columns, overlap))
+        for scene, cam_ob, frame, tile in pages
+        for row in range(rows)
+        for column in range(columns)
+    ]
+
+
+def ps_tile_viewbounds(global_matrix, bounds, tile):
+    """
+    Return the view matrix & bounds of a tile (see :func:`ps_pages_tile`) within the page bounds,
+    the tile is centered on the origin (as the page is), so culling works the same way.
+    """
+    import mathutils
+
+    row, column, rows, columns, overlap = tile
+    tile_w = bounds[0] / columns
+    tile_h = bounds[1] / rows
+    center_x = (bounds[0] / -2.0) + ((column + 0.5) * tile_w)
+    center_y = (bounds[1] / 2.0) - ((row + 0.5) * tile_h)
+
+    global_matrix = mathutils.Matrix.Translation((-center_x, -center_y, 0.0)) * global_matrix
+
+    return global_matrix, (tile_w + overlap, tile_h + overlap)
+
+
+def ps_page_viewbounds(page):
+    scene, cam_ob, frame, tile = page
+    if frame is not None and frame != scene.frame_current:
+        scene.frame_set(frame)
+    global_matrix, bounds = ps_header_viewbounds(scene, cam_ob)
+    if tile is not None:
+        global_matrix, bounds = ps_tile_viewbounds(global_matrix, bounds, tile)
+    return global_matrix, bounds
+
+
+# number of object instances to sort in memory.
+PS_SORT_CHUNK_SIZE = 1 << 20
+
+PS_RECORD_DTYPE = [
+    ("depth", "<f4"),
+    # index into the table of unique objects.
+    ("index", "<i4"),
+    # only the line width is written (the object is culled).
+    ("is_culled", "?"),
+    ("median_scale", "<f8"),
+    ("rows", "<f4", (2, 4)),
+    ]
+
+
+def ps_page_records_sorted(records, names, tempdir):
+    """
+    Sort a chunk of records by depth then object name,
+    when ``tempdir`` is set the chunk is written to disk, otherwise kept in memory.
+    """
+    import os
+    import numpy as np
+
+    # 'lexsort' is stable, instances with the same depth & name keep their order.
+    order = np.lexsort((np.array([names[i] for i in records["index"].tolist()]), records["depth"]))
+    records = records[order]
+
+    if tempdir is None:
+        return records
+
+    filepath = os.path.join(tempdir, "chunk_%d.npy" % len(os.listdir(tempdir)))
+    np.save(filepath, records)
+    return np.load(filepath, mmap_mode='r')
+
+
+def ps_page_objects(scene, global_matrix, cull_bounds=None, sort_chunk_size=PS_SORT_CHUNK_SIZE, stats=None):
+    """
+    Generate (object, matrix) pairs to write in depth order.
+
+    Instances are stored as compact records (see :class:`PSMatrix`),
+    sorted in chunks of ``sort_chunk_size`` which are written to disk and merged
+    when there are more instances, so memory use doesn't depend on the number of duplis.
+
+    With ``cull_bounds`` objects outside the page are skipped,
+    culled curves which set the line width are replaced by (None, line_width)
+    to keep the state used by the curves that follow.
+
+    With ``stats`` (a :class:`PSStats`), the time taken to traverse the scene & sort is recorded.
+    """
+    import heapq
+    import tempfile
+    import numpy as np
+
+    objects = []
+    object_index = {}
+    names = []
+
+    chunks = []
+    chunk = np.empty(min(sort_chunk_size, 1024), dtype=PS_RECORD_DTYPE)
+    chunk_len = 0
+    tempdir = None
+
+    totcull = 0
+    totobj = 0
+
+    scene_objects = ps_scene_objects(scene, global_matrix, stats=stats)
+    if stats is not None:
+        scene_objects = stats.phase_iter("traverse", scene_objects)
+
+    try:
+        for obj, matrix in scene_objects:
+            if obj.type not in {'CURVE', 'FONT', 'EMPTY'}:
+                continue
+
+            totobj += 1
+            is_culled = False
+            if cull_bounds is not None and not ps_obj_in_bounds(obj, matrix, cull_bounds):
+                totcull += 1
+                if obj.type == 'EMPTY' or ps_curve_line_width(obj, matrix) is None:
+                    continue
+                is_culled = True
+
+            index = object_index.get(obj)
+            if index is None:
+                index = object_index[obj] = len(objects)
+                objects.append(obj)
+                names.append(obj.name)
+
+            if chunk_len == len(chunk):
+                if chunk_len == sort_chunk_size:
+                    if tempdir is None:
+                        tempdir = tempfile.TemporaryDirectory(prefix="blend2ps_")
+                    if stats is not None:
+                        time_start = stats.time()
+                    chunks.append(ps_page_records_sorted(chunk, names, tempdir.name))
+                    if stats is not None:
+                        stats.phase_add("sort", time_start)
+                    chunk_len = 0
+                else:
+                    chunk = np.resize(chunk, min(sort_chunk_size, chunk_len * 2))
+
+            record = chunk[chunk_len]
+            record["depth"] = matrix[2][3]
+            record["index"] = index
+            record["is_culled"] = is_culled
+            record["median_scale"] = matrix.median_scale
+            record["rows"] = matrix[0][:], matrix[1][:]
+            chunk_len += 1
+
+        if stats is not None:
+            time_start = stats.time()
+        chunks.append(ps_page_records_sorted(chunk[:chunk_len], names, None))
+        if stats is not None:
+            stats.phase_add("sort", time_start)
+        del chunk
+
+        if cull_bounds is not None:
+            print("  culled %d of %d objects" % (totcull, totobj))
+        if stats is not None:
+            stats.counts["culled"] = stats.counts.get("culled", 0) + totcull
+
+        if len(chunks) == 1:
+            records_iter = iter(chunks[0])
+        else:
+            # ties are taken from the earliest chunk, keeping the order stable.
+            records_iter = heapq.merge(
+                *chunks, key=lambda record: (record["depth"], names[record["index"]]))
+        if stats is not None:
+            records_iter = stats.phase_iter("sort", records_iter)
+
+        for record in records_iter:
+            obj = objects[record["index"]]
+            matrix = PSMatrix(np.array(record["rows"]), float(record["median_scale"]))
+            if record["is_culled"]:
+                # culled, only the line width is needed.
+                yield None, ps_curve_line_width(obj, matrix)
+            else:
+                yield obj, matrix
+    finally:
+        chunks.clear()
+        if tempdir is not None:
+            tempdir.cleanup()
+
+
+def ps_pages_range(pages, page_range):
+    """
+    Return (pages, page_number) for a zero based (start, end) range (as with a slice).
+    """
+    if page_range is None:
+        return pages, 1
+    page_number = 1 + range(len(pages))[slice(*page_range)].start
+    return pages[slice(*page_range)], page_number
+
+
+def ps_page_cull_bounds(bounds, cull):
+    """
+    Return (cull_bounds_object, cull_bounds_spline) for a cull mode.
+    """
+    cull_bounds = bounds[0] / 2.0, bounds[1] / 2.0
+    if cull == 'NONE':
+        return None, None
+    elif cull == 'OBJECT':
+        return cull_bounds, None
+    elif cull == 'SPLINE':
+        return cull_bounds, cull_bounds
+    else:
+        raise Exception("unknown cull mode: %r" % cull)
+
+
+def ps_write_page_body(fw, scene, global_matrix, bounds,
+                       no_image=False,
+                       defs=None,
+                       cache=None,
+                       cull='NONE',
+                       sort_chunk_size=PS_SORT_CHUNK_SIZE,
+                       use_batch=False,
+                       tolerance=None,
+                       precision=None,
+                       stats=None):
+
+    if stats is not None:
+        fw = stats.fw_wrap(fw)
+        stats.pages += 1
+
+    # Blender camera coords use (x0, y0) is the middle of the page.
+    # for the postscript file, use (x0, y0) as bottom left
+    # makes choosing page size easier in ghostview.
+    fw("%.6f %.6f translate\n" % (bounds[0] / 2.0, bounds[1] / 2.0))
+
+    cull_bounds_object, cull_bounds_spline = ps_page_cull_bounds(bounds, cull)
+
+    if precision is None:
+        paint_fmt = PS_PAINT_FMT
+        backend = 'PS'
+    else:
+        paint_fmt = PS_PAINT_FMT_COMPACT
+        backend = 'PS-%d' % precision
+
+    batch = PSBatch(fw, paint_fmt) if use_batch else None
+
+    for obj, matrix in ps_page_objects(scene, global_matrix,
+                                       cull_bounds=cull_bounds_object,
+                                       sort_chunk_size=sort_chunk_size,
+                                       stats=stats):
+        if stats is not None:
+            time_start = stats.time()
+            size_start = stats.size
+
+        if obj is None:
+            # culled, only the line width is needed.
+            if batch is not None:
+                batch.line_width = matrix
+            else:
+                fw(paint_fmt["line_width"] % matrix)
+        elif obj.type in {'CURVE', 'FONT'}:
+            if batch is not None:
+                # paths are merged between objects, so can't be cached.
+                ps_from_obj_curve(fw, obj, matrix, defs=defs, cull_bounds=cull_bounds_spline, batch=batch,
+                                  tolerance=tolerance, precision=precision)
+            # paths written as procedures depend on 'defs', so can't be cached.
+            elif cache is not None and not (defs is not None and defs.use_paths):
+                arrays = ps_curve_arrays(obj.data)
+                cache.write(fw, cache.key_curve(backend, obj, matrix, arrays, cull_bounds_spline, tolerance),
+                            ps_from_obj_curve, obj, matrix, arrays=arrays, cull_bounds=cull_bounds_spline,
+                            tolerance=tolerance, precision=precision)
+            else:
+                ps_from_obj_curve(fw, obj, matrix, defs=defs, cull_bounds=cull_bounds_spline,
+                                  tolerance=tolerance, precision=precision)
+        elif obj.type == 'EMPTY':
+            # images are painted between paths (empties without an image don't write anything).
+            if batch is not None and obj.data is not None:
+                batch.flush()
+            if cache is not None and not (defs is not None and defs.use_images):
+                cache.write(fw, cache.key_image(backend, obj, matrix, no_image),
+                            ps_from_obj_image, obj, matrix, no_image=no_image, precision=precision)
+            else:
+                ps_from_obj_image(fw, obj, matrix,
+                                  no_image=no_image,
+                                  defs=defs,
+                                  precision=precision)
+
+        # with batching, paths are counted for the object which writes them.
+        if stats is not None and obj is not None:
+            stats.object_add(obj, stats.size - size_start, time_start)
+
+    if batch is not None:
+        batch.flush()
+        print("  batched %d paths into %d paint operations" % (batch.tot_paths, batch.tot_paint))
+
+
+# ----------------------------------------------------------------------------
+# PDF writing functions
+#
+# Uses the same path & image extraction as postscript,
+# only the operators differ (and colors are set before constructing paths).
+
+PDF_PATH_FMT = {
+    "M": "%.6f %.6f m\n",
+    "L": "%.6f %.6f l\n",
+    "C": "%.6f %.6f %.6f %.6f %.6f %.6f c\n",
+    "Z": "h\n",
+    }
+
+
+class PDFWriter:
+    """
+    Write PDF objects as they're generated, keeping track of offsets for the xref table.
+
+    Images are shared between all pages, written once (keyed by file path).
+    """
+    __slots__ = (
+        "fw",
+        "offset",
+        # object offsets, index + 1 is the object number.
+        "xref",
+        # filepath -> resource name
+        "images",
+        # [(name, object number), ...]
+        "image_objects",
+        "page_objects",
+        )
+
+    OBJ_CATALOG = 1
+    OBJ_PAGES = 2
+    OBJ_RESOURCES = 3
+
+    def __init__(self, fw):
+        self.fw = fw
+        self.offset = 0
+        self.xref = [None, None, None]
+        self.images = {}
+        self.image_objects = []
+        self.page_objects = []
+
+        self.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def write(self, data):
+        self.fw(data)
+        self.offset += len(data)
+
+    def obj_reserve(self):
+        self.xref.append(None)
+        return len(self.xref)
+
+    def obj_write(self, num, data):
+        self.xref[num - 1] = self.offset
+        self.write(b"%d 0 obj\n" % num + data + b"\nendobj\n")
+
+    def obj_write_stream(self, num, data, info=b"", compress=True):
+        import zlib
+        if compress:
+            data = zlib.compress(data)
+            info += b" /Filter /FlateDecode"
+        self.obj_write(num, b"<< /Length %d%s >>\nstream\n" % (len(data), info) + data + b"\nendstream")
+
+    def image_resource(self, filepath, size):
+        name = self.images.get(filepath)
+        if name is None:
+            name = self.images[filepath] = "Im%d" % len(self.images)
+            with open(filepath, 'rb') as file:
+                data = file.read()
+            num = self.obj_reserve()
+            self.obj_write_stream(num, data, (
+                b" /Type /XObject /Subtype /Image /Width %d /Height %d"
+                b" /ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode" % size),
+                compress=False)
+            self.image_objects.append((name, num))
+        return name
+
+    def page_write(self, bounds, content):
+        num_page = self.obj_reserve()
+        num_content = self.obj_reserve()
+        self.obj_write_stream(num_content, content.encode("latin-1"))
+        self.obj_write(num_page, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.6f %.6f] /Resources %d 0 R /Contents %d 0 R >>" %
+            (self.OBJ_PAGES, bounds[0], bounds[1], self.OBJ_RESOURCES, num_content)))
+        self.page_objects.append(num_page)
+
+    def finish(self, info):
+        xobjects = b" ".join(b"/%s %d 0 R" % (name.encode("ascii"), num) for name, num in self.image_objects)
+        self.obj_write(self.OBJ_RESOURCES, b"<< /ProcSet [/PDF /ImageC] /XObject << %s >> >>" % xobjects)
+        self.obj_write(self.OBJ_PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % num for num in self.page_objects), len(self.page_objects)))
+        self.obj_write(self.OBJ_CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self.OBJ_PAGES)
+
+        num_info = self.obj_reserve()
+        self.obj_write(num_info, b"<< %s >>" % b" ".join(
+            b"/%s %s" % (key.encode("ascii"), pdf_string(value)) for key, value in info))
+
+        offset_xref = self.offset
+        self.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self.xref) + 1))
+        self.write(b"".join(b"%010d 00000 n \n" % offset for offset in self.xref))
+        self.write(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" %
+                   (len(self.xref) + 1, self.OBJ_CATALOG, num_info, offset_xref))
+
+
+def pdf_string(text):
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(" + text.encode("latin-1", "replace") + b")"
+
+
+def pdf_from_poly(fw, points, color=(0.0, 0.0, 0.0)):
+    fw("%.4f %.4f %.4f rg\n" % color)
+    for i, p in enumerate(points):
+        fw("%.6f %.6f %s\n" % (p[0], p[1], "m" if i == 0 else "l"))
+    fw("h\n")
+    fw("f\n")
+
+
+PDF_PAINT_FMT = {
+    "line_width": "%.6f w\n",
+    # unlike postscript, colors can't be set while constructing a path.
+    "begin": "",
+    "color_fill": "%.4f %.4f %.4f rg\n",
+    "color_stroke": "%.4f %.4f %.4f RG\n",
+    "fill": "f\n",
+    "stroke": "S\n",
+    }
+
+
+def pdf_from_obj_curve(fw, obj, matrix, arrays=None, cull_bounds=None, batch=None, tolerance=None):
+    line_width, is_local, buckets = ps_curve_buckets(
+        obj, matrix, arrays=arrays, cull_bounds=cull_bounds, tolerance=tolerance)
+    pdf_from_buckets(fw, line_width, buckets, batch=batch)
+
+
+def pdf_from_buckets(fw, line_width, buckets, batch=None):
+    """
+    Paint the (page space) buckets of a curve (see :func:`ps_curve_buckets`).
+    """
+    if batch is not None:
+        ps_batch_from_buckets(batch, line_width, False, buckets, None, path_fmt=PDF_PATH_FMT)
+        return
+
+    if line_width is not None:
+        fw("%.6f w\n" % line_width)
+
+    for is_fill, rgb, subpaths in buckets:
+        if not any(ops for ops, co, use_cyclic in subpaths):
+            continue
+
+        # unlike postscript, colors can't be set while constructing a path.
+        if is_fill:
+            fw("%.4f %.4f %.4f rg\n" % rgb)
+        else:
+            fw("%.4f %.4f %.4f RG\n" % rgb)
+
+        ps_from_subpaths(fw, subpaths, path_fmt=PDF_PATH_FMT)
+
+        if is_fill:
+            fw("f\n")
+        else:
+            fw("S\n")
+
+
+def pdf_from_obj_image(fw, obj, matrix, pdf, no_image=False):
+    placement = ps_image_placement(obj, matrix)
+    if placement is None:
+        return
+
+    filepath, size, points, is_missing = placement
+    transform = None if (no_image or is_missing) else ps_image_transform(points)
+    pdf_from_image(fw, filepath, size, points, transform, pdf, no_image=no_image)
+
+
+def pdf_from_image(fw, filepath, size, points, transform, pdf, no_image=False):
+    """
+    Write an image placed on the quad ``points`` (see :func:`ps_from_image`).
+    """
+    import math
+
+    if no_image:
+        pdf_from_poly(fw, points, color=(0.0, 0.0, 0.0))
+    elif transform is None:
+        pdf_from_poly(fw, points, color=(1.0, 0.0, 1.0))
+    else:
+        location, angle, dim_x, dim_y = transform
+        angle = math.radians(angle)
+        fw("q\n")
+        fw("1 0 0 1 %.6f %.6f cm\n" % location)
+        fw("%.6f %.6f %.6f %.6f 0 0 cm\n" % (math.cos(angle), math.sin(angle), -math.sin(angle), math.cos(angle)))
+        # matches placement of the postscript image matrix.
+        fw("%.6f 0 0 %.6f 0 %.6f cm\n" % (dim_x, dim_y, 1.0 - dim_y))
+        fw("/%s Do\n" % pdf.image_resource(filepath, size))
+        fw("Q\n")
+
+
+def pdf_write_page_body(fw, scene, global_matrix, bounds, pdf,
+                        no_image=False,
+                        cache=None,
+                        cull='NONE',
+                        sort_chunk_size=PS_SORT_CHUNK_SIZE,
+                        use_batch=False,
+                        tolerance=None,
+                        stats=None):
+
+    if stats is not None:
+        fw = stats.fw_wrap(fw)
+        stats.pages += 1
+
+    # use (x0, y0) as bottom left (see 'ps_write_page_body').
+    fw("1 0 0 1 %.6f %.6f cm\n" % (bounds[0] / 2.0, bounds[1] / 2.0))
+
+    cull_bounds_object, cull_bounds_spline = ps_page_cull_bounds(bounds, cull)
+
+    batch = PSBatch(fw, PDF_PAINT_FMT) if use_batch else None
+
+    for obj, matrix in ps_page_objects(scene, global_matrix,
+                                       cull_bounds=cull_bounds_object,
+                                       sort_chunk_size=sort_chunk_size,
+                                       stats=stats):
+        if stats is not None:
+            time_start = stats.time()
+            size_start = stats.size
+
+        if obj is None:
+            # culled, only the line width is needed.
+            if batch is not None:
+                batch.line_width = matrix
+            else:
+                fw("%.6f w\n" % matrix)
+        elif obj.type in {'CURVE', 'FONT'}:
+            if batch is not None:
+                # paths are merged between objects, so can't be cached.
+                pdf_from_obj_curve(fw, obj, matrix, cull_bounds=cull_bounds_spline, batch=batch,
+                                   tolerance=tolerance)
+            elif cache is not None:
+                arrays = ps_curve_arrays(obj.data)
+                cache.write(fw, cache.key_curve('PDF', obj, matrix, arrays, cull_bounds_spline, tolerance),
+                            pdf_from_obj_curve, obj, matrix, arrays=arrays, cull_bounds=cull_bounds_spline,
+                            tolerance=tolerance)
+            else:
+                pdf_from_obj_curve(fw, obj, matrix, cull_bounds=cull_bounds_spline,
+                                   tolerance=tolerance)
+        elif obj.type == 'EMPTY':
+            # images are painted between paths (empties without an image don't write anything).
+            if batch is not None and obj.data is not None:
+                batch.flush()
+            pdf_from_obj_image(fw, obj, matrix, pdf,
+                               no_image=no_image)
+
+        if stats is not None and obj is not None:
+            stats.object_add(obj, stats.size - size_start, time_start)
+
+    if batch is not None:
+        batch.flush()
+        print("  batched %d paths into %d paint operations" % (batch.tot_paths, batch.tot_paint))
+
+
+# ----------------------------------------------------------------------------
+# Export Cache
+#
+# Text written for each object is stored on disk, keyed by a hash of everything it's generated from,
+# so re-exporting a document only needs to generate text for objects which changed.
+#
+# 'FileCache' is also used by 'rst2blend' (for parsed documents).
+
+class FileCache:
+    """
+    Directory of files keyed by a hash,
+    least recently used files are removed when the cache exceeds ``size_max`` (in bytes).
+
+    The directory may be shared by processes running at once.
+    """
+    __slots__ = (
+        "dirpath",
+        "size_max",
+        )
+
+    # Seconds after which temporary files are removed (left by a process which failed while writing them).
+    TMP_STALE = 60 * 60
+
+    def __init__(self, dirpath, size_max=512 * 1024 * 1024):
+        import os
+        self.dirpath = dirpath
+        self.size_max = size_max
+        os.makedirs(dirpath, exist_ok=True)
+
+    def _filepath(self, key):
+        import os
+        return os.path.join(self.dirpath, key[:2], key[2:])
+
+    def file_read(self, key, fn, mode='rb', encoding=None):
+        """
+        Return ``fn(file)`` for the file of ``key``, None when there is no file.
+        """
+        import os
+        filepath = self._filepath(key)
+        try:
+            with open(filepath, mode, encoding=encoding) as file:
+                data = fn(file)
+            # Mark as recently used.
+            os.utime(filepath)
+        except FileNotFoundError:
+            # another process may have removed the file.
+            return None
+        return data
+
+    def file_write(self, key, fn, mode='wb', encoding=None):
+        """
+        Write the file of ``key`` using ``fn(file)``.
+        """
+        import os
+        filepath = self._filepath(key)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        # Write to a temporary file so other processes never read a partial file.
+        filepath_tmp = "%s.%d.tmp" % (filepath, os.getpid())
+        try:
+            with open(filepath_tmp, mode, encoding=encoding) as file:
+                fn(file)
+        except BaseException:
+            os.remove(filepath_tmp)
+            raise
+        os.replace(filepath_tmp, filepath)
+
+    def evict(self):
+        """
+        Remove the least recently used files until the cache fits within its size limit.
+
+        Files other processes remove first are skipped,
+        files they're writing aren't removed (only stale temporary files).
+        """
+        import os
+        import time
+        time_stale = time.time() - self.TMP_STALE
+        files = []
+        size_total = 0
+        for dirpath, dirnames, filenames in os.walk(self.dirpath):
+            for filename in filenames:
+                filepath = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(filepath)
+                except FileNotFoundError:
+                    continue
+                if filename.endswith(".tmp"):
+                    if st.st_mtime < time_stale:
+                        try:
+                            os.remove(filepath)
+                        except FileNotFoundError:
+                            pass
+                    continue
+                files.append((st.st_mtime, st.st_size, filepath))
+                size_total += st.st_size
+
+        files.sort()
+        for mtime, size, filepath in files:
+            if size_total <= self.size_max:
+                break
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                pass
+            size_total -= size
+
+
+class PSCache(FileCache):
+    """
+    On disk cache of the text written for each object (see :class:`FileCache`).
+    """
+    __slots__ = (
+        "hits",
+        "misses",
+        )
+
+    # Increment when the output changes, so old fragments aren't used.
+    VERSION = 1
+
+    def __init__(self, dirpath, size_max=512 * 1024 * 1024):
+        super().__init__(dirpath, size_max=size_max)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        return self.file_read(key, lambda file: file.read(), mode='r', encoding="latin-1")
+
+    def set(self, key, text):
+        self.file_write(key, lambda file: file.write(text), mode='w', encoding="latin-1")
+
+    def write(self, fw, key, fn, *args, **kwargs):
+        """
+        Write the cached text for ``key``,
+        otherwise generate it by calling ``fn(fw, *args, **kwargs)``.
+        """
+        text = self.get(key)
+        if text is None:
+            self.misses += 1
+            body = []
+            fn(body.append, *args, **kwargs)
+            text = "".join(body)
+            self.set(key, text)
+        else:
+            self.hits += 1
+        fw(text)
+
+    @staticmethod
+    def _hash_init(backend, obj, matrix):
+        import hashlib
+        h = hashlib.sha1()
+        h.update(repr((PSCache.VERSION, backend, obj.type)).encode())
+        h.update(ps_matrix_as_array(matrix).tobytes())
+        return h
+
+    @staticmethod
+    def key_curve(backend, obj, matrix, arrays, cull_bounds=None, tolerance=None):
+        cu = obj.data
+        splines, co = arrays
+        h = PSCache._hash_init(backend, obj, matrix)
+        h.update(repr((
+            cull_bounds, tolerance,
+            cu.fill_mode, cu.dimensions, cu.bevel_depth, matrix.median_scale,
+            [(material.diffuse_color[:] if material is not None else None) for material in cu.materials],
+            splines,
+        )).encode())
+        h.update(co.tobytes())
+        return h.hexdigest()
+
+    @staticmethod
+    def key_image(backend, obj, matrix, no_image):
+        import os
+        import bpy
+        image = obj.data
+        h = PSCache._hash_init(backend, obj, matrix)
+        if image is not None:
+            filepath = os.path.normpath(bpy.path.abspath(image.filepath, library=image.library))
+            h.update(repr((
+                filepath, os.path.exists(filepath), image.size[:],
+                obj.empty_draw_size, obj.empty_image_offset[:], no_image,
+            )).encode())
+        return h.hexdigest()
+
+
+# ----------------------------------------------------------------------------
+# Export Statistics
+#
+# Timing & size of each part of the export, written as JSON
+# so exports of different documents (or versions) can be compared.
+
+class PSStats:
+    """
+    Statistics collected while exporting.
+
+    Phases (in seconds) are:
+
+    - ``traverse``: iterating over scene objects (includes ``dupli``).
+    - ``dupli``: creating dupli lists.
+    - ``sort``: sorting & merging object instances by depth.
+    - ``curves``, ``images``: generating the output for each object type.
+    - ``total``: the entire export.
+    """
+    __slots__ = (
+        # phase -> seconds
+        "phases",
+        # object type -> instances written (and 'culled').
+        "counts",
+        # object name -> [type, instances, bytes, points, seconds]
+        "objects",
+        "pages",
+        # bytes written by pages (see 'fw_wrap').
+        "size",
+        # size of the output file.
+        "size_file",
+        )
+
+    def __init__(self):
+        self.phases = {}
+        self.counts = {}
+        self.objects = {}
+        self.pages = 0
+        self.size = 0
+        self.size_file = 0
+
+    @staticmethod
+    def time():
+        import time
+        return time.perf_counter()
+
+    def phase_add(self, phase, time_start):
+        self.phases[phase] = self.phases.get(phase, 0.0) + (self.time() - time_start)
+
+    def phase_iter(self, phase, iterable):
+        """
+        Time each step of ``iterable`` (not the time spent using its items).
+        """
+        iterator = iter(iterable)
+        while True:
+            time_start = self.time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.phase_add(phase, time_start)
+                return
+            self.phase_add(phase, time_start)
+            yield item
+
+    def fw_wrap(self, fw):
+        """
+        Return a write function which counts the size of text written.
+        """
+        def fw_size(text):
+            self.size += len(text)
+            fw(text)
+        return fw_size
+
+    def object_add(self, obj, size, time_start):
+        """
+        Add an object instance which wrote ``size`` bytes, starting at ``time_start``.
+        """
+        seconds = self.time() - time_start
+        obj_type = obj.type
+        phase = "images" if obj_type == 'EMPTY' else "curves"
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        self.counts[obj_type] = self.counts.get(obj_type, 0) + 1
+
+        item = self.objects.get(obj.name)
+        if item is None:
+            if obj_type in {'CURVE', 'FONT'}:
+                points = sum(
+                    len(spline.bezier_points) if spline.type == 'BEZIER' else len(spline.points)
+                    for spline in obj.data.splines
+                )
+            else:
+                points = 0
+            item = self.objects[obj.name] = [obj_type, 0, 0, points, 0.0]
+        item[1] += 1
+        item[2] += size
+        item[4] += seconds
+
+    def as_dict(self, top=20):
+        """
+        Return the statistics as a dictionary,
+        ``top`` is the number of objects to include (the slowest to write).
+        """
+        objects = sorted(self.objects.items(), key=lambda item: (-item[1][4], item[0]))
+        return {
+            "pages": self.pages,
+            "phases": {phase: round(seconds, 6) for phase, seconds in sorted(self.phases.items())},
+            "counts": dict(sorted(self.counts.items())),
+            "objects": len(self.objects),
+            "bytes": self.size,
+            "bytes_file": self.size_file,
+            "points": sum(item[1] * item[3] for item in self.objects.values()),
+            "top": [
+                {
+                    "name": name,
+                    "type": obj_type,
+                    "instances": instances,
+                    "bytes": size,
+                    "points": points,
+                    "seconds": round(seconds, 6),
+                }
+                for name, (obj_type, instances, size, points, seconds) in objects[:top]
+            ],
+        }
+
+    def write(self, filepath, top=20):
+        import json
+        with open(filepath, 'w', encoding="utf-8") as file:
+            json.dump(self.as_dict(top=top), file, indent=2)
+            file.write("\n")
+
+
+# ----------------------------------------------------------------------------
+# Output Sinks
+#
+# Documents are written as many small fragments,
+# these are collected into large blocks before being passed to the destination
+# (buffering is done by Python's 'io' module, since a buffer in Python code is slower).
+
+PS_SINK_BUFFER_SIZE = 1 << 20
+
+PS_SINK_GS_ARGS = (
+    "-dAutoRotatePages=/None", "-dAutoFilterColorImages=false",
+    "-dNOSAFER", "-dBATCH", "-dNOPAUSE", "-q",
+    )
+
+
+class PSSink:
+    """
+    Destination of the document:
+
+    - ``FILE``: written directly.
+    - ``GZIP``: gzip compressed.
+    - ``GS``: piped into a GhostScript process writing ``filepath`` (using ``gs_device``),
+      so the output is generated while exporting and the postscript never reaches the disk.
+
+    Use as a context manager, ``write`` takes text or bytes (when ``is_text`` is False).
+    """
+    __slots__ = (
+        "file",
+        # GhostScript process (for 'GS').
+        "proc",
+        )
+
+    def __init__(self, filepath, sink='FILE', is_text=True, buffer_size=PS_SINK_BUFFER_SIZE,
+                 gs_bin="gs", gs_device="pdfwrite"):
+        import io
+
+        self.proc = None
+        if sink == 'FILE':
+            file_raw = open(filepath, 'wb', buffering=0)
+        elif sink == 'GZIP':
+            import gzip
+            file_raw = gzip.open(filepath, 'wb')
+        elif sink == 'GS':
+            import subprocess
+            self.proc = subprocess.Popen(
+                (gs_bin,) + PS_SINK_GS_ARGS + ("-sDEVICE=" + gs_device, "-sOutputFile=" + filepath, "-"),
+                stdin=subprocess.PIPE, bufsize=0,
+                )
+            file_raw = self.proc.stdin
+        else:
+            raise Exception("unknown sink %r" % sink)
+
+        self.file = io.BufferedWriter(file_raw, buffer_size)
+        if is_text:
+            self.file = io.TextIOWrapper(self.file, encoding="utf-8")
+
+    @property
+    def write(self):
+        return self.file.write
+
+    def close(self):
+        try:
+            self.file.close()
+        except BrokenPipeError:
+            # GhostScript exited early, its return code is checked below.
+            pass
+        if self.proc is not None:
+            returncode = self.proc.wait()
+            self.proc = None
+            if returncode != 0:
+                raise Exception("GhostScript failed (%d)" % returncode)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and self.proc is not None:
+            # the export failed, don't report GhostScript failing too.
+            self.proc.kill()
+            self.proc.wait()
+            self.proc = None
+        self.close()
+
+
+# ----------------------------------------------------------------------------
+# Scene Dump
+#
+# Paths & images of each page are extracted into a NumPy archive ('.npz'),
+# so the document can be written outside of Blender (see 'dump2ps.py').
+#
+# Items of each page are stored in the order they're painted, their ``kind`` is one of:
+#
+# - 'W': the line width set by a culled curve (``line_width``).
+# - 'O': a curve object, ``line_width`` is NaN when it's filled,
+#   followed by its buckets (items ``start:end``).
+# - 'B': paths painted using a single color (``is_fill``, ``rgb``), subpaths ``start:end``.
+# - 'I': an image, ``start`` is its index in the images.
+
+DUMP_VERSION = 1
+
+DUMP_PAGE_DTYPE = [
+    ("bounds", "<f8", (2,)),
+    ("item_start", "<i8"),
+    ("item_end", "<i8"),
+    ]
+
+DUMP_ITEM_DTYPE = [
+    ("kind", "u1"),
+    ("is_fill", "?"),
+    ("rgb", "<f8", (3,)),
+    ("line_width", "<f8"),
+    ("start", "<i8"),
+    ("end", "<i8"),
+    ]
+
+# 'ops_*' index the operators of all subpaths (see 'PS_PATH_FMT'), 'co_*' the (n, 2) float32 coords.
+DUMP_SUBPATH_DTYPE = [
+    ("ops_start", "<i8"),
+    ("ops_end", "<i8"),
+    ("co_start", "<i8"),
+    ("co_end", "<i8"),
+    ("use_cyclic", "?"),
+    ]
+
+# 'transform' is (location_x, location_y, angle, dim_x, dim_y) (see 'ps_image_transform').
+DUMP_IMAGE_DTYPE = [
+    ("filepath_index", "<i4"),
+    ("size", "<i4", (2,)),
+    ("points", "<f8", (4, 2)),
+    ("is_missing", "?"),
+    ("transform", "<f8", (5,)),
+    ]
+
+
+class PSDump:
+    """
+    Paths & images of each page, in page space, written with :meth:`write`.
+    """
+    __slots__ = (
+        # lists of tuples matching the 'DUMP_*_DTYPE' fields.
+        "pages",
+        "items",
+        "subpaths",
+        "images",
+        # operators (strings) & coords (arrays) of all subpaths.
+        "ops",
+        "ops_len",
+        "coords",
+        "coords_len",
+        "filepaths",
+        # filepath -> index
+        "filepath_index",
+        )
+
+    def __init__(self):
+        self.pages = []
+        self.items = []
+        self.subpaths = []
+        self.images = []
+        self.ops = []
+        self.ops_len = 0
+        self.coords = []
+        self.coords_len = 0
+        self.filepaths = []
+        self.filepath_index = {}
+
+    def page_add(self, bounds):
+        if self.pages:
+            self.pages[-1][2] = len(self.items)
+        self.pages.append([bounds, len(self.items), len(self.items)])
+
+    def line_width_add(self, line_width):
+        self.items.append((ord("W"), False, (0.0, 0.0, 0.0), line_width, 0, 0))
+
+    def curve_add(self, line_width, buckets):
+        """
+        Add the page space buckets of a curve (see :func:`ps_curve_buckets`).
+        """
+        items = self.items
+        item_start = len(items) + 1
+        items.append((
+            ord("O"), False, (0.0, 0.0, 0.0), float("nan") if line_width is None else line_width,
+            item_start, item_start + len(buckets)))
+        for is_fill, rgb, subpaths in buckets:
+            subpath_start = len(self.subpaths)
+            for ops, co, use_cyclic in subpaths:
+                self.subpaths.append((
+                    self.ops_len, self.ops_len + len(ops),
+                    self.coords_len, self.coords_len + len(co),
+                    use_cyclic))
+                self.ops.append(ops)
+                self.ops_len += len(ops)
+                self.coords.append(co)
+                self.coords_len += len(co)
+            items.append((ord("B"), is_fill, rgb, 0.0, subpath_start, len(self.subpaths)))
+
+    def image_add(self, filepath, size, points, transform):
+        """
+        Add an image placed on the quad ``points``, ``transform`` is None when the image is missing.
+        """
+        filepath_index = self.filepath_index.get(filepath)
+        if filepath_index is None:
+            filepath_index = self.filepath_index[filepath] = len(self.filepaths)
+            self.filepaths.append(filepath)
+        if transform is None:
+            transform_flat = (0.0,) * 5
+        else:
+            location, angle, dim_x, dim_y = transform
+            transform_flat = (location[0], location[1], angle, dim_x, dim_y)
+        self.items.append((ord("I"), False, (0.0, 0.0, 0.0), 0.0, len(self.images), 0))
+        self.images.append((
+            filepath_index, size, [p[:2] for p in points], transform is None, transform_flat))
+
+    def write(self, filepath, title="", page_number=1):
+        import numpy as np
+
+        if self.pages:
+            self.pages[-1][2] = len(self.items)
+
+        if self.coords:
+            coords = np.concatenate(self.coords).astype(np.float32)
+        else:
+            coords = np.empty((0, 2), dtype=np.float32)
+
+        np.savez(
+            filepath,
+            version=np.array(DUMP_VERSION),
+            title=np.array(title),
+            page_number=np.array(page_number),
+            pages=np.array([tuple(page) for page in self.pages], dtype=DUMP_PAGE_DTYPE),
+            items=np.array(self.items, dtype=DUMP_ITEM_DTYPE),
+            subpaths=np.array(self.subpaths, dtype=DUMP_SUBPATH_DTYPE),
+            ops=np.frombuffer("".join(self.ops).encode("ascii"), dtype=np.uint8),
+            coords=coords,
+            images=np.array(self.images, dtype=DUMP_IMAGE_DTYPE),
+            filepaths=np.array(self.filepaths, dtype=str),
+            )
+
+
+def dump_page_body(dump, scene, global_matrix, bounds,
+                   cull='NONE',
+                   sort_chunk_size=PS_SORT_CHUNK_SIZE,
+                   tolerance=None,
+                   stats=None):
+    """
+    Add a page to ``dump`` (a :class:`PSDump`), matching :func:`ps_write_page_body`.
+    """
+
+    if stats is not None:
+        stats.pages += 1
+
+    dump.page_add(bounds)
+
+    cull_bounds_object, cull_bounds_spline = ps_page_cull_bounds(bounds, cull)
+
+    for obj, matrix in ps_page_objects(scene, global_matrix,
+                                       cull_bounds=cull_bounds_object,
+                                       sort_chunk_size=sort_chunk_size,
+                                       stats=stats):
+        if stats is not None:
+            time_start = stats.time()
+
+        if obj is None:
+            # culled, only the line width is needed.
+            dump.line_width_add(matrix)
+        elif obj.type in {'CURVE', 'FONT'}:
+            line_width, is_local, buckets = ps_curve_buckets(
+                obj, matrix, cull_bounds=cull_bounds_spline, tolerance=tolerance)
+            dump.curve_add(line_width, buckets)
+        elif obj.type == 'EMPTY':
+            placement = ps_image_placement(obj, matrix)
+            if placement is not None:
+                filepath, size, points, is_missing = placement
+                dump.image_add(filepath, size, points, None if is_missing else ps_image_transform(points))
+
+        # sizes aren't known until the document is written.
+        if stats is not None and obj is not None:
+            stats.object_add(obj, 0, time_start)
+
 
 # ----------------------------------------------------------------------------
 # Write Functions (exposed externally)
 
 
 def ps_write(fw,
-             no_image=False):
+             no_image=False,
+             use_dedup=False,
+             embed_images=False,
+             page_source='CAMERA',
+             page_range=None,
+             tiles=None,
+             tile_overlap=0.0,
+             cache=None,
+             cull='NONE',
+             sort_chunk_size=PS_SORT_CHUNK_SIZE,
+             use_batch=False,
+             tolerance=None,
+             precision=None,
+             stats=None):
 
     # first calculate the view matrix and boundbox using an ortho camera.
 
@@ -238,6 +2268,22 @@ def ps_write(fw,
 
     scene = bpy.context.scene
 
+    if page_source != 'CAMERA' or tiles is not None:
+        pages, page_number = ps_pages_range(ps_pages(scene, page_source, tiles, tile_overlap), page_range)
+        ps_write_pages(fw, pages,
+                       no_image=no_image,
+                       use_dedup=use_dedup,
+                       embed_images=embed_images,
+                       page_number=page_number,
+                       cache=cache,
+                       cull=cull,
+                       sort_chunk_size=sort_chunk_size,
+                       use_batch=use_batch,
+                       tolerance=tolerance,
+                       precision=precision,
+                       stats=stats)
+        return
+
     global_matrix, bounds = ps_header_viewbounds(scene)
 
     fw("%!PS\n")
@@ -249,36 +2295,396 @@ def ps_write(fw,
     #fw("%%Pages: 1\n")
     fw("%%EndComments\n")
 
-    # Blender camera coords use (x0, y0) is the middle of the page.
-    # for the postscript file, use (x0, y0) as bottom left
-    # makes choosing page size easier in ghostview.
-    fw("%.6f %.6f translate\n" % (bounds[0] / 2.0, bounds[1] / 2.0))
+    if use_dedup or embed_images:
+        # definitions are only known once all objects are written,
+        # buffer the page so they can be written into the prolog first.
+        defs = PSDefs(use_paths=use_dedup, use_images=embed_images, precision=precision)
+        fw_file = fw
+        body = []
+        fw = body.append
+    else:
+        defs = None
+        if precision is not None:
+            fw("%%BeginProlog\n")
+            fw(PS_COMPACT_PROLOG)
+            fw("%%EndProlog\n")
+
+    ps_write_page_body(fw, scene, global_matrix, bounds,
+                       no_image=no_image,
+                       defs=defs,
+                       cache=cache,
+                       cull=cull,
+                       sort_chunk_size=sort_chunk_size,
+                       use_batch=use_batch,
+                       tolerance=tolerance,
+                       precision=precision,
+                       stats=stats)
 
-    objects = list(ps_scene_objects(scene, global_matrix))
-    # sort by depth then object name
-    objects.sort(key=lambda item: (item[1][2][3], item[0].name))
+    fw("showpage\n")
 
-    for obj, matrix in objects:
-        if obj.type in {'CURVE', 'FONT'}:
-            ps_from_obj_curve(fw, obj, matrix)
-        elif obj.type == 'EMPTY':
-            ps_from_obj_image(fw, obj, matrix,
-                              no_image=no_image)
+    if defs is not None:
+        fw = fw_file
+        fw("%%BeginProlog\n")
+        fw(PS_DEFS_PROLOG)
+        if precision is not None:
+            fw(PS_COMPACT_PROLOG)
+        defs.write_pending(fw)
+        fw("%%EndProlog\n")
+        fw("".join(body))
+
+
+def ps_write_pages(fw, pages,
+                   no_image=False,
+                   use_dedup=False,
+                   embed_images=False,
+                   page_number=1,
+                   cache=None,
+                   cull='NONE',
+                   sort_chunk_size=PS_SORT_CHUNK_SIZE,
+                   use_batch=False,
+                   tolerance=None,
+                   precision=None,
+                   stats=None):
+    """
+    Write a multi-page DSC document, one page for each item in ``pages``
+    (see :func:`ps_pages`), each page is written as soon as it's generated.
+
+    ``page_number`` is the ordinal of the first page,
+    used when only a range of the document's pages are written.
+    """
+    import bpy
+    import os
 
-    fw("showpage\n")
+    if not pages:
+        raise Exception("no pages to write (missing cameras?)")
+
+    scene_frames = {scene: scene.frame_current for scene, cam_ob, frame, tile in pages}
+
+    def page_body(fw, page_index, defs):
+        page = pages[page_index]
+        global_matrix, bounds = ps_page_viewbounds(page)
+        ps_write_page_body(fw, page[0], global_matrix, bounds,
+                           no_image=no_image,
+                           defs=defs,
+                           cache=cache,
+                           cull=cull,
+                           sort_chunk_size=sort_chunk_size,
+                           use_batch=use_batch,
+                           tolerance=tolerance,
+                           precision=precision,
+                           stats=stats)
+
+    ps_write_document(fw, os.path.basename(bpy.data.filepath),
+                      [ps_page_viewbounds(page)[1] for page in pages], page_body,
+                      use_dedup=use_dedup,
+                      embed_images=embed_images,
+                      page_number=page_number,
+                      precision=precision)
+
+    for scene, frame in scene_frames.items():
+        if scene.frame_current != frame:
+            scene.frame_set(frame)
+
+
+def ps_write_document(fw, title, page_bounds, page_body,
+                      use_dedup=False,
+                      embed_images=False,
+                      page_number=1,
+                      precision=None):
+    """
+    Write a multi-page DSC document, ``page_bounds`` is the (width, height) of each page,
+    ``page_body(fw, page_index, defs)`` writes the content of each page.
+    """
+    bounds_max = [0.0, 0.0]
+    for bounds in page_bounds:
+        bounds_max[0] = max(bounds_max[0], bounds[0])
+        bounds_max[1] = max(bounds_max[1], bounds[1])
+
+    fw("%!PS-Adobe-3.0\n")
+    fw("%%Creator: rst2ps.py\n")
+    fw("%%CreationDate: " + ("%s\n" % ps_header_datestring()))
+    fw("%%Title: " + ("%s\n" % title))
+    fw("%%BoundingBox: " + ("0 0 %.6f %.6f\n" % tuple(bounds_max)))
+    fw("%%Pages: " + ("%d\n" % len(page_bounds)))
+    fw("%%EndComments\n")
+
+    fw("%%BeginProlog\n")
+    if precision is not None:
+        fw(PS_COMPACT_PROLOG)
+    if use_dedup or embed_images:
+        fw(PS_DEFS_PROLOG)
+        defs = PSDefs(use_paths=use_dedup, use_images=embed_images, precision=precision)
+    else:
+        defs = None
+    fw("%%EndProlog\n")
+
+    for page_index, bounds in enumerate(page_bounds):
+        if defs is not None:
+            # definitions used on this page are written in its setup.
+            body = []
+            page_body(body.append, page_index, defs)
+
+        fw("%%Page: " + ("%d %d\n" % (page_number + page_index, page_number + page_index)))
+        fw("%%PageBoundingBox: " + ("0 0 %.6f %.6f\n" % tuple(bounds)))
+        fw("%%BeginPageSetup\n")
+        fw("<< /PageSize [%.6f %.6f] >> setpagedevice\n" % tuple(bounds))
+        if defs is not None:
+            defs.write_pending(fw)
+        fw("%%EndPageSetup\n")
+        fw("gsave\n")
+        if defs is not None:
+            fw("".join(body))
+            del body
+        else:
+            page_body(fw, page_index, None)
+        fw("grestore\n")
+        fw("showpage\n")
+        fw("%%PageTrailer\n")
+
+    fw("%%Trailer\n")
+    fw("%%EOF\n")
+
+
+def pdf_write(fw,
+              no_image=False,
+              page_source='CAMERA',
+              page_range=None,
+              tiles=None,
+              tile_overlap=0.0,
+              cache=None,
+              cull='NONE',
+              sort_chunk_size=PS_SORT_CHUNK_SIZE,
+              use_batch=False,
+              tolerance=None,
+              stats=None):
+    """
+    Write a PDF document, ``fw`` takes bytes.
+
+    Each page is a compressed content stream, images are embedded once and shared.
+    """
+    import bpy
+    import os
+    import datetime
+
+    scene = bpy.context.scene
+
+    pages, page_number = ps_pages_range(ps_pages(scene, page_source, tiles, tile_overlap), page_range)
+    if not pages:
+        raise Exception("no pages to write (missing cameras?)")
+
+    scene_frames = {scene: scene.frame_current for scene, cam_ob, frame, tile in pages}
+
+    pdf = PDFWriter(fw)
+
+    for page in pages:
+        global_matrix, bounds = ps_page_viewbounds(page)
+        content = []
+        pdf_write_page_body(content.append, page[0], global_matrix, bounds, pdf,
+                            no_image=no_image,
+                            cache=cache,
+                            cull=cull,
+                            sort_chunk_size=sort_chunk_size,
+                            use_batch=use_batch,
+                            tolerance=tolerance,
+                            stats=stats)
+        pdf.page_write(bounds, "".join(content))
+        del content
+
+    pdf.finish((
+        ("Creator", "rst2ps.py"),
+        ("CreationDate", datetime.datetime.now().strftime("D:%Y%m%d%H%M%S")),
+        ("Title", os.path.basename(bpy.data.filepath)),
+        ))
+
+    for scene, frame in scene_frames.items():
+        if scene.frame_current != frame:
+            scene.frame_set(frame)
+
+
+def dump_write(filepath,
+               page_source='CAMERA',
+               page_range=None,
+               tiles=None,
+               tile_overlap=0.0,
+               cull='NONE',
+               sort_chunk_size=PS_SORT_CHUNK_SIZE,
+               tolerance=None,
+               stats=None):
+    """
+    Write the paths & images of each page to a NumPy archive (see :class:`PSDump`),
+    to be written as a document by ``dump2ps.py``.
+    """
+    import bpy
+    import os
+
+    scene = bpy.context.scene
+
+    pages, page_number = ps_pages_range(ps_pages(scene, page_source, tiles, tile_overlap), page_range)
+    if not pages:
+        raise Exception("no pages to write (missing cameras?)")
+
+    scene_frames = {scene: scene.frame_current for scene, cam_ob, frame, tile in pages}
+
+    dump = PSDump()
+    for page in pages:
+        global_matrix, bounds = ps_page_viewbounds(page)
+        dump_page_body(dump, page[0], global_matrix, bounds,
+                       cull=cull,
+                       sort_chunk_size=sort_chunk_size,
+                       tolerance=tolerance,
+                       stats=stats)
+
+    dump.write(filepath, title=os.path.basename(bpy.data.filepath), page_number=page_number)
+
+    for scene, frame in scene_frames.items():
+        if scene.frame_current != frame:
+            scene.frame_set(frame)
 
 
 def write(filepath,
           no_image=False,
+          use_dedup=False,
+          embed_images=False,
+          page_source='CAMERA',
+          page_range=None,
+          tiles=None,
+          tile_overlap=0.0,
+          cache_dir=None,
+          cache_size=512,
+          cull='NONE',
+          sort_chunk_size=PS_SORT_CHUNK_SIZE,
+          use_batch=False,
+          dpi=None,
+          dpi_tolerance=0.5,
+          compact=False,
+          precision=2,
+          stats_filepath=None,
+          stats_top=20,
+          sink='FILE',
+          buffer_size=PS_SINK_BUFFER_SIZE,
+          gs_bin="gs",
           ):
-    with open(filepath, 'w') as file:
-        ps_write(file.write,
-                 no_image=no_image)
+    import os
+
+    # when set, statistics are written to 'stats_filepath' as JSON.
+    if stats_filepath is not None:
+        stats = PSStats()
+        time_start = stats.time()
+    else:
+        stats = None
+
+    # cache_size is in megabytes.
+    if cache_dir is not None:
+        cache = PSCache(cache_dir, size_max=cache_size * 1024 * 1024)
+    else:
+        cache = None
+
+    # each tile only writes the objects it overlaps.
+    if tiles is not None and cull == 'NONE':
+        cull = 'OBJECT'
+
+    # dpi_tolerance is in device pixels, page units are points (1/72 inch).
+    if dpi is not None:
+        tolerance = dpi_tolerance * 72.0 / dpi
+    else:
+        tolerance = None
+
+    # '.pdf' is written directly (ignoring a '.gz' extension), otherwise postscript,
+    # 'GS' always writes postscript (GhostScript converts it to PDF).
+    filepath_ext = filepath.lower()
+    if filepath_ext.endswith(".gz"):
+        filepath_ext = filepath_ext[:-3]
+    is_pdf = filepath_ext.endswith(".pdf") and sink != 'GS'
+
+    # '.npz' dumps the paths & images to be written outside of Blender (see 'dump2ps.py').
+    if filepath.lower().endswith(".npz"):
+        dump_write(filepath,
+                   page_source=page_source,
+                   page_range=page_range,
+                   tiles=tiles,
+                   tile_overlap=tile_overlap,
+                   cull=cull,
+                   sort_chunk_size=sort_chunk_size,
+                   tolerance=tolerance,
+                   stats=stats)
+    elif is_pdf:
+        with PSSink(filepath, sink=sink, is_text=False, buffer_size=buffer_size) as file:
+            pdf_write(file.write,
+                      no_image=no_image,
+                      page_source=page_source,
+                      page_range=page_range,
+                      tiles=tiles,
+                      tile_overlap=tile_overlap,
+                      cache=cache,
+                      cull=cull,
+                      sort_chunk_size=sort_chunk_size,
+                      use_batch=use_batch,
+                      tolerance=tolerance,
+                      stats=stats)
+    else:
+        with PSSink(filepath, sink=sink, buffer_size=buffer_size, gs_bin=gs_bin) as file:
+            ps_write(file.write,
+                     no_image=no_image,
+                     use_dedup=use_dedup,
+                     embed_images=embed_images,
+                     page_source=page_source,
+                     page_range=page_range,
+                     tiles=tiles,
+                     tile_overlap=tile_overlap,
+                     cache=cache,
+                     cull=cull,
+                     sort_chunk_size=sort_chunk_size,
+                     use_batch=use_batch,
+                     tolerance=tolerance,
+                     precision=precision if compact else None,
+                     stats=stats)
+
+    if cache is not None:
+        cache.evict()
+        print("  cache: %d reused, %d written" % (cache.hits, cache.misses))
+
+    if stats is not None:
+        stats.phase_add("total", time_start)
+        stats.size_file = os.path.getsize(filepath)
+        stats.write(stats_filepath, top=stats_top)
+
+
+def page_count(page_source='CAMERA', tiles=None):
+    import bpy
+    return len(ps_pages(bpy.context.scene, page_source, tiles))
 
 
 # ----------------------------------------------------------------------------
 # Command line access
 
+def int_positive_from_arg(value):
+    """
+    Return an int of at least 1 (an argparse type).
+    """
+    import argparse
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected an integer, not %r" % value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("must be at least 1, not %r" % value)
+    return number
+
+
+def tiles_from_arg(value):
+    """
+    Return (rows, columns) from a "ROWSxCOLUMNS" argument, eg: "3x4" (an argparse type).
+    """
+    import argparse
+    try:
+        rows, columns = (int(i) for i in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected ROWSxCOLUMNS (eg: 3x4), not %r" % value)
+    if rows < 1 or columns < 1:
+        raise argparse.ArgumentTypeError("rows & columns must be at least 1, not %r" % value)
+    return rows, columns
+
+
 def main():
     import sys
     import argparse
@@ -299,19 +2705,125 @@ def main():
     parser = argparse.ArgumentParser(description=usage_text)
 
     parser.add_argument("-o", "--output", dest="output_path", metavar='FILE',
-                        help="Save the generated file to the specified path")
+                        help="Save the generated file to the specified path, "
+                        "'.npz' dumps paths & images to be written by 'dump2ps.py' (outside of Blender)")
 
     parser.add_argument('-n', '--no_image', dest="no_image", default=False, action="store_true",
                         help="Use placeholders for images")
 
+    parser.add_argument('-d', '--dedup', dest="use_dedup", default=False, action="store_true",
+                        help="Write repeated paths (glyphs, shared curves) once as procedures (postscript only)")
+
+    parser.add_argument('-b', '--batch', dest="use_batch", default=False, action="store_true",
+                        help="Paint consecutive paths with the same color & line width using a single operator "
+                        "(curves aren't cached)")
+
+    parser.add_argument('-e', '--embed-images', dest="embed_images", default=False, action="store_true",
+                        help="Embed each image once and reference it for every placement, "
+                        "otherwise images are read from their files (postscript only, PDF always embeds)")
+
+    parser.add_argument('-c', '--cache', dest="cache_dir", metavar='DIR',
+                        help="Cache the text written for each object in this directory, "
+                        "so objects which didn't change since the last export are reused")
+
+    parser.add_argument('--cache-size', dest="cache_size", type=int, default=512, metavar='MB',
+                        help="Maximum size of the cache, least recently used items are removed")
+
+    parser.add_argument('--cull', dest="cull", default='NONE',
+                        choices=('NONE', 'OBJECT', 'SPLINE'),
+                        help="Skip objects (using their bounds) or also individual splines "
+                        "which are outside the page")
+
+    parser.add_argument('-z', '--compact', dest="compact", default=False, action="store_true",
+                        help="Write paths using short operators & relative coordinates (postscript only)")
+
+    parser.add_argument('--precision', dest="precision", type=int, default=2, metavar='N',
+                        help="Decimal places for coordinates written with '--compact'")
+
+    parser.add_argument('--dpi', dest="dpi", type=float, default=None, metavar='DPI',
+                        help="Simplify paths for a device of this resolution, "
+                        "removing detail below the tolerance (off by default)")
+
+    parser.add_argument('--dpi-tolerance', dest="dpi_tolerance", type=float, default=0.5, metavar='PX',
+                        help="Error allowed when simplifying paths (in device pixels), see '--dpi'")
+
+    parser.add_argument('--sort-chunk-size', dest="sort_chunk_size", type=int_positive_from_arg,
+                        default=PS_SORT_CHUNK_SIZE, metavar='N',
+                        help="Number of object instances sorted in memory, "
+                        "more are sorted in chunks written to a temporary directory")
+
+    parser.add_argument('--sink', dest="sink", default='FILE',
+                        choices=('FILE', 'GZIP', 'GS'),
+                        help="Write the output to a file, a gzip compressed file, "
+                        "or pipe postscript into GhostScript which writes the output as PDF "
+                        "(without an intermediate file)")
+
+    parser.add_argument('--gs', dest="gs_bin", default="gs",
+                        help="GhostScript binary (for '--sink=GS')")
+
+    parser.add_argument('--stats', dest="stats_filepath", metavar='FILE',
+                        help="Write statistics (time taken by each phase, object counts, "
+                        "size & time for each object) to this file as JSON")
+
+    parser.add_argument('--stats-top', dest="stats_top", type=int, default=20, metavar='N',
+                        help="Number of objects to include in the statistics (the slowest to write)")
+
+    parser.add_argument('-p', '--pages', dest="page_source", default='CAMERA',
+                        choices=('CAMERA', 'CAMERAS', 'MARKERS', 'SCENES'),
+                        help="Source of pages: the active camera (single page, default), "
+                        "every camera in the scene (ordered by name), "
+                        "timeline markers bound to cameras (ordered by frame), "
+                        "or every scene with a camera")
+
+    parser.add_argument('-r', '--page-range', dest="page_range", metavar='START:END',
+                        help="Only write pages in this (zero based, end exclusive) range")
+
+    parser.add_argument('--page-count', dest="page_count", default=False, action="store_true",
+                        help="Print the number of pages and exit")
+
+    parser.add_argument('-t', '--tiles', dest="tiles", type=tiles_from_arg, metavar='ROWSxCOLUMNS',
+                        help="Split each page into a grid of pages (a poster printed on smaller pages for example), "
+                        "ordered by row from the top, objects outside each tile are culled (see '--cull')")
+
+    parser.add_argument('--tile-overlap', dest="tile_overlap", type=float, default=0.0, metavar='PT',
+                        help="Overlap between neighboring tiles (in points), see '--tiles'")
+
     args = parser.parse_args(argv)  # In this example we wont use the args
 
     if not argv:
         parser.print_help()
         return
 
+    if args.page_count:
+        print("blend2ps: page count %d" % page_count(page_source=args.page_source, tiles=args.tiles))
+        return
+
+    if args.page_range is not None:
+        page_range = tuple(int(i) if i else None for i in args.page_range.split(":"))
+    else:
+        page_range = None
+
     write(args.output_path,
           no_image=args.no_image,
+          use_dedup=args.use_dedup,
+          embed_images=args.embed_images,
+          page_source=args.page_source,
+          page_range=page_range,
+          tiles=args.tiles,
+          tile_overlap=args.tile_overlap,
+          cache_dir=args.cache_dir,
+          cache_size=args.cache_size,
+          cull=args.cull,
+          sort_chunk_size=args.sort_chunk_size,
+          use_batch=args.use_batch,
+          dpi=args.dpi,
+          dpi_tolerance=args.dpi_tolerance,
+          compact=args.compact,
+          precision=args.precision,
+          stats_filepath=args.stats_filepath,
+          stats_top=args.stats_top,
+          sink=args.sink,
+          gs_bin=args.gs_bin,
           )
 
 if __name__ == "__main__":
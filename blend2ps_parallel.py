@@ -0,0 +1,408 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+# Copyright Campbell Barton
+
+"""
+Export the pages of a blend file in parallel,
+running ``blend2ps`` in multiple background Blender processes,
+then join their pages into a single document.
+
+This runs from a regular Python interpreter (not inside Blender).
+"""
+
+# ----------------------------------------------------------------------------
+# Blender Process Utilities
+
+def blender_args(blender_bin, blend_filepath, args_extra):
+    import os
+    return [
+        blender_bin,
+        "--background",
+        blend_filepath,
+        "--python", os.path.join(os.path.dirname(os.path.abspath(__file__)), "blend2ps.py"),
+        "--",
+        ] + list(args_extra)
+
+
+def blender_run(args):
+    import subprocess
+    proc = subprocess.run(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = proc.stdout.decode("utf-8", "surrogateescape")
+    if proc.returncode != 0:
+        raise Exception("command failed (%d): %s\n%s" % (proc.returncode, " ".join(args), output))
+    return output
+
+
+def blender_page_count(blender_bin, blend_filepath, page_args):
+    output = blender_run(blender_args(
+        blender_bin, blend_filepath,
+        tuple(page_args) + ("--page-count",),
+        ))
+    prefix = "blend2ps: page count "
+    for line in output.splitlines():
+        if line.startswith(prefix):
+            return int(line[len(prefix):])
+    raise Exception("page count not found in output:\n%s" % output)
+
+
+def page_ranges_split(page_total, chunks):
+    """
+    Split pages into (at most) ``chunks`` contiguous ranges of near equal size.
+    """
+    chunks = max(1, min(chunks, page_total))
+    bounds = [(page_total * i) // chunks for i in range(chunks + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(chunks)]
+
+
+def filepath_numbered(filepath, number):
+    """
+    Return the file path for one of many files, eg: ``poster.pdf`` -> ``poster_0001.pdf``.
+    """
+    import os
+    base, ext = os.path.splitext(filepath)
+    return "%s_%04d%s" % (base, number, ext)
+
+
+# ----------------------------------------------------------------------------
+# Postscript Joining
+#
+# Each part is a complete DSC document (see 'blend2ps.ps_write_pages'),
+# the header & prolog are taken from the first part,
+# the pages of all parts follow in order.
+
+def ps_part_header(filepath):
+    """
+    Return the header lines (up until the first page), page count & bounds.
+    """
+    header = []
+    page_total = 0
+    bounds = [0.0, 0.0]
+    with open(filepath, 'r', encoding="latin-1") as file:
+        for line in file:
+            if line.startswith("%%Page:"):
+                break
+            header.append(line)
+            if line.startswith("%%Pages:"):
+                page_total = int(line.split()[1])
+            elif line.startswith("%%BoundingBox:"):
+                bounds = [float(f) for f in line.split()[3:5]]
+    return header, page_total, bounds
+
+
+def ps_join(fw, filepaths, page_number=1):
+    """
+    Join postscript parts, ``page_number`` is the ordinal of the first page.
+    """
+    headers = [ps_part_header(filepath) for filepath in filepaths]
+
+    page_total = sum(page_total for _, page_total, _ in headers)
+    bounds = (max(bounds[0] for _, _, bounds in headers),
+              max(bounds[1] for _, _, bounds in headers))
+
+    for line in headers[0][0]:
+        if line.startswith("%%Pages:"):
+            line = "%%Pages: " + ("%d\n" % page_total)
+        elif line.startswith("%%BoundingBox:"):
+            line = "%%BoundingBox: " + ("0 0 %.6f %.6f\n" % bounds)
+        fw(line)
+
+    for filepath in filepaths:
+        with open(filepath, 'r', encoding="latin-1") as file:
+            is_page = False
+            for line in file:
+                if line.startswith("%%Page:"):
+                    is_page = True
+                    line = "%%Page: " + ("%d %d\n" % (page_number, page_number))
+                    page_number += 1
+                elif line.startswith("%%Trailer"):
+                    break
+                if is_page:
+                    fw(line)
+
+    fw("%%Trailer\n")
+    fw("%%EOF\n")
+
+
+def ps_part_pages(filepath):
+    """
+    Generate the lines of each page in a part (from its ``%%Page:`` comment).
+    """
+    with open(filepath, 'r', encoding="latin-1") as file:
+        page = None
+        for line in file:
+            if line.startswith("%%Page:") or line.startswith("%%Trailer"):
+                if page is not None:
+                    yield page
+                if line.startswith("%%Trailer"):
+                    return
+                page = []
+            if page is not None:
+                page.append(line)
+
+
+def ps_page_write(fw, header, page):
+    """
+    Write a single page document, ``header`` is from :func:`ps_part_header`,
+    ``page`` from :func:`ps_part_pages`.
+    """
+    bounds = tuple(
+        float(f) for line in page if line.startswith("%%PageBoundingBox:")
+        for f in line.split()[3:5]
+    )
+
+    for line in header:
+        if line.startswith("%%Pages:"):
+            line = "%%Pages: 1\n"
+        elif line.startswith("%%BoundingBox:"):
+            line = "%%BoundingBox: " + ("0 0 %.6f %.6f\n" % bounds)
+        fw(line)
+
+    fw("%%Page: 1 1\n")
+    for line in page[1:]:
+        fw(line)
+
+    fw("%%Trailer\n")
+    fw("%%EOF\n")
+
+
+def ps_split(filepath, filepaths, tempdir, gs_bin):
+    """
+    Write each page of the parts to its own file (see :func:`filepath_numbered`),
+    converted by GhostScript when ``filepath`` ends with ``.pdf``.
+    """
+    import os
+
+    is_pdf = filepath.lower().endswith(".pdf")
+
+    page_number = 0
+    for filepath_part in filepaths:
+        header = ps_part_header(filepath_part)[0]
+        for page in ps_part_pages(filepath_part):
+            page_number += 1
+            filepath_page = filepath_numbered(filepath, page_number)
+            if is_pdf:
+                filepath_ps = os.path.join(tempdir, "page.ps")
+            else:
+                filepath_ps = filepath_page
+
+            with open(filepath_ps, 'w', encoding="latin-1") as file:
+                ps_page_write(file.write, header, page)
+
+            if filepath_ps != filepath_page:
+                pdf_from_ps(gs_bin, filepath_ps, filepath_page)
+
+
+def pdf_from_ps(gs_bin, filepath_ps, filepath_pdf):
+    import subprocess
+    subprocess.check_call([
+        gs_bin,
+        "-dAutoRotatePages=/None", "-dAutoFilterColorImages=false",
+        "-dNOSAFER", "-dBATCH", "-dNOPAUSE", "-q", "-sDEVICE=pdfwrite",
+        "-sOutputFile=" + filepath_pdf, "-f", filepath_ps,
+        ])
+
+
+# ----------------------------------------------------------------------------
+# Write Functions (exposed externally)
+
+def write(filepath, blend_filepath,
+          page_source='CAMERAS',
+          tiles=None,
+          tile_overlap=0.0,
+          use_split=False,
+          jobs=None,
+          chunks=None,
+          page_total=None,
+          blender_bin="blender",
+          gs_bin="gs",
+          args_extra=(),
+          ):
+    """
+    Export ``blend_filepath`` to ``filepath`` (``.ps`` or ``.pdf``),
+    splitting pages between ``jobs`` Blender processes.
+
+    ``tiles`` (rows, columns) splits each page into a grid of pages (see ``blend2ps.ps_pages_tile``),
+    with ``use_split`` each page is written to its own file (see :func:`filepath_numbered`).
+
+    ``args_extra`` are passed to each ``blend2ps`` process (``--dedup`` for example).
+    """
+    import os
+    import tempfile
+    import concurrent.futures
+
+    page_args = ("--pages", page_source)
+    if tiles is not None:
+        page_args += ("--tiles", "%dx%d" % tuple(tiles), "--tile-overlap", "%f" % tile_overlap)
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if chunks is None:
+        chunks = jobs
+    if page_total is None:
+        page_total = blender_page_count(blender_bin, blend_filepath, page_args)
+    if page_total == 0:
+        raise Exception("no pages to write from %r (missing cameras?)" % blend_filepath)
+
+    page_ranges = page_ranges_split(page_total, chunks)
+
+    with tempfile.TemporaryDirectory(prefix="blend2ps_") as tempdir:
+        filepaths = [os.path.join(tempdir, "part_%04d.ps" % i) for i in range(len(page_ranges))]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(blender_run, blender_args(
+                    blender_bin, blend_filepath,
+                    page_args + (
+                        "--page-range", "%d:%d" % page_range,
+                        "--output", filepath_part,
+                    ) + tuple(args_extra),
+                    ))
+                for page_range, filepath_part in zip(page_ranges, filepaths)
+            ]
+            for future in futures:
+                future.result()
+
+        if use_split:
+            ps_split(filepath, filepaths, tempdir, gs_bin)
+            return
+
+        if filepath.lower().endswith(".pdf"):
+            filepath_ps = os.path.join(tempdir, "joined.ps")
+        else:
+            filepath_ps = filepath
+
+        with open(filepath_ps, 'w', encoding="latin-1") as file:
+            ps_join(file.write, filepaths)
+
+        if filepath_ps != filepath:
+            pdf_from_ps(gs_bin, filepath_ps, filepath)
+
+
+
+# ----------------------------------------------------------------------------
+# Command line access
+
+def main():
+    import argparse
+    import blend2ps
+
+    parser = argparse.ArgumentParser(
+        description="Write out a postscript (.ps / .pdf) document for a blend file, "
+        "exporting pages in parallel Blender processes.")
+
+    parser.add_argument("blend_filepath", metavar='BLEND_FILE',
+                        help="Blend file to export")
+
+    parser.add_argument("-o", "--output", dest="output_path", metavar='FILE', required=True,
+                        help="Save the generated file to the specified path (.ps or .pdf)")
+
+    parser.add_argument('-p', '--pages', dest="page_source", default='CAMERAS',
+                        choices=('CAMERA', 'CAMERAS', 'MARKERS', 'SCENES'),
+                        help="Source of pages (see blend2ps), "
+                        "the active camera is only useful with '--tiles'")
+
+    parser.add_argument('-t', '--tiles', dest="tiles", type=blend2ps.tiles_from_arg, metavar='ROWSxCOLUMNS',
+                        help="Split each page into a grid of pages (see blend2ps)")
+
+    parser.add_argument('--tile-overlap', dest="tile_overlap", type=float, default=0.0, metavar='PT',
+                        help="Overlap between neighboring tiles (in points)")
+
+    parser.add_argument('--split', dest="use_split", default=False, action="store_true",
+                        help="Write each page to its own file (numbered, eg: 'poster_0001.pdf'), "
+                        "instead of a single document")
+
+    parser.add_argument('-j', '--jobs', dest="jobs", type=int, default=None,
+                        help="Number of Blender processes to run at once (defaults to the number of cores)")
+
+    parser.add_argument('--chunks', dest="chunks", type=int, default=None,
+                        help="Number of page ranges to split the document into (defaults to the number of jobs)")
+
+    parser.add_argument('--page-total', dest="page_total", type=int, default=None,
+                        help="Number of pages (when not given, Blender is run to count them)")
+
+    parser.add_argument('--blender', dest="blender_bin", default="blender",
+                        help="Blender binary")
+
+    parser.add_argument('--gs', dest="gs_bin", default="gs",
+                        help="GhostScript binary (for PDF output)")
+
+    parser.add_argument('-n', '--no_image', dest="no_image", default=False, action="store_true",
+                        help="Use placeholders for images")
+
+    parser.add_argument('-d', '--dedup', dest="use_dedup", default=False, action="store_true",
+                        help="Write repeated paths (glyphs, shared curves) once as procedures")
+
+    parser.add_argument('-b', '--batch', dest="use_batch", default=False, action="store_true",
+                        help="Paint consecutive paths with the same color & line width using a single operator")
+
+    parser.add_argument('-z', '--compact', dest="compact", default=False, action="store_true",
+                        help="Write paths using short operators & relative coordinates")
+
+    parser.add_argument('--precision', dest="precision", type=int, default=None, metavar='N',
+                        help="Decimal places for coordinates written with '--compact'")
+
+    parser.add_argument('--dpi', dest="dpi", type=float, default=None,
+                        help="Simplify paths for a device of this resolution (see blend2ps)")
+
+    parser.add_argument('--dpi-tolerance', dest="dpi_tolerance", type=float, default=None, metavar='PX',
+                        help="Error allowed when simplifying paths (see blend2ps)")
+
+    parser.add_argument('-e', '--embed-images', dest="embed_images", default=False, action="store_true",
+                        help="Embed each image once and reference it for every placement")
+
+    parser.add_argument('-c', '--cache', dest="cache_dir", metavar='DIR',
+                        help="Cache directory for text written for each object (shared by all processes)")
+
+    args = parser.parse_args()
+
+    args_extra = []
+    if args.no_image:
+        args_extra.append("--no_image")
+    if args.use_dedup:
+        args_extra.append("--dedup")
+    if args.use_batch:
+        args_extra.append("--batch")
+    if args.embed_images:
+        args_extra.append("--embed-images")
+    if args.compact:
+        args_extra.append("--compact")
+    if args.precision is not None:
+        args_extra.extend(("--precision", "%d" % args.precision))
+    if args.dpi is not None:
+        args_extra.extend(("--dpi", repr(args.dpi)))
+    if args.dpi_tolerance is not None:
+        args_extra.extend(("--dpi-tolerance", repr(args.dpi_tolerance)))
+    if args.cache_dir is not None:
+        args_extra.extend(("--cache", args.cache_dir))
+
+    write(args.output_path, args.blend_filepath,
+          page_source=args.page_source,
+          tiles=args.tiles,
+          tile_overlap=args.tile_overlap,
+          use_split=args.use_split,
+          jobs=args.jobs,
+          chunks=args.chunks,
+          page_total=args.page_total,
+          blender_bin=args.blender_bin,
+          gs_bin=args.gs_bin,
+          args_extra=args_extra,
+          )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,455 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+# Copyright Campbell Barton
+
+"""
+Write a postscript (.ps / .pdf) document from a scene dump
+(written by ``blend2ps`` when the output ends with ``.npz``).
+
+This runs from a regular Python interpreter (not inside Blender),
+pages may be written by multiple processes.
+"""
+
+# ----------------------------------------------------------------------------
+# Dump Reading
+#
+# Arrays which grow with the size of the document are mapped into memory,
+# so processes writing a range of pages only read the data for those pages.
+
+DUMP_MMAP_KEYS = {"items", "subpaths", "ops", "coords", "images"}
+
+
+def dump_array_mmap(filepath, zip_file, key):
+    """
+    Return the array ``key`` of an ``.npz`` file mapped into memory,
+    None when it can't be mapped (a compressed archive for example).
+    """
+    import struct
+    import zipfile
+    import numpy as np
+
+    info = zip_file.getinfo(key + ".npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+    with zip_file.open(info) as file:
+        version = np.lib.format.read_magic(file)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(file)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(file)
+        else:
+            return None
+        data_offset = file.tell()
+
+    if dtype.hasobject:
+        return None
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+
+    # the data follows the local header of the member (its size isn't stored in 'info').
+    with open(filepath, 'rb') as file:
+        file.seek(info.header_offset)
+        header = file.read(30)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    data_offset += info.header_offset + 30 + name_len + extra_len
+
+    return np.memmap(filepath, dtype=dtype, mode='r', offset=data_offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+
+def dump_read(filepath):
+    """
+    Return the arrays of a dump as a dictionary (see ``blend2ps.PSDump``),
+    arrays in ``DUMP_MMAP_KEYS`` are mapped into memory when possible.
+    """
+    import zipfile
+    import numpy as np
+    import blend2ps
+
+    dump = {}
+    with np.load(filepath) as data, zipfile.ZipFile(filepath) as zip_file:
+        for key in data.files:
+            array = dump_array_mmap(filepath, zip_file, key) if key in DUMP_MMAP_KEYS else None
+            dump[key] = data[key] if array is None else array
+
+    if int(dump["version"]) != blend2ps.DUMP_VERSION:
+        raise Exception("dump version %d not supported (expected %d): %r" %
+                        (int(dump["version"]), blend2ps.DUMP_VERSION, filepath))
+
+    dump["filepaths"] = dump["filepaths"].tolist()
+    return dump
+
+
+def dump_page_items(dump, page_index):
+    """
+    Generate (kind, item, data) for the items of a page,
+    where ``data`` is the buckets of curves (see ``blend2ps.ps_curve_buckets``)
+    or (filepath, size, points, transform) for images (see ``blend2ps.ps_from_image``).
+    """
+    import numpy as np
+
+    page = dump["pages"][page_index]
+    items = dump["items"][page["item_start"]:page["item_end"]].tolist()
+    item_offset = int(page["item_start"])
+    subpaths = dump["subpaths"]
+    images = dump["images"]
+    ops = dump["ops"]
+    coords = dump["coords"]
+
+    i = 0
+    while i < len(items):
+        item = items[i]
+        kind = chr(item[0])
+        if kind == 'O':
+            items_bucket = items[item[4] - item_offset:item[5] - item_offset]
+            buckets = []
+            if items_bucket:
+                # the subpaths of all buckets follow each other,
+                # read their operators (as a string) & coords at once.
+                subpath_offset = items_bucket[0][4]
+                subpaths_obj = subpaths[subpath_offset:items_bucket[-1][5]].tolist()
+                if subpaths_obj:
+                    ops_offset, co_offset = subpaths_obj[0][0], subpaths_obj[0][2]
+                    ops_obj = ops[ops_offset:subpaths_obj[-1][1]].tobytes().decode("ascii")
+                    coords_obj = np.array(coords[co_offset:subpaths_obj[-1][3]])
+                for _, is_fill, rgb, _, subpath_start, subpath_end in items_bucket:
+                    buckets.append((is_fill, tuple(rgb), [
+                        (ops_obj[ops_start - ops_offset:ops_end - ops_offset],
+                         coords_obj[co_start - co_offset:co_end - co_offset],
+                         use_cyclic)
+                        for ops_start, ops_end, co_start, co_end, use_cyclic in
+                        subpaths_obj[subpath_start - subpath_offset:subpath_end - subpath_offset]
+                    ]))
+            yield kind, item, buckets
+            i = item[5] - item_offset
+            continue
+        elif kind == 'I':
+            filepath_index, size, points, is_missing, transform = images[item[4]].tolist()
+            if is_missing:
+                transform = None
+            else:
+                location_x, location_y, angle, dim_x, dim_y = transform
+                transform = (location_x, location_y), angle, dim_x, dim_y
+            yield kind, item, (dump["filepaths"][filepath_index], tuple(size), points, transform)
+        else:
+            yield kind, item, None
+        i += 1
+
+
+def dump_page_bounds(dump):
+    return [tuple(bounds) for bounds in dump["pages"]["bounds"].tolist()]
+
+
+# ----------------------------------------------------------------------------
+# Postscript Writing
+
+def ps_write_dump_page_body(fw, dump, page_index, bounds,
+                            no_image=False,
+                            defs=None,
+                            use_batch=False,
+                            precision=None):
+    """
+    Write a page, matching ``blend2ps.ps_write_page_body``.
+    """
+    import math
+    import blend2ps
+
+    fw("%.6f %.6f translate\n" % (bounds[0] / 2.0, bounds[1] / 2.0))
+
+    paint_fmt = blend2ps.PS_PAINT_FMT if precision is None else blend2ps.PS_PAINT_FMT_COMPACT
+
+    batch = blend2ps.PSBatch(fw, paint_fmt) if use_batch else None
+
+    for kind, item, data in dump_page_items(dump, page_index):
+        if kind == 'W':
+            # culled, only the line width is needed.
+            if batch is not None:
+                batch.line_width = item[3]
+            else:
+                fw(paint_fmt["line_width"] % item[3])
+        elif kind == 'O':
+            # NaN when filled.
+            line_width = None if math.isnan(item[3]) else item[3]
+            blend2ps.ps_from_buckets(fw, line_width, False, data, None, batch=batch, precision=precision)
+        elif kind == 'I':
+            if batch is not None:
+                batch.flush()
+            blend2ps.ps_from_image(fw, *data, no_image=no_image, defs=defs, precision=precision)
+
+    if batch is not None:
+        batch.flush()
+        print("  batched %d paths into %d paint operations" % (batch.tot_paths, batch.tot_paint))
+
+
+def ps_write_dump(fw, dump,
+                  page_range=None,
+                  no_image=False,
+                  embed_images=False,
+                  use_batch=False,
+                  precision=None):
+    """
+    Write a multi-page DSC document (see ``blend2ps.ps_write_pages``).
+    """
+    import blend2ps
+
+    page_bounds = dump_page_bounds(dump)
+    page_indices, page_number = blend2ps.ps_pages_range(list(range(len(page_bounds))), page_range)
+    if not page_indices:
+        raise Exception("no pages to write")
+    page_number += int(dump["page_number"]) - 1
+
+    def page_body(fw, page_index, defs):
+        page_index = page_indices[page_index]
+        ps_write_dump_page_body(fw, dump, page_index, page_bounds[page_index],
+                                no_image=no_image,
+                                defs=defs,
+                                use_batch=use_batch,
+                                precision=precision)
+
+    blend2ps.ps_write_document(fw, str(dump["title"]),
+                               [page_bounds[page_index] for page_index in page_indices], page_body,
+                               embed_images=embed_images,
+                               page_number=page_number,
+                               precision=precision)
+
+
+# ----------------------------------------------------------------------------
+# PDF Writing
+
+def pdf_write_dump_page_body(fw, dump, page_index, bounds, pdf,
+                             no_image=False,
+                             use_batch=False):
+    """
+    Write a page, matching ``blend2ps.pdf_write_page_body``.
+    """
+    import math
+    import blend2ps
+
+    fw("1 0 0 1 %.6f %.6f cm\n" % (bounds[0] / 2.0, bounds[1] / 2.0))
+
+    batch = blend2ps.PSBatch(fw, blend2ps.PDF_PAINT_FMT) if use_batch else None
+
+    for kind, item, data in dump_page_items(dump, page_index):
+        if kind == 'W':
+            # culled, only the line width is needed.
+            if batch is not None:
+                batch.line_width = item[3]
+            else:
+                fw("%.6f w\n" % item[3])
+        elif kind == 'O':
+            # NaN when filled.
+            line_width = None if math.isnan(item[3]) else item[3]
+            blend2ps.pdf_from_buckets(fw, line_width, data, batch=batch)
+        elif kind == 'I':
+            if batch is not None:
+                batch.flush()
+            blend2ps.pdf_from_image(fw, *data, pdf, no_image=no_image)
+
+    if batch is not None:
+        batch.flush()
+        print("  batched %d paths into %d paint operations" % (batch.tot_paths, batch.tot_paint))
+
+
+def pdf_write_dump(fw, dump,
+                   page_range=None,
+                   no_image=False,
+                   use_batch=False):
+    """
+    Write a PDF document (see ``blend2ps.pdf_write``), ``fw`` takes bytes.
+    """
+    import datetime
+    import blend2ps
+
+    page_bounds = dump_page_bounds(dump)
+    page_indices = blend2ps.ps_pages_range(list(range(len(page_bounds))), page_range)[0]
+    if not page_indices:
+        raise Exception("no pages to write")
+
+    pdf = blend2ps.PDFWriter(fw)
+
+    for page_index in page_indices:
+        bounds = page_bounds[page_index]
+        content = []
+        pdf_write_dump_page_body(content.append, dump, page_index, bounds, pdf,
+                                 no_image=no_image,
+                                 use_batch=use_batch)
+        pdf.page_write(bounds, "".join(content))
+        del content
+
+    pdf.finish((
+        ("Creator", "rst2ps.py"),
+        ("CreationDate", datetime.datetime.now().strftime("D:%Y%m%d%H%M%S")),
+        ("Title", str(dump["title"])),
+        ))
+
+
+# ----------------------------------------------------------------------------
+# Write Functions (exposed externally)
+
+def write_part(filepath, dump_filepath, page_range, kwargs):
+    """
+    Write a range of pages as a postscript document (runs in a separate process).
+    """
+    import blend2ps
+
+    dump = dump_read(dump_filepath)
+    with blend2ps.PSSink(filepath) as file:
+        ps_write_dump(file.write, dump, page_range=page_range, **kwargs)
+
+
+def write(filepath, dump_filepath,
+          page_range=None,
+          jobs=1,
+          no_image=False,
+          embed_images=False,
+          use_batch=False,
+          compact=False,
+          precision=2,
+          sink='FILE',
+          gs_bin="gs",
+          ):
+    """
+    Write the dump ``dump_filepath`` to ``filepath`` (see ``blend2ps.write``),
+    with multiple ``jobs``, page ranges are written in parallel processes & joined (postscript only).
+    """
+    import blend2ps
+
+    filepath_ext = filepath.lower()
+    if filepath_ext.endswith(".gz"):
+        filepath_ext = filepath_ext[:-3]
+    is_pdf = filepath_ext.endswith(".pdf") and sink != 'GS'
+
+    dump = dump_read(dump_filepath)
+
+    if is_pdf:
+        with blend2ps.PSSink(filepath, sink=sink, is_text=False) as file:
+            pdf_write_dump(file.write, dump,
+                           page_range=page_range,
+                           no_image=no_image,
+                           use_batch=use_batch)
+        return
+
+    kwargs = dict(
+        no_image=no_image,
+        embed_images=embed_images,
+        use_batch=use_batch,
+        precision=precision if compact else None,
+    )
+
+    page_indices = blend2ps.ps_pages_range(list(range(len(dump["pages"]))), page_range)[0]
+    if jobs <= 1 or len(page_indices) <= 1:
+        with blend2ps.PSSink(filepath, sink=sink, gs_bin=gs_bin) as file:
+            ps_write_dump(file.write, dump, page_range=page_range, **kwargs)
+        return
+
+    import os
+    import tempfile
+    import concurrent.futures
+    import blend2ps_parallel
+
+    page_offset = page_indices[0]
+    page_number = int(dump["page_number"]) + page_offset
+    page_ranges = [
+        (page_offset + start, page_offset + end)
+        for start, end in blend2ps_parallel.page_ranges_split(len(page_indices), jobs)
+    ]
+    del dump
+
+    with tempfile.TemporaryDirectory(prefix="dump2ps_") as tempdir:
+        filepaths = [os.path.join(tempdir, "part_%04d.ps" % i) for i in range(len(page_ranges))]
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(write_part, filepath_part, dump_filepath, page_range_part, kwargs)
+                for page_range_part, filepath_part in zip(page_ranges, filepaths)
+            ]
+            for future in futures:
+                future.result()
+
+        with blend2ps.PSSink(filepath, sink=sink, gs_bin=gs_bin) as file:
+            blend2ps_parallel.ps_join(file.write, filepaths, page_number=page_number)
+
+
+# ----------------------------------------------------------------------------
+# Command line access
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Write out a postscript (.ps / .pdf) document from a scene dump "
+        "(written by blend2ps with an '.npz' output), without Blender.")
+
+    parser.add_argument("dump_filepath", metavar='DUMP_FILE',
+                        help="Scene dump to write")
+
+    parser.add_argument("-o", "--output", dest="output_path", metavar='FILE', required=True,
+                        help="Save the generated file to the specified path (.ps or .pdf)")
+
+    parser.add_argument('-r', '--page-range', dest="page_range", metavar='START:END',
+                        help="Only write pages in this (zero based, end exclusive) range of the dump")
+
+    parser.add_argument('-j', '--jobs', dest="jobs", type=int, default=1,
+                        help="Number of processes writing pages at once (postscript only)")
+
+    parser.add_argument('-n', '--no_image', dest="no_image", default=False, action="store_true",
+                        help="Use placeholders for images")
+
+    parser.add_argument('-e', '--embed-images', dest="embed_images", default=False, action="store_true",
+                        help="Embed each image once and reference it for every placement (postscript only)")
+
+    parser.add_argument('-b', '--batch', dest="use_batch", default=False, action="store_true",
+                        help="Paint consecutive paths with the same color & line width using a single operator")
+
+    parser.add_argument('-z', '--compact', dest="compact", default=False, action="store_true",
+                        help="Write paths using short operators & relative coordinates (postscript only)")
+
+    parser.add_argument('--precision', dest="precision", type=int, default=2, metavar='N',
+                        help="Decimal places for coordinates written with '--compact'")
+
+    parser.add_argument('--sink', dest="sink", default='FILE',
+                        choices=('FILE', 'GZIP', 'GS'),
+                        help="Write the output to a file, a gzip compressed file, "
+                        "or pipe postscript into GhostScript which writes the output as PDF")
+
+    parser.add_argument('--gs', dest="gs_bin", default="gs",
+                        help="GhostScript binary (for '--sink=GS')")
+
+    args = parser.parse_args()
+
+    if args.page_range is not None:
+        page_range = tuple(int(i) if i else None for i in args.page_range.split(":"))
+    else:
+        page_range = None
+
+    write(args.output_path, args.dump_filepath,
+          page_range=page_range,
+          jobs=args.jobs,
+          no_image=args.no_image,
+          embed_images=args.embed_images,
+          use_batch=args.use_batch,
+          compact=args.compact,
+          precision=args.precision,
+          sink=args.sink,
+          gs_bin=args.gs_bin,
+          )
+
+if __name__ == "__main__":
+    main()
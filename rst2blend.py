@@ -1,19 +1,277 @@
 import docutils.parsers.rst
 
-def rst2tree(txt):
+RST_SETTINGS = (
+    ("tab_width", 4),
+    ("pep_references", False),
+    ("rfc_references", False),
+
+    ("raw_enabled", True),  # TODO, check how this works!
+    ("file_insertion_enabled", True),
+    )
+
+def rst2tree(txt, cache=None, use_sections=False, source_path="test"):
+    """
+    Parse reStructuredText into a document tree,
+    using :class:`DocTreeCache` when ``cache`` is given (see :meth:`DocTreeCache.doctree`).
+
+    ``source_path`` is used to resolve files the source includes.
+    """
+    if cache is not None:
+        return cache.doctree(txt, use_sections=use_sections, source_path=source_path)
+
     import docutils.parsers.rst
     parser = docutils.parsers.rst.Parser()
-    document = docutils.utils.new_document("test")
-    document.settings.tab_width = 4
-    document.settings.pep_references = False
-    document.settings.rfc_references = False
-
-    document.settings.raw_enabled = True  # TODO, check how this works!
-    document.settings.file_insertion_enabled = True
+    document = docutils.utils.new_document(source_path)
+    for attr, value in RST_SETTINGS:
+        setattr(document.settings, attr, value)
 
     parser.parse(txt, document)
     return document
 
+
+# ------------------------------------------------------------------------------
+# Doctree Cache
+#
+# Parsed document trees are stored on disk, keyed by a hash of the source & parser settings.
+# Sections can also be cached separately, so editing a document only re-parses sections which changed.
+
+# valid characters for section title adornments.
+RST_ADORNMENT_CHARS = "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~"
+
+def rst_title_at(lines, i):
+    """
+    Return the (char, use_overline) adornment style of a section title starting at line ``i``
+    & the number of lines it uses, otherwise None.
+    """
+    def adornment(line):
+        line = line.rstrip()
+        if (len(line) >= 2) and (line[0] in RST_ADORNMENT_CHARS) and (line == line[0] * len(line)):
+            return line
+        return None
+
+    if (i != 0) and lines[i - 1].strip():
+        return None
+
+    if i + 2 < len(lines):
+        overline = adornment(lines[i])
+        if (overline is not None) and lines[i + 1].strip() and (adornment(lines[i + 2]) == overline):
+            return (overline[0], True), 3
+
+    if i + 1 < len(lines):
+        text = lines[i].rstrip()
+        if text and (not text[0].isspace()) and (adornment(text) is None):
+            underline = adornment(lines[i + 1])
+            if (underline is not None) and (len(underline) >= min(len(text), 4)):
+                return (underline[0], False), 2
+
+    return None
+
+def rst_titles(lines):
+    """
+    Generate (line_index, style) for each section title (see :func:`rst_title_at`).
+    """
+    i = 0
+    while i < len(lines):
+        item = rst_title_at(lines, i)
+        if item is None:
+            i += 1
+            continue
+        style, line_count = item
+        yield i, style
+        i += line_count
+
+def rst_split_sections(txt):
+    """
+    Split the source at the shallowest level with multiple sections,
+    detected by the adornment of their titles (levels follow the order styles are first used).
+
+    Return (depth, chunks), the first chunk is the text before these sections
+    (containing ``depth`` sections they're nested in), each following chunk is a section.
+    """
+    lines = txt.splitlines(keepends=True)
+
+    titles = list(rst_titles(lines))
+    styles = []
+    style_count = {}
+    for i, style in titles:
+        if style not in style_count:
+            styles.append(style)
+            style_count[style] = 0
+        style_count[style] += 1
+
+    for depth, style in enumerate(styles):
+        if style_count[style] > 1:
+            break
+    else:
+        return 0, [txt]
+
+    starts = [i for i, style_iter in titles if style_iter == style]
+    chunks = ["".join(lines[i_prev:i]) for i_prev, i in zip([0] + starts, starts + [len(lines)])]
+    return depth, chunks
+
+def rst_title_styles(texts):
+    """
+    Return the title styles used before each text, in the order they're first used (as docutils assigns levels),
+    so texts parsed separately can be given the levels they have in the whole document
+    (see :func:`rst_title_styles_prefix`).
+    """
+    styles = {}
+    result = []
+    for txt in texts:
+        result.append(tuple(styles))
+        for i, style in rst_titles(txt.splitlines(keepends=True)):
+            styles.setdefault(style, None)
+    return result
+
+def rst_title_styles_prefix(styles):
+    """
+    Return text with a nested title for each style (see :func:`rst_title_at`),
+    parsing a text after this prefix gives its titles the levels they have in the whole document.
+
+    The titles are removed from the parsed tree with :func:`rst_title_styles_strip`.
+    """
+    txt = []
+    for i, (char, use_overline) in enumerate(styles):
+        title = "rst2blend-title-%d" % i
+        adornment = char * len(title)
+        if use_overline:
+            txt.append(adornment + "\n")
+        txt.append(title + "\n" + adornment + "\n\n")
+    return "".join(txt)
+
+def rst_title_styles_strip(doc, styles):
+    """
+    Remove the titles of :func:`rst_title_styles_prefix` (their sections contain the text that follows).
+    """
+    node = doc
+    for i in range(len(styles)):
+        node = node[node.first_child_matching_class(docutils.nodes.section)]
+        assert node[0].astext() == "rst2blend-title-%d" % i
+        del node[0]
+
+
+class DocTreeCache:
+    """
+    On disk cache of parsed document trees,
+    least recently used files are removed when the cache exceeds ``size_max`` (in bytes).
+
+    Files are stored by ``blend2ps.FileCache`` (see :attr:`files`).
+    Note that files included by the source aren't part of the key.
+    """
+    __slots__ = (
+        "files",
+        "hits",
+        "misses",
+        )
+
+    # Increment when the trees change, so old trees aren't used.
+    VERSION = 1
+
+    def __init__(self, dirpath, size_max=512 * 1024 * 1024):
+        import blend2ps
+        self.files = blend2ps.FileCache(dirpath, size_max=size_max)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(txt, source_path="test"):
+        import hashlib
+        import docutils
+        h = hashlib.sha1()
+        h.update(repr((DocTreeCache.VERSION, docutils.__version__, RST_SETTINGS, source_path)).encode())
+        h.update(txt.encode("utf-8", "surrogatepass"))
+        return h.hexdigest()
+
+    def get(self, key):
+        import pickle
+        import docutils.utils
+        import docutils.transforms
+        document = self.files.file_read(key, pickle.load)
+        if document is None:
+            return None
+
+        document.reporter = docutils.utils.new_reporter(document.get("source", ""), document.settings)
+        document.transformer = docutils.transforms.Transformer(document)
+        return document
+
+    def set(self, key, document):
+        import pickle
+
+        # the reporter references output streams.
+        reporter, transformer = document.reporter, document.transformer
+        document.reporter = document.transformer = None
+        try:
+            self.files.file_write(
+                key, lambda file: pickle.dump(document, file, protocol=pickle.HIGHEST_PROTOCOL))
+        finally:
+            document.reporter, document.transformer = reporter, transformer
+
+    def doctree(self, txt, use_sections=False, source_path="test"):
+        """
+        Return the document tree for ``txt``, parsing it when it's not in the cache.
+
+        With ``use_sections``, sections are parsed & cached separately (see :func:`rst_split_sections`),
+        so only sections which changed are parsed, the trees of other sections are spliced in from the cache.
+        Note that ids are only unique within a section
+        (documents are used without transforms, so references aren't resolved either way).
+        """
+        key = self.key(txt, source_path)
+        document = self.get(key)
+        if document is not None:
+            self.hits += 1
+            return document
+
+        if use_sections:
+            depth, chunks = rst_split_sections(txt)
+            if len(chunks) > 1:
+                document = self._doctree_from_sections(depth, chunks, source_path)
+
+        if document is None:
+            self.misses += 1
+            document = rst2tree(txt, source_path=source_path)
+        self.set(key, document)
+        return document
+
+    def _doctree_from_sections(self, depth, chunks, source_path):
+        import docutils.nodes
+
+        documents = [self.doctree(chunk, source_path=source_path) for chunk in chunks]
+        document = documents[0]
+
+        # the sections containing the split sections.
+        parent = document
+        for _ in range(depth):
+            if not (parent.children and isinstance(parent.children[-1], docutils.nodes.section)):
+                return None
+            parent = parent.children[-1]
+
+        # each chunk must be a single section (the titles may not have been detected correctly).
+        for document_chunk in documents[1:]:
+            if not ((len(document_chunk.children) == 1) and
+                    isinstance(document_chunk.children[0], docutils.nodes.section)):
+                return None
+
+        line_offset = len(chunks[0].splitlines())
+        for chunk, document_chunk in zip(chunks[1:], documents[1:]):
+            section = document_chunk.children[0]
+            parent.append(section)
+            nodes = [section]
+            while nodes:
+                node = nodes.pop()
+                node.document = document
+                # lines are relative to the chunk.
+                if node.line is not None:
+                    node.line += line_offset
+                if isinstance(node, docutils.nodes.system_message) and ("line" in node):
+                    node["line"] += line_offset
+                nodes.extend(node.children)
+            line_offset += len(chunk.splitlines())
+
+        return document
+
+    def evict(self):
+        self.files.evict()
+
 if 0:
     doc = rst2tree(open("/src/the_joy_of_life_drawing/book.rst", 'r', encoding="utf-8").read())
 elif 0:
@@ -69,6 +327,297 @@ The End.
     del _text
 
 
+# ------------------------------------------------------------------------------
+# Styled text spans
+#
+# Bold & italic formatting is stored as run-length spans, a tuple of (flag, length) pairs
+# (flag 1 for bold, 2 for italic), the lengths adding up to the length of the text.
+
+def text_spans_append(spans, flag, length):
+    """
+    Add ``length`` characters using ``flag`` to a list of spans, extending the last span when it matches.
+    """
+    if length == 0:
+        return
+    if spans and (spans[-1][0] == flag):
+        spans[-1] = (flag, spans[-1][1] + length)
+    else:
+        spans.append((flag, length))
+
+def text_spans_slice(spans, start, end):
+    """
+    Return the spans for characters in the range [start, end).
+    """
+    result = []
+    offset = 0
+    for flag, length in spans:
+        length_slice = min(end, offset + length) - max(start, offset)
+        if length_slice > 0:
+            result.append((flag, length_slice))
+        offset += length
+        if offset >= end:
+            break
+    return tuple(result)
+
+def text_spans_flags(spans, mask):
+    """
+    Return a boolean for each character, true when it has any of the ``mask`` flags.
+    """
+    result = []
+    for flag, length in spans:
+        result.extend([(flag & mask) != 0] * length)
+    return result
+
+
+# ------------------------------------------------------------------------------
+# Font metrics layout
+#
+# Text is measured using metrics read from the font files,
+# following the layout of Blender's text objects (see 'BKE_vfont_to_curve'),
+# so the size of text is known without evaluating objects.
+
+class FontMetrics:
+    """
+    Glyph metrics of a TrueType font,
+    scaled by the height of the font's bounds (as Blender scales glyphs).
+    """
+    __slots__ = (
+        "filepath",
+        "scale",
+        # char -> glyph index
+        "cmap",
+        # glyph index -> advance (font units)
+        "advances",
+        # glyph index -> lowest point of the outline (font units), None without an outline.
+        "y_min",
+        # (glyph index, glyph index) -> kerning (font units)
+        "kerning",
+        # char -> (width, y_min), scaled.
+        "chars",
+        )
+
+    def __init__(self, filepath):
+        import struct
+
+        with open(filepath, 'rb') as file:
+            data = file.read()
+
+        self.filepath = filepath
+
+        tables = {}
+        for i in range(struct.unpack_from(">H", data, 4)[0]):
+            tag, checksum, offset, length = struct.unpack_from(">4sIII", data, 12 + (i * 16))
+            tables[tag] = offset
+
+        ofs = tables[b"head"]
+        x_min, y_min, x_max, y_max = struct.unpack_from(">hhhh", data, ofs + 36)
+        is_loca_long = struct.unpack_from(">h", data, ofs + 50)[0] != 0
+        self.scale = (1.0 / (y_max - y_min)) if (y_max != y_min) else (1.0 / 1000.0)
+
+        totglyph = struct.unpack_from(">H", data, tables[b"maxp"] + 4)[0]
+
+        # glyphs after the last metric use its advance.
+        tothmetric = struct.unpack_from(">H", data, tables[b"hhea"] + 34)[0]
+        advances = list(struct.unpack_from(">" + ("Hh" * tothmetric), data, tables[b"hmtx"])[0::2])
+        advances.extend([advances[-1]] * (totglyph - tothmetric))
+        self.advances = advances
+
+        if is_loca_long:
+            loca = struct.unpack_from(">%dI" % (totglyph + 1), data, tables[b"loca"])
+        else:
+            loca = [ofs * 2 for ofs in struct.unpack_from(">%dH" % (totglyph + 1), data, tables[b"loca"])]
+        ofs = tables[b"glyf"]
+        self.y_min = [
+            struct.unpack_from(">hhh", data, ofs + loca[i])[2] if loca[i + 1] > loca[i] else None
+            for i in range(totglyph)
+        ]
+
+        self.cmap = self._read_cmap(data, tables[b"cmap"])
+        self.kerning = self._read_kerning(data, tables[b"kern"]) if b"kern" in tables else {}
+        self.chars = {}
+
+    @staticmethod
+    def _read_cmap(data, ofs):
+        """
+        Read the unicode character map (format 4, the basic multilingual plane).
+        """
+        import struct
+
+        subtables = {}
+        for i in range(struct.unpack_from(">H", data, ofs + 2)[0]):
+            platform_id, encoding_id, subtable_ofs = struct.unpack_from(">HHI", data, ofs + 4 + (i * 8))
+            if struct.unpack_from(">H", data, ofs + subtable_ofs)[0] == 4:
+                subtables[platform_id, encoding_id] = ofs + subtable_ofs
+
+        for key in ((3, 1), (0, 3), (0, 1), (0, 0)):
+            if key in subtables:
+                ofs = subtables[key]
+                break
+        else:
+            raise Exception("no unicode character map found")
+
+        totseg = struct.unpack_from(">H", data, ofs + 6)[0] // 2
+        ends = struct.unpack_from(">%dH" % totseg, data, ofs + 14)
+        starts = struct.unpack_from(">%dH" % totseg, data, ofs + 16 + (totseg * 2))
+        deltas = struct.unpack_from(">%dh" % totseg, data, ofs + 16 + (totseg * 4))
+        ofs_range = ofs + 16 + (totseg * 6)
+        range_offsets = struct.unpack_from(">%dH" % totseg, data, ofs_range)
+
+        cmap = {}
+        for i, (start, end, delta, range_offset) in enumerate(zip(starts, ends, deltas, range_offsets)):
+            for code in range(start, min(end, 0xfffe) + 1):
+                if range_offset == 0:
+                    glyph = (code + delta) & 0xffff
+                else:
+                    glyph = struct.unpack_from(
+                        ">H", data, ofs_range + (i * 2) + range_offset + ((code - start) * 2))[0]
+                    if glyph != 0:
+                        glyph = (glyph + delta) & 0xffff
+                cmap[chr(code)] = glyph
+        return cmap
+
+    @staticmethod
+    def _read_kerning(data, ofs):
+        """
+        Read horizontal kerning pairs (format 0).
+        """
+        import struct
+
+        kerning = {}
+        version, totsubtable = struct.unpack_from(">HH", data, ofs)
+        if version != 0:
+            return kerning
+        ofs += 4
+        for i in range(totsubtable):
+            subtable_version, length, coverage = struct.unpack_from(">HHH", data, ofs)
+            # format 0, horizontal, not minimum values or cross-stream.
+            if (coverage & 0xff07) == 0x0001:
+                totpair = struct.unpack_from(">H", data, ofs + 6)[0]
+                values = struct.unpack_from(">" + ("HHh" * totpair), data, ofs + 14)
+                kerning.update(zip(zip(values[0::3], values[1::3]), values[2::3]))
+            ofs += length
+        return kerning
+
+    def char_metrics(self, ch):
+        """
+        Return (width, y_min) for a character,
+        ``y_min`` is None when the character has no outline.
+        """
+        item = self.chars.get(ch)
+        if item is None:
+            # Blender uses the first glyph for missing characters.
+            glyph = self.cmap.get(ch, 0)
+            y_min = self.y_min[glyph]
+            item = self.chars[ch] = (
+                self.advances[glyph] * self.scale,
+                (y_min * self.scale) if y_min is not None else None,
+            )
+        return item
+
+    def char_kerning(self, ch_a, ch_b):
+        return self.kerning.get((self.cmap.get(ch_a, 0), self.cmap.get(ch_b, 0)), 0) * self.scale
+
+
+def text_layout(body, body_spans, fonts, size, box_x, box_width,
+                offset_x=0.0, offset_y=0.0,
+                space_line=1.0, space_word=1.0, space_character=1.0,
+                use_kerning=False, lines=None):
+    """
+    Lay out text, wrapping lines at the width of the text box as Blender does.
+
+    ``fonts`` are :class:`FontMetrics` for regular, bold, italic & bold-italic text,
+    indexed by the flags of ``body_spans`` (see :func:`text_spans_append`).
+
+    Return (line_count, y_min), ``y_min`` is the lowest point of all characters (in object space),
+    None when no characters have outlines.
+
+    When ``lines`` is a list, (start, y_min) is appended for each line,
+    the index of the line's first character & the lowest point of its characters.
+
+    Note that Blender doesn't use the kerning from fonts (``use_kerning`` is for other layouts).
+    """
+    import math
+
+    # matches Blender's terminating character.
+    text = body + "\0"
+    text_len = len(text)
+
+    xtrax = (0.5 * space_character) - 0.5
+    xof_line = offset_x + (box_x / size)
+    xof = xof_line
+    yof = offset_y
+
+    # font of each character (none for the terminator).
+    char_fonts = []
+    for flag, length in body_spans:
+        char_fonts.extend([fonts[flag & 3]] * length)
+    char_fonts.append(None)
+
+    # characters which break the line.
+    dobreak = bytearray(text_len)
+    char_xof = [0.0] * text_len
+    char_yof = [0.0] * text_len
+    char_line = [0] * text_len
+    line_starts = [0]
+    line_count = 0
+
+    i = 0
+    while i < text_len:
+        ch = text[i]
+        if ch in "\n\0":
+            width = 0.0
+        else:
+            width = char_fonts[i].char_metrics(ch)[0]
+
+        if (box_width != 0.0) and (not dobreak[i]) and (((xof - (box_x / size) + width) * size) >
+                                                        (box_width + (offset_x * size))):
+            # wrap at the last space (or hyphen) on this line, laying out the line from the character before it,
+            # lines without one aren't wrapped.
+            j = i
+            while j and (text[j] not in "\n\r") and (not dobreak[j]) and (text[j] not in " -"):
+                j -= 1
+            if j and (text[j] in " -") and (not dobreak[j]):
+                dobreak[j] = 1
+                i = j - 1
+                xof = char_xof[i]
+                continue
+
+        char_xof[i] = xof
+        char_yof[i] = yof
+        char_line[i] = line_count
+
+        if (ch in "\n\r\0") or dobreak[i]:
+            yof -= space_line
+            xof = xof_line
+            line_count += 1
+            line_starts.append(i + 1)
+        elif ch == "\t":
+            xof = offset_x + (2.0 * math.ceil((xof - offset_x + 0.01) / 2.0))
+        else:
+            xof += (width * (space_word if ch == " " else 1.0)) + xtrax
+            if use_kerning and (text[i + 1] not in "\n\r\0") and (char_fonts[i] is char_fonts[i + 1]):
+                xof += char_fonts[i].char_kerning(ch, text[i + 1])
+        i += 1
+
+    y_min = None
+    line_y_min = [None] * line_count
+    for i in range(text_len - 1):
+        if text[i] not in "\n\r":
+            char_y_min = char_fonts[i].char_metrics(text[i])[1]
+            if char_y_min is not None:
+                char_y_min = (char_yof[i] + char_y_min) * size
+                if (y_min is None) or (char_y_min < y_min):
+                    y_min = char_y_min
+                line = char_line[i]
+                if (line_y_min[line] is None) or (char_y_min < line_y_min[line]):
+                    line_y_min[line] = char_y_min
+
+    if lines is not None:
+        lines.extend(zip(line_starts, line_y_min))
+
+    return line_count, y_min
+
+
 # ------------------------------------------------------------------------------
 # Handle all blender conversion here
 
@@ -94,43 +643,176 @@ def butil_text_add_default(scene, style):
     return txt_ob, txt_cu
 
 
-def butil_text_set_body(txt_cu, body, body_fmt):
-    assert(len(body) == len(body_fmt))
+def butil_text_set_body(txt_cu, body, body_spans):
+    assert(len(body) == sum(length for flag, length in body_spans))
 
     txt_cu.body = body
 
+    # setting the body clears formatting, so only set flags which are used.
     bfmt_array = txt_cu.body_format
-    for i, fmt in enumerate(body_fmt):
-        if fmt & 1:
-            bfmt_array[i].use_bold = True
-        if fmt & 2:
-            bfmt_array[i].use_italic = True
-
-def butil_text_calc_advance(scene, txt_ob):
-    txt_ob.update_tag()
+    for mask, attr in ((1, "use_bold"), (2, "use_italic")):
+        if any(flag & mask for flag, length in body_spans):
+            bfmt_array.foreach_set(attr, text_spans_flags(body_spans, mask))
+
+def butil_text_update(scene, objects):
+    """
+    Evaluate text objects together, using a single scene update.
+    """
+    for txt_ob in objects:
+        txt_ob.update_tag()
     scene.update()
 
+def butil_text_calc_advance(txt_ob):
+    # must be evaluated first (see 'butil_text_update'),
+    # the bounds are in object space, so placing the object doesn't need another update.
+
     # we could be clever and find real number of lines
     advance = txt_ob.bound_box[0][1] + txt_ob.location.y
-    print(advance)
 
     return advance
 
-def butil_text_to_blend(conf, indent, style, body, body_fmt, align):
+# font file path -> FontMetrics (or None when it can't be read).
+_font_metrics_cache = {}
+
+def butil_font_metrics(vfont):
+    import os
+    import bpy
+
+    filepath = bpy.path.abspath(vfont.filepath, library=vfont.library)
+    try:
+        return _font_metrics_cache[filepath]
+    except KeyError:
+        pass
+
+    # Blender's built-in font ('<builtin>') isn't a file.
+    if os.path.isfile(filepath):
+        metrics = FontMetrics(filepath)
+    else:
+        metrics = None
+    _font_metrics_cache[filepath] = metrics
+    return metrics
+
+def butil_text_fonts_metrics(conf, txt_cu, body_spans):
+    """
+    Return font metrics to lay out the text (see 'text_layout'),
+    None when font metrics aren't used or a font used by the text can't be read.
+    """
+    if not conf.use_font_metrics:
+        return None
+
+    vfonts = (txt_cu.font, txt_cu.font_bold, txt_cu.font_italic, txt_cu.font_bold_italic)
+    fonts = [None] * 4
+    for flag in set(flag & 3 for flag, length in body_spans) | {0}:
+        vfont = vfonts[flag]
+        # unset fonts use the regular font.
+        fonts[flag] = butil_font_metrics(vfont if vfont is not None else vfonts[0])
+        if fonts[flag] is None:
+            return None
+    return fonts
+
+def butil_text_layout_metrics(txt_cu, body_spans, fonts, lines=None):
+    box = txt_cu.text_boxes[0]
+    return text_layout(
+        txt_cu.body, body_spans, fonts, txt_cu.size, box.x, box.width,
+        offset_x=txt_cu.offset_x,
+        offset_y=txt_cu.offset_y,
+        space_line=txt_cu.space_line,
+        space_word=txt_cu.space_word,
+        space_character=txt_cu.space_character,
+        lines=lines,
+        )
+
+def butil_text_calc_advance_metrics(txt_ob, body_spans, fonts):
+    # uses font metrics (see 'butil_text_fonts_metrics'), so the object doesn't need to be evaluated.
+    line_count, y_min = butil_text_layout_metrics(txt_ob.data, body_spans, fonts)
+
+    if y_min is None:
+        # the bounds Blender uses for objects without geometry.
+        y_min = -1.0
+
+    advance = y_min + txt_ob.location.y
+
+    return advance
+
+def butil_text_to_blend(conf, indent, style, body, body_spans, align):
 
     txt_ob, txt_cu = butil_text_add_default(conf.scene, style)
 
     indent_dist = style.size * indent * 1.6
     box = txt_cu.text_boxes[0]
-    box.x = indent_dist
-    box.width = conf.page_width - indent_dist
+    box.x = conf.page_margin + indent_dist
+    box.width = conf.page_width - (conf.page_margin * 2.0) - indent_dist
 
-    butil_text_set_body(txt_cu, body, body_fmt)
+    butil_text_set_body(txt_cu, body, body_spans)
 
     txt_cu.align = align
 
     return txt_ob
 
+def butil_text_key(conf, style, data):
+    """
+    Return a key for a text object, from everything it's created with (besides its position).
+    """
+    import hashlib
+    fonts = tuple(
+        font.filepath if font is not None else None
+        for font in (style.font, style.font_bold, style.font_italic)
+    )
+    h = hashlib.sha1()
+    h.update(repr((data, style.size, fonts, conf.page_width, conf.page_margin)).encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+def butil_object_remove(scene, ob):
+    import bpy
+
+    if ob.name in scene.objects:
+        scene.objects.unlink(ob)
+    # the object can't be accessed once it's removed.
+    data = ob.data
+    ob_type = ob.type
+    bpy.data.objects.remove(ob)
+    if data.users == 0:
+        if ob_type == 'CAMERA':
+            bpy.data.cameras.remove(data)
+        else:
+            bpy.data.curves.remove(data)
+
+def butil_page_resolution_set(scene, page_width, page_height):
+    # the aspect of the render resolution defines the page bounds of each camera.
+    render = scene.render
+    render.resolution_y = max(1, round(render.resolution_x * (page_height / page_width)))
+
+def butil_camera_page_add(scene, page_index, page_width, page_height, page_top):
+    import bpy
+
+    cam = bpy.data.cameras.new(name="Page")
+    cam.type = 'ORTHO'
+    cam.ortho_scale = max(page_width, page_height)
+
+    # names sort in page order (see 'blend2ps --pages=CAMERAS').
+    cam_ob = bpy.data.objects.new(name="Page.%04d" % (page_index + 1), object_data=cam)
+    cam_ob.location = (page_width / 2.0, page_top - (page_height / 2.0), 10.0)
+    scene.objects.link(cam_ob)
+
+    return cam_ob
+
+
+ROMAN_NUMERALS = (
+    (1000, "M"), (900, "CM"), (500, "D"), (400, "CD"),
+    (100, "C"), (90, "XC"), (50, "L"), (40, "XL"),
+    (10, "X"), (9, "IX"), (5, "V"), (4, "IV"),
+    (1, "I"),
+    )
+
+
+def roman_from_int(value):
+    # docutils' roman module moved between versions, so don't depend on it.
+    result = []
+    for number, numeral in ROMAN_NUMERALS:
+        count, value = divmod(value, number)
+        result.append(numeral * count)
+    return "".join(result)
+
 
 class BDocStyle:
     __slots__ = (
@@ -167,15 +849,73 @@ class BDocConf:
         "style_head3",
         "style_head4",
         "style_head5",
+
+        # measure text using metrics from font files, instead of evaluating objects.
+        "use_font_metrics",
+
+        # pagination, a single column when the height is None.
+        "page_height",
+        "page_margin",
+        # minimum number of lines when splitting text between pages,
+        # left at the bottom of a page (orphans) & carried to the next (widows).
+        "page_orphans",
+        "page_widows",
+
+        # reuse objects from previous runs (matching the key of their element),
+        # removing those which are no longer used.
+        "use_reuse_objects",
         )
 
+    def __init__(self):
+        self.use_font_metrics = False
+
+        self.page_height = None
+        self.page_margin = 0.0
+        self.page_orphans = 2
+        self.page_widows = 2
+
+        self.use_reuse_objects = False
+
 class BElemABC:
+    """
+    Document element, converted in 2 passes:
+
+    - ``to_blend`` creates objects (stored in ``data_dst``),
+      returning those which must be evaluated before they're placed,
+      these are evaluated in batches (see :meth:`BlendDoc.to_blend`).
+    - ``to_blend_advance`` places the objects at ``pen_y``, returning the next pen position.
+
+    Elements which don't fit on a page may be split (see ``to_blend_split``),
+    otherwise they're moved to the next page, along with elements kept with them (``keep_with_next``).
+    """
     __slots__ = (
         "data_src",
         "data_dst",
         )
-    def to_blend(self, conf, y_pen):
-        raise Exception("%r must implement to_blend")
+
+    # move to the next page with the element that follows (headings & list markers).
+    keep_with_next = False
+
+    def to_blend(self, conf):
+        self.data_dst = None
+        return ()
+
+    def to_blend_advance(self, conf, pen_y):
+        raise Exception("%r must implement to_blend_advance")
+
+    def to_blend_key(self, conf):
+        """
+        Return a key identifying the objects this element creates (ignoring their position),
+        used to reuse objects from a previous run, None when objects can't be reused.
+        """
+        return None
+
+    def to_blend_split(self, conf, pen_y, pen_y_min):
+        """
+        Split the element placed at ``pen_y`` so its first part ends above ``pen_y_min``,
+        returning a new element for the remainder (not yet created), or None when it can't be split.
+        """
+        return None
 
 
 class BElemLineSpace(BElemABC):
@@ -184,7 +924,7 @@ class BElemLineSpace(BElemABC):
     def __init__(self, style_id, fac_y):
         self.data_src = style_id, fac_y
 
-    def to_blend(self, conf, pen_y):
+    def to_blend_advance(self, conf, pen_y):
         style_id, fac_y = self.data_src
         style = getattr(conf, style_id)
 
@@ -194,31 +934,85 @@ class BElemLineSpace(BElemABC):
 class BElemText(BElemABC):
     __slots__ = BElemABC.__slots__
 
-    def __init__(self, body, body_fmt, align, indent, style_id):
-        self.data_src = body, body_fmt, align, indent, style_id
+    def __init__(self, body, body_spans, align, indent, style_id):
+        self.data_src = body, body_spans, align, indent, style_id
 
-    def to_blend(self, conf, pen_y):
-        body, body_fmt, align, indent, style_id = self.data_src
+    def to_blend(self, conf):
+        body, body_spans, align, indent, style_id = self.data_src
         txt_ob = butil_text_to_blend(conf, indent, getattr(conf, style_id),
-                                     body, body_fmt, align)
+                                     body, body_spans, align)
 
-        txt_ob.location.y = pen_y
         self.data_dst = txt_ob
 
-        return butil_text_calc_advance(conf.scene, txt_ob)
+        if butil_text_fonts_metrics(conf, txt_ob.data, body_spans) is None:
+            return (txt_ob,)
+        return ()
+
+    def to_blend_key(self, conf):
+        body, body_spans, align, indent, style_id = self.data_src
+        return butil_text_key(conf, getattr(conf, style_id), (body, body_spans, align, indent))
+
+    def to_blend_advance(self, conf, pen_y):
+        body, body_spans, align, indent, style_id = self.data_src
+        txt_ob = self.data_dst
+        txt_ob.location.y = pen_y
+
+        fonts = butil_text_fonts_metrics(conf, txt_ob.data, body_spans)
+        if fonts is not None:
+            return butil_text_calc_advance_metrics(txt_ob, body_spans, fonts)
+        return butil_text_calc_advance(txt_ob)
+
+    def to_blend_split(self, conf, pen_y, pen_y_min):
+        body, body_spans, align, indent, style_id = self.data_src
+        txt_ob = self.data_dst
+
+        # lines are only known when measuring with font metrics.
+        fonts = butil_text_fonts_metrics(conf, txt_ob.data, body_spans)
+        if fonts is None:
+            return None
+
+        lines = []
+        butil_text_layout_metrics(txt_ob.data, body_spans, fonts, lines=lines)
+
+        line_split = 0
+        for start, y_min in lines:
+            if (y_min is not None) and (y_min + pen_y < pen_y_min):
+                break
+            line_split += 1
+
+        # at least one line is moved to the next page.
+        line_split = min(line_split, len(lines) - max(conf.page_widows, 1))
+        if line_split < max(conf.page_orphans, 1):
+            return None
+
+        start = lines[line_split][0]
+        # the space (or new-line) the line was broken at.
+        end = (start - 1) if body[start - 1] in " \n" else start
+
+        body_spans_head = text_spans_slice(body_spans, 0, end)
+        self.data_src = body[:end], body_spans_head, align, indent, style_id
+        butil_text_set_body(txt_ob.data, body[:end], body_spans_head)
+
+        return self.__class__(body[start:], text_spans_slice(body_spans, start, len(body)),
+                              align, indent, style_id)
+
+
+class BElemHeading(BElemText):
+    __slots__ = BElemText.__slots__
+
+    keep_with_next = True
 
 
 class BElemListItem(BElemABC):
     __slots__ = BElemABC.__slots__
 
+    keep_with_next = True
+
     def __init__(self, align, indent, style_id, list_type, list_count):
         self.data_src = align, indent, style_id, list_type, list_count
 
-    def to_blend(self, conf, pen_y):
-        from docutils.utils import roman
-
+    def to_blend(self, conf):
         align, indent, style_id, list_type, list_count = self.data_src
-        print(list_type)
         if list_type is None:
             body = " \u2022"
         elif list_type == 'arabic':
@@ -228,26 +1022,297 @@ class BElemListItem(BElemABC):
         elif list_type == 'upperalpha':
             body = " %s) " % (chr(ord('A') + list_count))
         elif list_type == 'lowerroman':
-            body = "(%s) " % roman.toRoman(list_count + 1).lower()
+            body = "(%s) " % roman_from_int(list_count + 1).lower()
         elif list_type == 'upperroman':
-            body = "(%s) " % roman.toRoman(list_count + 1)
+            body = "(%s) " % roman_from_int(list_count + 1)
         else:
             raise Exception("unknown enum: %s" % list_type)
 
-        body_fmt = bytearray([0]) * len(body)
+        body_spans = ((0, len(body)),)
 
         txt_ob = butil_text_to_blend(conf, indent, getattr(conf, style_id),
-                                     body, body_fmt, align)
+                                     body, body_spans, align)
 
-        txt_ob.location.y = pen_y
         self.data_dst = txt_ob
 
-        butil_text_calc_advance(conf.scene, txt_ob)
+        # doesn't advance, no need to evaluate.
+        return ()
+
+    def to_blend_key(self, conf):
+        align, indent, style_id, list_type, list_count = self.data_src
+        return butil_text_key(conf, getattr(conf, style_id), self.data_src)
+
+    def to_blend_advance(self, conf, pen_y):
+        self.data_dst.location.y = pen_y
 
         # dont advance
         return pen_y
 
 
+# number of elements to create before evaluating them (see 'blend_pages_from_elems').
+BDOC_BATCH_SIZE = 512
+
+
+class BDocPage:
+    """
+    A page of the document, handed off once all its objects are placed & evaluated.
+    """
+    __slots__ = (
+        "index",
+        # camera framing the page (None when the document isn't paginated).
+        "camera",
+        # elements placed on this page (in order).
+        "elems",
+        )
+    def __init__(self, index):
+        self.index = index
+        self.camera = None
+        self.elems = []
+
+    @property
+    def objects(self):
+        return [elem.data_dst for elem in self.elems if elem.data_dst is not None]
+
+
+# ID-property storing the key of the element an object was created for (see 'BElemABC.to_blend_key').
+BDOC_KEY_PROP = "rst2blend_key"
+
+
+class BDocReuse:
+    """
+    Objects from a previous run, taken out of the scene until they're reused (matching their key),
+    so pages handed off before the document is finished don't include them.
+    """
+    __slots__ = (
+        "scene",
+        # key -> [object, ...]
+        "objects",
+        )
+    def __init__(self, scene):
+        self.scene = scene
+        self.objects = {}
+        for ob in list(scene.objects):
+            key = ob.get(BDOC_KEY_PROP)
+            if key is not None:
+                self.objects.setdefault(key, []).append(ob)
+                scene.objects.unlink(ob)
+
+    def pop(self, key):
+        objects = self.objects.get(key)
+        if not objects:
+            return None
+        ob = objects.pop()
+        self.scene.objects.link(ob)
+        return ob
+
+    def remove_unused(self):
+        for objects in self.objects.values():
+            for ob in objects:
+                butil_object_remove(self.scene, ob)
+        self.objects.clear()
+
+
+class BDocLayout:
+    """
+    Place elements onto pages, stacked downwards from the origin,
+    keeping headings with the text that follows & splitting text without leaving orphans or widows.
+    """
+    __slots__ = (
+        "conf",
+        "page",
+        "pen_y",
+        # bottom of the page area (None when the document isn't paginated).
+        "pen_y_min",
+        # finished pages, to evaluate & hand off.
+        "pages_done",
+        # elements with objects not yet evaluated.
+        "elems_defer",
+        # objects from a previous run (None unless 'BDocConf.use_reuse_objects' is set).
+        "reuse",
+        )
+    def __init__(self, conf):
+        self.conf = conf
+        self.pages_done = []
+        self.elems_defer = set()
+        self.reuse = BDocReuse(conf.scene) if conf.use_reuse_objects else None
+
+        if conf.page_height is not None:
+            butil_page_resolution_set(conf.scene, conf.page_width, conf.page_height)
+
+        self.page = None
+        self.page_new()
+
+    def page_new(self):
+        conf = self.conf
+        if self.page is None:
+            page_index = 0
+        else:
+            self.pages_done.append(self.page)
+            page_index = self.page.index + 1
+
+        page = self.page = BDocPage(page_index)
+
+        if conf.page_height is None:
+            self.pen_y = 0.0 - conf.page_margin
+            self.pen_y_min = None
+        else:
+            page_top = -page_index * conf.page_height
+            self.pen_y = page_top - conf.page_margin
+            self.pen_y_min = page_top - conf.page_height + conf.page_margin
+            key = None
+            if self.reuse is not None:
+                key = "page %d %r %r" % (page_index, conf.page_width, conf.page_height)
+                page.camera = self.reuse.pop(key)
+            if page.camera is None:
+                page.camera = butil_camera_page_add(
+                    conf.scene, page_index, conf.page_width, conf.page_height, page_top)
+                if key is not None:
+                    page.camera[BDOC_KEY_PROP] = key
+
+            # the active camera may be from a previous run (unlinked, to be removed when unused).
+            scene = conf.scene
+            if scene.camera is None or scene.camera.name not in scene.objects:
+                scene.camera = page.camera
+
+    def elem_create(self, elem):
+        """
+        Create (or reuse) the element's objects, returning those to evaluate before placing it.
+        """
+        conf = self.conf
+        key = None
+        if self.reuse is not None:
+            key = elem.to_blend_key(conf)
+            if key is not None:
+                ob = self.reuse.pop(key)
+                if ob is not None:
+                    # unchanged, already evaluated.
+                    elem.data_dst = ob
+                    return ()
+
+        objects = elem.to_blend(conf)
+        if elem.data_dst is not None:
+            if not objects:
+                self.elems_defer.add(elem)
+            if key is not None:
+                elem.data_dst[BDOC_KEY_PROP] = key
+        return objects
+
+    def elem_place(self, elem):
+        conf = self.conf
+        is_moved = False
+        while elem is not None:
+            page = self.page
+
+            # space isn't needed at the top of a page.
+            if (not page.elems) and isinstance(elem, BElemLineSpace):
+                return
+
+            pen_y = elem.to_blend_advance(conf, self.pen_y)
+            if (self.pen_y_min is None) or (pen_y >= self.pen_y_min):
+                page.elems.append(elem)
+                self.pen_y = pen_y
+                return
+
+            elem_next = elem.to_blend_split(conf, self.pen_y, self.pen_y_min)
+            if elem_next is not None:
+                # the object was changed (it may have been reused).
+                self.elems_defer.add(elem)
+                if self.reuse is not None:
+                    elem.data_dst[BDOC_KEY_PROP] = elem.to_blend_key(conf)
+
+                page.elems.append(elem)
+                self.pen_y = elem.to_blend_advance(conf, self.pen_y)
+                self.page_new()
+                objects = self.elem_create(elem_next)
+                if objects:
+                    butil_text_update(conf.scene, objects)
+                elem, is_moved = elem_next, False
+                continue
+
+            if is_moved or (not page.elems):
+                # taller than a page, let it overflow.
+                page.elems.append(elem)
+                self.pen_y = pen_y
+                return
+
+            elems_keep = []
+            while page.elems and page.elems[-1].keep_with_next:
+                elems_keep.append(page.elems.pop())
+            if not page.elems:
+                # don't leave the page empty.
+                page.elems.extend(reversed(elems_keep))
+                elems_keep.clear()
+
+            self.page_new()
+            for elem_keep in reversed(elems_keep):
+                self.page.elems.append(elem_keep)
+                self.pen_y = elem_keep.to_blend_advance(conf, self.pen_y)
+            is_moved = True
+
+    def pages_finish(self, is_last=False):
+        """
+        Evaluate & return pages which are finished.
+        """
+        if is_last:
+            self.pages_done.append(self.page)
+            self.page = None
+            if self.reuse is not None:
+                self.reuse.remove_unused()
+
+        pages = self.pages_done
+        self.pages_done = []
+
+        objects = []
+        for page in pages:
+            for elem in page.elems:
+                if elem in self.elems_defer:
+                    self.elems_defer.remove(elem)
+                    objects.append(elem.data_dst)
+        if objects:
+            butil_text_update(self.conf.scene, objects)
+
+        return pages
+
+
+def blend_pages_from_elems(conf, elems, batch_size=BDOC_BATCH_SIZE):
+    """
+    Generate pages (:class:`BDocPage`), consuming ``elems`` (an iterable) as pages are needed.
+
+    Objects are created for ``batch_size`` elements at a time,
+    evaluating them with a single scene update before placing them,
+    so the time taken doesn't grow with the number of objects already in the scene.
+
+    Objects which aren't needed for layout, such as those measured using font metrics
+    (see ``BDocConf.use_font_metrics``) are evaluated together when their page is finished.
+
+    With ``BDocConf.use_reuse_objects``, objects from a previous run are kept for unchanged elements,
+    only being placed again.
+    """
+    import itertools
+
+    layout = BDocLayout(conf)
+    elems = iter(elems)
+    while True:
+        elems_batch = list(itertools.islice(elems, batch_size))
+        if not elems_batch:
+            break
+
+        objects = []
+        for elem in elems_batch:
+            objects.extend(layout.elem_create(elem))
+
+        if objects:
+            butil_text_update(conf.scene, objects)
+
+        for elem in elems_batch:
+            layout.elem_place(elem)
+        del elems_batch
+
+        yield from layout.pages_finish()
+
+    yield from layout.pages_finish(is_last=True)
+
+
 class BlendDoc:
     """ Handle all text conversion quirks
     """
@@ -263,11 +1328,11 @@ class BlendDoc:
             raise Exception("All elems must be 'BElemABC'")
         self._elems.append(elem)
 
-    def to_blend(self, conf):
-        y_pen = 0.0
-        for elem in self._elems:
-            y_pen = elem.to_blend(conf, y_pen)
-
+    def to_blend(self, conf, batch_size=BDOC_BATCH_SIZE):
+        """
+        Create & place all elements, returning the pages (see :func:`blend_pages_from_elems`).
+        """
+        return list(blend_pages_from_elems(conf, self._elems, batch_size=batch_size))
 
 
 class Visitor(docutils.nodes.NodeVisitor):
@@ -288,7 +1353,8 @@ class Visitor(docutils.nodes.NodeVisitor):
         self.list_count = []  # for numbered lists
 
         self.body = []
-        self.body_fmt = []
+        # run-length formatting (see 'text_spans_append').
+        self.body_spans = []
 
         self.is_strong = False
         self.is_emphasis = False
@@ -298,19 +1364,17 @@ class Visitor(docutils.nodes.NodeVisitor):
     def as_flag(self):
         return ((1 if self.is_strong else 0) |
                 (2 if self.is_emphasis else 0))
-    def as_flag_n(self, n):
-        return bytearray([self.as_flag()]) * n
 
     def pop_body(self):
         body = "".join(self.body)
-        body_fmt = b"".join(self.body_fmt)
+        body_spans = tuple(self.body_spans)
 
-        assert(len(body) == len(body_fmt))
+        assert(len(body) == sum(length for flag, length in body_spans))
 
         self.body.clear()
-        self.body_fmt.clear()
+        self.body_spans.clear()
 
-        return body, body_fmt
+        return body, body_spans
 
     @staticmethod
     def node_align(node):
@@ -330,7 +1394,7 @@ class Visitor(docutils.nodes.NodeVisitor):
     # Visitors (docutils callbacks)
 
     def visit_author(self, node):
-        print("AUTHOR", node[0])
+        pass
 
     # TODO
     def visit_section(self, node):
@@ -339,14 +1403,12 @@ class Visitor(docutils.nodes.NodeVisitor):
         self.section_level -= 1
 
     def visit_title(self, node):
-        print("TITLE", node[0], self.section_level)
+        pass
 
     def depart_title(self, node):
-        print("/TITLE", node[0])
-
-        body, body_fmt = self.pop_body()
+        body, body_spans = self.pop_body()
         align = self.node_align(node)
-        elem = BElemText(body, body_fmt, align, self.indent, "style_head%d" % self.section_level)
+        elem = BElemHeading(body, body_spans, align, self.indent, "style_head%d" % self.section_level)
         self.bdoc.add_elem(elem)
 
         # import IPython
@@ -385,9 +1447,9 @@ class Visitor(docutils.nodes.NodeVisitor):
         pass
 
     def depart_paragraph(self, node):
-        body, body_fmt = self.pop_body()
+        body, body_spans = self.pop_body()
         align = self.node_align(node)
-        elem = BElemText(body, body_fmt, align, self.indent, "style_body")
+        elem = BElemText(body, body_spans, align, self.indent, "style_body")
         self.bdoc.add_elem(elem)
 
         elem = BElemLineSpace("style_body", 1.0)
@@ -403,15 +1465,12 @@ class Visitor(docutils.nodes.NodeVisitor):
 
         # add back whitespace on ends
         if text_ws_sta:
-            text " " + text
+            text = " " + text
         if text_ws_end:
             text = text + " "
 
         self.body.append(text)
-        text_fmt = self.as_flag_n(len(text))
-        self.body_fmt.append(text_fmt)
-
-        assert(len(text) == len(text_fmt))
+        text_spans_append(self.body_spans, self.as_flag(), len(text))
 
     def depart_Text(self, node):
         pass
@@ -464,23 +1523,187 @@ class Visitor(docutils.nodes.NodeVisitor):
         pass
 
 
-def blend_from_rst(stream):
-    bdoc = BlendDoc()
+def doctree_walk_iter(node, visitor):
+    """
+    Walk the tree as ``docutils.nodes.Node.walkabout`` does,
+    yielding after each node is departed, so the walk only progresses as its output is needed.
+    """
+    nodes = docutils.nodes
+    call_depart = True
+    stop = False
+    try:
+        try:
+            visitor.dispatch_visit(node)
+        except nodes.SkipNode:
+            return stop
+        except nodes.SkipDeparture:
+            call_depart = False
+        try:
+            for child in node.children[:]:
+                if (yield from doctree_walk_iter(child, visitor)):
+                    stop = True
+                    break
+        except nodes.SkipSiblings:
+            pass
+    except nodes.SkipChildren:
+        pass
+    except nodes.StopTraversal:
+        stop = True
+    if call_depart:
+        visitor.dispatch_departure(node)
+    yield
+    return stop
 
+
+def bdoc_elems_from_doctree(doc):
+    """
+    Generate document elements, walking the tree as elements are needed.
+    """
+    bdoc = BlendDoc()
     visitor = Visitor(doc, bdoc)
-    doc.walkabout(visitor)
+    elems = bdoc._elems
+    for _ in doctree_walk_iter(doc, visitor):
+        if elems:
+            yield from elems
+            elems.clear()
 
-    # setup conversion context
+
+# ------------------------------------------------------------------------------
+# Multi-file documents
+#
+# Books made of many files are parsed in parallel processes,
+# each returning the elements of its part of the document (which are merged in order).
+
+# minimum size of a part (in characters), sections are merged until they're at least this size.
+RST_PART_SIZE_MIN = 1 << 16
+
+def rst_file_parts(filepath, part_size_min=RST_PART_SIZE_MIN):
+    """
+    Return the parts of a file to parse separately, a list of (text, source_path) pairs.
+
+    Top-level ``include`` directives (without options) are replaced by the parts of the files they include,
+    other text is split into its sections (see :func:`rst_split_sections`).
+    """
+    import os
+    import re
+
+    with open(filepath, 'r', encoding="utf-8") as file:
+        lines = file.read().splitlines(keepends=True)
+
+    parts = []
+    lines_text = []
+
+    def parts_add_text():
+        txt = "".join(lines_text)
+        lines_text.clear()
+        if not txt.strip():
+            return
+        chunks = []
+        chunks_size = 0
+        for chunk in rst_split_sections(txt)[1]:
+            chunks.append(chunk)
+            chunks_size += len(chunk)
+            if chunks_size >= part_size_min:
+                parts.append(("".join(chunks), filepath))
+                chunks.clear()
+                chunks_size = 0
+        if chunks:
+            parts.append(("".join(chunks), filepath))
+
+    for i, line in enumerate(lines):
+        match = re.match(r"\.\.\s+include::\s*([^<\s].*?)\s*$", line)
+        # options (indented lines) change what's included, leave these for docutils.
+        if (match is not None) and not ((i + 1 < len(lines)) and lines[i + 1][:1].isspace() and lines[i + 1].strip()):
+            parts_add_text()
+            parts.extend(rst_file_parts(os.path.join(os.path.dirname(filepath), match.group(1)),
+                                        part_size_min=part_size_min))
+        else:
+            lines_text.append(line)
+    parts_add_text()
+
+    return parts
+
+
+def bdoc_elems_from_rst_part(txt, source_path, title_styles, cache_dir=None):
+    """
+    Return the elements of part of a document (runs in a worker process),
+    ``title_styles`` are the styles used before this part (see :func:`rst_title_styles`).
+    """
+    cache = DocTreeCache(cache_dir) if cache_dir is not None else None
+    doc = rst2tree(rst_title_styles_prefix(title_styles) + txt, cache=cache, source_path=source_path)
+    rst_title_styles_strip(doc, title_styles)
+    bdoc = BlendDoc()
+    doc.walkabout(Visitor(doc, bdoc))
+    return bdoc._elems
+
+
+def bdoc_from_rst_files(filepaths, jobs=1, cache_dir=None):
+    """
+    Return a :class:`BlendDoc` from files (in order), parsing their parts (see :func:`rst_file_parts`)
+    in ``jobs`` processes (None for the number of CPU's), optionally using a :class:`DocTreeCache`.
+
+    This runs in Blender, so parts are only parsed in multiple processes when ``jobs`` is passed,
+    since forking a running Blender isn't always safe.
+
+    Note that ids are only unique within each part
+    (the trees aren't transformed, so references aren't resolved either way).
+    """
+    import os
+
+    parts = []
+    for filepath in filepaths:
+        parts.extend(rst_file_parts(filepath))
+    title_styles = rst_title_styles([txt for txt, source_path in parts])
+
+    args = [
+        (txt, source_path, title_styles_part, cache_dir)
+        for (txt, source_path), title_styles_part in zip(parts, title_styles)
+    ]
+    del parts
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+
+    bdoc = BlendDoc()
+    if jobs <= 1 or len(args) <= 1:
+        for args_part in args:
+            for elem in bdoc_elems_from_rst_part(*args_part):
+                bdoc.add_elem(elem)
+    else:
+        import concurrent.futures
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(bdoc_elems_from_rst_part, *args_part) for args_part in args]
+            for future in futures:
+                for elem in future.result():
+                    bdoc.add_elem(elem)
+
+    # once all parts are written (not in each process).
+    if cache_dir is not None:
+        DocTreeCache(cache_dir).evict()
+    return bdoc
+
+
+def bdoc_conf_create(scene, fonts=(None, None, None),
+                     page_width=7.0, page_height=9.9, page_margin=0.5):
+    """
+    Return a conversion context using the default styles,
+    ``fonts`` are file paths for regular, bold & italic text (Blender's built-in font is used for None).
+    """
     import bpy
     conf = BDocConf()
-    conf.scene = bpy.context.scene
-    conf.page_width = 6.0
+    conf.scene = scene
+    conf.page_width = page_width
+    conf.page_height = page_height
+    conf.page_margin = page_margin
     conf.paragraph_space = 1.0
+    conf.use_font_metrics = True
+    conf.use_reuse_objects = True
 
-    # TODO, make args
-    font = bpy.data.fonts.load("/usr/share/fonts/TTF/Vera.ttf")
-    font_bold = bpy.data.fonts.load("/usr/share/fonts/TTF/VeraBd.ttf")
-    font_italic = bpy.data.fonts.load("/usr/share/fonts/TTF/VeraIt.ttf")
+    font, font_bold, font_italic = (
+        bpy.data.fonts.load(filepath) if filepath is not None else None
+        for filepath in fonts
+    )
 
     style = BDocStyle()
     style.size = 1.0
@@ -508,7 +1731,27 @@ def blend_from_rst(stream):
 
     del style
 
-    visitor.bdoc.to_blend(conf)
+    return conf
+
+
+def blend_from_rst(stream, page_fn=None):
+    """
+    ``page_fn`` is called with each :class:`BDocPage` once it's finished
+    (its objects could be exported & removed there, before the document is finished).
+    """
+    # setup conversion context
+    import bpy
+
+    # TODO, make args
+    conf = bdoc_conf_create(bpy.context.scene, fonts=(
+        "/usr/share/fonts/TTF/Vera.ttf",
+        "/usr/share/fonts/TTF/VeraBd.ttf",
+        "/usr/share/fonts/TTF/VeraIt.ttf",
+    ))
+
+    for page in blend_pages_from_elems(conf, bdoc_elems_from_doctree(doc)):
+        if page_fn is not None:
+            page_fn(page)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,214 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+#
+# Copyright Campbell Barton
+
+"""
+Convert reStructuredText into a postscript (or PDF) document within a single Blender session,
+``rst2blend`` lays out the pages in the current scene which ``blend2ps`` then writes,
+without saving & loading an intermediate blend file.
+"""
+
+# ----------------------------------------------------------------------------
+# Conversion
+
+def scene_clear(scene):
+    """
+    Unlink objects not created by ``rst2blend`` (the default cube, camera & lamp for example),
+    since every camera is written as a page.
+    """
+    import rst2blend
+
+    for ob in list(scene.objects):
+        if ob.get(rst2blend.BDOC_KEY_PROP) is None:
+            scene.objects.unlink(ob)
+            if scene.camera is ob:
+                scene.camera = None
+
+
+def write(filepath,
+          rst_filepaths,
+          blend_filepath=None,
+          fonts=(None, None, None),
+          page_width=7.0,
+          page_height=9.9,
+          page_margin=0.5,
+          jobs=1,
+          rst_cache_dir=None,
+          use_keep_objects=False,
+          cull='OBJECT',
+          **kwargs
+          ):
+    """
+    Write ``rst_filepaths`` (joined into one document) to ``filepath``,
+    optionally saving the scene to ``blend_filepath`` too,
+    other keyword arguments are passed to :func:`blend2ps.write`.
+
+    Each page only writes the objects it overlaps by default (see ``cull``),
+    since all pages are in the same scene.
+    ``jobs`` greater than one parses the documents in multiple processes (forked from Blender).
+
+    Objects from a previous conversion in the current scene are reused when they're unchanged,
+    so opening the saved blend file before converting again only creates objects for edited text.
+    """
+    import bpy
+    import rst2blend
+    import blend2ps
+
+    scene = bpy.context.scene
+    if not use_keep_objects:
+        scene_clear(scene)
+
+    bdoc = rst2blend.bdoc_from_rst_files(rst_filepaths, jobs=jobs, cache_dir=rst_cache_dir)
+    conf = rst2blend.bdoc_conf_create(scene, fonts=fonts,
+                                      page_width=page_width,
+                                      page_height=page_height,
+                                      page_margin=page_margin)
+    pages = bdoc.to_blend(conf)
+    del bdoc
+    print("rst2ps: %d page(s)" % len(pages))
+
+    if blend_filepath is not None:
+        bpy.ops.wm.save_as_mainfile(filepath=blend_filepath)
+
+    blend2ps.write(filepath, page_source='CAMERAS', cull=cull, **kwargs)
+
+
+# ----------------------------------------------------------------------------
+# Command line access
+
+def main():
+    import sys
+    import os
+    import argparse
+
+    # the directory of this file isn't in the path when running from Blender.
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    argv = sys.argv
+    if "--" not in argv:
+        argv = []  # as if no args are passed
+    else:
+        argv = argv[argv.index("--") + 1:]  # get all args after "--"
+
+    usage_text = (
+        "Run blender in background mode with this script:"
+        "  blender --background --factory-startup --python " + __file__ + " -- [options] FILE.rst ..."
+    )
+
+    parser = argparse.ArgumentParser(description=usage_text)
+
+    parser.add_argument("rst_filepaths", nargs="+", metavar='FILE',
+                        help="reStructuredText files, joined into a single document (in order)")
+
+    parser.add_argument("-o", "--output", dest="output_path", metavar='FILE', required=True,
+                        help="Write the document to the specified path "
+                        "(postscript, or PDF when ending with '.pdf')")
+
+    parser.add_argument("--blend", dest="blend_filepath", metavar='FILE',
+                        help="Also save the scene to this blend file "
+                        "(open it when converting again to reuse unchanged objects)")
+
+    parser.add_argument("--font", dest="font", metavar='FILE',
+                        help="Font for regular text (Blender's built-in font by default)")
+
+    parser.add_argument("--font-bold", dest="font_bold", metavar='FILE',
+                        help="Font for bold text")
+
+    parser.add_argument("--font-italic", dest="font_italic", metavar='FILE',
+                        help="Font for italic text")
+
+    parser.add_argument("--page-width", dest="page_width", type=float, default=7.0, metavar='SIZE',
+                        help="Page width (in blender units)")
+
+    parser.add_argument("--page-height", dest="page_height", type=float, default=9.9, metavar='SIZE',
+                        help="Page height (in blender units)")
+
+    parser.add_argument("--page-margin", dest="page_margin", type=float, default=0.5, metavar='SIZE',
+                        help="Margin around the text of each page (in blender units)")
+
+    parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=1, metavar='N',
+                        help="Number of processes parsing the documents "
+                        "(forked from Blender, so a single process by default)")
+
+    parser.add_argument("--rst-cache", dest="rst_cache_dir", metavar='DIR',
+                        help="Cache parsed documents in this directory, "
+                        "converting again only parses sections which changed")
+
+    parser.add_argument("--keep-objects", dest="use_keep_objects", default=False, action="store_true",
+                        help="Keep objects already in the scene (not created by rst2blend), "
+                        "otherwise they're removed so the default scene isn't written")
+
+    parser.add_argument('--cull', dest="cull", default='OBJECT',
+                        choices=('NONE', 'OBJECT', 'SPLINE'),
+                        help="Skip objects (using their bounds) or also individual splines "
+                        "which are outside each page, see blend2ps "
+                        "(all pages are in one scene, so only disable this for debugging)")
+
+    parser.add_argument('-c', '--cache', dest="cache_dir", metavar='DIR',
+                        help="Cache the text written for each object in this directory, see blend2ps")
+
+    parser.add_argument('-d', '--dedup', dest="use_dedup", default=False, action="store_true",
+                        help="Write repeated paths once, see blend2ps")
+
+    parser.add_argument('-b', '--batch', dest="use_batch", default=False, action="store_true",
+                        help="Paint consecutive paths with the same style together, see blend2ps")
+
+    parser.add_argument('-z', '--compact', dest="compact", default=False, action="store_true",
+                        help="Use a compact encoding for paths, see blend2ps")
+
+    parser.add_argument('--precision', dest="precision", type=int, default=2, metavar='N',
+                        help="Decimal places for coordinates (with '--compact')")
+
+    parser.add_argument('--sink', dest="sink", default='FILE',
+                        choices=('FILE', 'GZIP', 'GS'),
+                        help="Write the output to a file, a gzip compressed file, "
+                        "or pipe postscript into GhostScript which writes the output as PDF")
+
+    parser.add_argument('--gs', dest="gs_bin", default="gs",
+                        help="GhostScript binary (for '--sink=GS')")
+
+    if not argv:
+        parser.print_help()
+        return
+
+    args = parser.parse_args(argv)
+
+    write(args.output_path,
+          args.rst_filepaths,
+          blend_filepath=args.blend_filepath,
+          fonts=(args.font, args.font_bold, args.font_italic),
+          page_width=args.page_width,
+          page_height=args.page_height,
+          page_margin=args.page_margin,
+          jobs=args.jobs,
+          rst_cache_dir=args.rst_cache_dir,
+          use_keep_objects=args.use_keep_objects,
+          cull=args.cull,
+          cache_dir=args.cache_dir,
+          use_dedup=args.use_dedup,
+          use_batch=args.use_batch,
+          compact=args.compact,
+          precision=args.precision,
+          sink=args.sink,
+          gs_bin=args.gs_bin,
+          )
+
+
+if __name__ == "__main__":
+    main()